@@ -0,0 +1,312 @@
+"""Baseline: the schema ``create_tables()`` built on boot before Alembic.
+
+The DDL is written out here rather than generated from ``app.models``, so
+this revision stays the same when the models change; later revisions own
+every change since. Databases created before Alembic already have these
+tables, so everything is idempotent: ``CREATE TABLE IF NOT EXISTS`` skips
+existing tables, and the catch-ups add the columns and indexes that were
+introduced while the schema was still built by ``create_all``.
+
+Constraints keep PostgreSQL's default names (``<table>_pkey``,
+``<table>_<column>_key``), exactly as ``create_all`` left them; 0003 relies
+on ``<table>_pkey``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# In dependency order.
+TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS audit_chain_heads (
+        tenant_id VARCHAR(36) NOT NULL,
+        seq BIGINT NOT NULL,
+        last_hash VARCHAR(64) NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (tenant_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS audit_checkpoints (
+        tenant_id VARCHAR(36) NOT NULL,
+        segment INTEGER NOT NULL,
+        first_seq BIGINT NOT NULL,
+        last_seq BIGINT NOT NULL,
+        prev_hash VARCHAR(64) NOT NULL,
+        last_hash VARCHAR(64) NOT NULL,
+        merkle_root VARCHAR(64) NOT NULL,
+        tree BYTEA NOT NULL,
+        signature VARCHAR(64) NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (tenant_id, segment)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS audit_logs (
+        id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        seq BIGINT NOT NULL,
+        actor_id VARCHAR(36),
+        event VARCHAR(100) NOT NULL,
+        resource VARCHAR(100) NOT NULL,
+        resource_id VARCHAR(36),
+        details JSON NOT NULL,
+        ip_address VARCHAR(45),
+        user_agent VARCHAR(500),
+        entry_hash VARCHAR(64) NOT NULL,
+        prev_hash VARCHAR(64) NOT NULL,
+        hash_version SMALLINT DEFAULT '1' NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_audit_logs_tenant_seq UNIQUE (tenant_id, seq)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_cost_aggregates (
+        id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        period_date DATE NOT NULL,
+        total_requests INTEGER NOT NULL,
+        total_tokens INTEGER NOT NULL,
+        total_cost_usd FLOAT NOT NULL,
+        by_model JSON NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_daily_cost_tenant_period UNIQUE (tenant_id, period_date)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tenants (
+        id VARCHAR(36) NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        slug VARCHAR(100) NOT NULL,
+        plan VARCHAR(50) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        rate_limit_rpm INTEGER NOT NULL,
+        daily_budget_usd FLOAT NOT NULL,
+        max_users INTEGER NOT NULL,
+        nexus_enabled BOOLEAN NOT NULL,
+        deepseek_enabled BOOLEAN NOT NULL,
+        rag_enabled BOOLEAN NOT NULL,
+        code_studio_enabled BOOLEAN NOT NULL,
+        allowed_models JSON NOT NULL,
+        data_residency_region VARCHAR(50) NOT NULL,
+        custom_system_prompt VARCHAR(10000),
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (slug)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cost_records (
+        id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        request_id VARCHAR(36) NOT NULL,
+        model VARCHAR(100) NOT NULL,
+        provider VARCHAR(50) NOT NULL,
+        input_tokens INTEGER NOT NULL,
+        output_tokens INTEGER NOT NULL,
+        cost_usd FLOAT NOT NULL,
+        period_date DATE NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(tenant_id) REFERENCES tenants (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS inference_logs (
+        id VARCHAR(36) NOT NULL,
+        request_id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        user_id VARCHAR(36),
+        api_key_id VARCHAR(36),
+        pipeline_id VARCHAR(36),
+        model VARCHAR(100) NOT NULL,
+        provider VARCHAR(50) NOT NULL,
+        mode VARCHAR(50) NOT NULL,
+        latency_ms FLOAT NOT NULL,
+        input_tokens INTEGER NOT NULL,
+        output_tokens INTEGER NOT NULL,
+        total_tokens INTEGER NOT NULL,
+        cost_usd FLOAT NOT NULL,
+        consensus_score FLOAT,
+        synthesized BOOLEAN NOT NULL,
+        models_used JSON NOT NULL,
+        safety_passed BOOLEAN NOT NULL,
+        pii_detected BOOLEAN NOT NULL,
+        pii_entities JSON NOT NULL,
+        prompt_hash VARCHAR(64),
+        status_code INTEGER NOT NULL,
+        error_message TEXT,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (request_id),
+        FOREIGN KEY(tenant_id) REFERENCES tenants (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS knowledge_bases (
+        id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        description TEXT NOT NULL,
+        total_documents INTEGER NOT NULL,
+        total_chunks INTEGER NOT NULL,
+        storage_bytes INTEGER NOT NULL,
+        embedding_model VARCHAR(100) NOT NULL,
+        chunk_size INTEGER NOT NULL,
+        chunk_overlap INTEGER NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(tenant_id) REFERENCES tenants (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pipelines (
+        id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        created_by VARCHAR(36) NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        description TEXT NOT NULL,
+        version VARCHAR(20) NOT NULL,
+        steps JSON NOT NULL,
+        nexus_orchestrated BOOLEAN NOT NULL,
+        total_runs INTEGER NOT NULL,
+        success_rate FLOAT NOT NULL,
+        avg_latency_ms FLOAT NOT NULL,
+        total_cost_usd FLOAT NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(tenant_id) REFERENCES tenants (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rbac_permissions (
+        id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        role VARCHAR(50) NOT NULL,
+        resource VARCHAR(100) NOT NULL,
+        actions JSON NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(tenant_id) REFERENCES tenants (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        hashed_password VARCHAR(255),
+        full_name VARCHAR(255) NOT NULL,
+        role VARCHAR(50) NOT NULL,
+        is_active BOOLEAN NOT NULL,
+        is_verified BOOLEAN NOT NULL,
+        sso_provider VARCHAR(50),
+        sso_subject VARCHAR(255),
+        preferences JSON NOT NULL,
+        last_active_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(tenant_id) REFERENCES tenants (id),
+        UNIQUE (email)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS api_keys (
+        id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        created_by VARCHAR(36) NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        key_hash VARCHAR(64) NOT NULL,
+        key_prefix VARCHAR(20) NOT NULL,
+        permissions JSON NOT NULL,
+        allowed_models JSON NOT NULL,
+        allowed_ips JSON NOT NULL,
+        rate_limit_rpm INTEGER NOT NULL,
+        monthly_budget_usd FLOAT,
+        is_active BOOLEAN NOT NULL,
+        last_used_at TIMESTAMP WITH TIME ZONE,
+        request_count BIGINT DEFAULT '0' NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(tenant_id) REFERENCES tenants (id),
+        FOREIGN KEY(created_by) REFERENCES users (id),
+        UNIQUE (key_hash)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS documents (
+        id VARCHAR(36) NOT NULL,
+        kb_id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        name VARCHAR(500) NOT NULL,
+        source_type VARCHAR(50) NOT NULL,
+        source_url VARCHAR(2000),
+        s3_key VARCHAR(500),
+        file_size_bytes INTEGER NOT NULL,
+        mime_type VARCHAR(100) NOT NULL,
+        total_chunks INTEGER NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        indexing_progress FLOAT NOT NULL,
+        error_message TEXT,
+        metadata JSON NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(kb_id) REFERENCES knowledge_bases (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pipeline_executions (
+        id VARCHAR(36) NOT NULL,
+        pipeline_id VARCHAR(36) NOT NULL,
+        tenant_id VARCHAR(36) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        steps_completed INTEGER NOT NULL,
+        total_steps INTEGER NOT NULL,
+        input_data JSON NOT NULL,
+        output_data JSON NOT NULL,
+        step_results JSON NOT NULL,
+        latency_ms FLOAT NOT NULL,
+        cost_usd FLOAT NOT NULL,
+        error_message TEXT,
+        started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        completed_at TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(pipeline_id) REFERENCES pipelines (id)
+    )
+    """,
+)
+
+CATCH_UPS = (
+    "ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS hash_version SMALLINT NOT NULL DEFAULT 1",
+    "ALTER TABLE api_keys ADD COLUMN IF NOT EXISTS request_count BIGINT DEFAULT 0",
+    "CREATE INDEX IF NOT EXISTS ix_cost_records_tenant_period ON cost_records (tenant_id, period_date)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_tenant_created_id ON audit_logs (tenant_id, created_at, id)",
+)
+
+
+def upgrade() -> None:
+    for stmt in TABLES + CATCH_UPS:
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TABLE IF EXISTS pipeline_executions, documents, api_keys, users, rbac_permissions, pipelines, "
+        "knowledge_bases, inference_logs, cost_records, tenants, daily_cost_aggregates, audit_logs, "
+        "audit_checkpoints, audit_chain_heads"
+    )
@@ -0,0 +1,45 @@
+"""Keyset indexes for /inference/logs.
+
+``(tenant_id, created_at, id)`` serves the unfiltered listing and export,
+``(tenant_id, model, created_at, id)`` the per-model view; both are scanned
+backwards for newest-first pages. Built CONCURRENTLY so a large table keeps
+taking writes while they build.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    relkind = op.get_bind().scalar(sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass('inference_logs')"))
+    if relkind == "p":
+        # Built partitioned, indexes included, by create_tables() from the current models
+        # (development databases); CONCURRENTLY is not allowed there.
+        return
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_inference_logs_tenant_created_id "
+            "ON inference_logs (tenant_id, created_at, id)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_inference_logs_tenant_model_created_id "
+            "ON inference_logs (tenant_id, model, created_at, id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_inference_logs_tenant_model_created_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_inference_logs_tenant_created_id")
@@ -0,0 +1,144 @@
+"""Monthly range partitions for inference_logs, cost_records and audit_logs.
+
+Each existing table becomes the first partition of a new partitioned parent
+instead of being copied, so the switch costs the same at 1k or 1B rows:
+
+1. Outside a transaction, build on the old table — CONCURRENTLY — every
+   index the parent will have, plus a validated CHECK matching the partition
+   bound. Writes keep flowing meanwhile.
+2. In one short transaction, rename the table (and its indexes) to
+   ``<table>_legacy``, swap its primary key to the prebuilt ``(id,
+   created_at)`` index, create the partitioned parent from the model and
+   attach the legacy table for ``[MINVALUE, boundary)``. ATTACH reuses the
+   prebuilt indexes and trusts the CHECK, so nothing is rescanned.
+3. Create monthly partitions from ``boundary`` onwards.
+
+The boundary is the start of the month after next, so rows written while
+the migration runs always fit the legacy partition. Tables that are already
+partitioned (development databases that ``create_tables()`` built from the
+current models) skip straight to step 3.
+
+Downgrading cannot be metadata-only: the rows are copied into a plain table
+that replaces the partitioned one, with the keys and indexes 0001 and 0002
+left, while writes are blocked. That takes time proportional to the table.
+Partitions already moved to the ``archive`` schema are not copied back, and
+the ``nexus_*`` functions stay installed; they are no-ops on unpartitioned
+tables.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+import app.models  # noqa: F401
+from app.config import settings
+from app.database import Base
+from app.partitions import FUNCTIONS_SQL, PARTITIONED_TABLES, ensure_sql
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# The keys and indexes each table had before this revision, as 0001 and 0002 created them.
+UNPARTITIONED_DDL = {
+    "inference_logs": (
+        "ALTER TABLE inference_logs ADD PRIMARY KEY (id)",
+        "ALTER TABLE inference_logs ADD UNIQUE (request_id)",
+        "ALTER TABLE inference_logs ADD FOREIGN KEY (tenant_id) REFERENCES tenants (id)",
+        "CREATE INDEX ix_inference_logs_tenant_created_id ON inference_logs (tenant_id, created_at, id)",
+        "CREATE INDEX ix_inference_logs_tenant_model_created_id ON inference_logs (tenant_id, model, created_at, id)",
+    ),
+    "cost_records": (
+        "ALTER TABLE cost_records ADD PRIMARY KEY (id)",
+        "ALTER TABLE cost_records ADD FOREIGN KEY (tenant_id) REFERENCES tenants (id)",
+        "CREATE INDEX ix_cost_records_tenant_period ON cost_records (tenant_id, period_date)",
+    ),
+    "audit_logs": (
+        "ALTER TABLE audit_logs ADD PRIMARY KEY (id)",
+        "ALTER TABLE audit_logs ADD CONSTRAINT uq_audit_logs_tenant_seq UNIQUE (tenant_id, seq)",
+        "CREATE INDEX ix_audit_logs_tenant_created_id ON audit_logs (tenant_id, created_at, id)",
+    ),
+}
+
+
+def _boundary() -> str:
+    now = datetime.now(UTC)
+    year, month = divmod(now.year * 12 + now.month - 1 + 2, 12)
+    return f"{year:04d}-{month + 1:02d}-01 00:00:00+00"
+
+
+def _is_partitioned(table: str) -> bool:
+    relkind = op.get_bind().scalar(sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table})
+    return relkind == "p"
+
+
+def _legacy_name(name: str) -> str:
+    return f"{name[:56]}_legacy"
+
+
+def _convert(table: sa.Table, boundary: str) -> None:
+    name = table.name
+    legacy = f"{name}_legacy"
+    bound_check = f"{legacy}_bound"
+    pk_index = f"{name}_id_created_at"
+
+    with op.get_context().autocommit_block():
+        op.execute(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {pk_index} ON {name} (id, created_at)")
+        for index in table.indexes:
+            columns = ", ".join(c.name for c in index.columns)
+            unique = "UNIQUE " if index.unique else ""
+            op.execute(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {index.name} ON {name} ({columns})")
+        op.execute(f"ALTER TABLE {name} DROP CONSTRAINT IF EXISTS {bound_check}")
+        op.execute(
+            f"ALTER TABLE {name} ADD CONSTRAINT {bound_check} CHECK (created_at < '{boundary}') NOT VALID"
+        )
+        op.execute(f"ALTER TABLE {name} VALIDATE CONSTRAINT {bound_check}")
+
+    op.execute(f"LOCK TABLE {name} IN ACCESS EXCLUSIVE MODE")
+    op.execute(f"ALTER TABLE {name} RENAME TO {legacy}")
+    # ATTACH only adopts an index for the parent's primary key if it backs a constraint too.
+    op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {name}_pkey")
+    op.execute(f"ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_pkey PRIMARY KEY USING INDEX {pk_index}")
+    for index in table.indexes:
+        op.execute(f"ALTER INDEX {index.name} RENAME TO {_legacy_name(index.name)}")
+    table.create(op.get_bind())
+    op.execute(f"ALTER TABLE {name} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{boundary}')")
+    op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {bound_check}")
+
+
+def upgrade() -> None:
+    boundary = _boundary()
+    for name in PARTITIONED_TABLES:
+        if not _is_partitioned(name):
+            _convert(Base.metadata.tables[name], boundary)
+    for stmt in FUNCTIONS_SQL:
+        op.execute(stmt)
+    for name in PARTITIONED_TABLES:
+        op.execute(ensure_sql(name, settings.partition_months_ahead))
+
+
+def _unpartition(name: str) -> None:
+    flat = f"{name}_unpartitioned"
+    # Reads keep working while the rows are copied; writes wait for the swap.
+    op.execute(f"LOCK TABLE {name} IN EXCLUSIVE MODE")
+    op.execute(f"CREATE TABLE {flat} (LIKE {name} INCLUDING DEFAULTS)")
+    op.execute(f"INSERT INTO {flat} SELECT * FROM {name}")
+    op.execute(f"DROP TABLE {name}")
+    op.execute(f"ALTER TABLE {flat} RENAME TO {name}")
+    for stmt in UNPARTITIONED_DDL[name]:
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    for name in PARTITIONED_TABLES:
+        if _is_partitioned(name):
+            _unpartition(name)
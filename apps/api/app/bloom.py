@@ -0,0 +1,57 @@
+"""NexusAI — Bloom filter.
+
+Set membership with no false negatives and a tunable false-positive rate.
+Sizing for ``n`` items at false-positive rate ``p``:
+
+    m = -n * ln(p) / ln(2)^2 bits        k = m / n * ln(2) hash functions
+
+e.g. 10M items at p = 0.001 -> m ≈ 143.8M bits (17.1 MiB), k = 10; at
+p = 0.01 -> 9.6M bits per 1M items (11.4 MiB for 10M), k = 7.
+
+Positions come from one 128-bit BLAKE2b digest split into two halves and
+combined as ``h1 + i * h2`` (Kirsch-Mitzenmacher), which keeps the
+false-positive rate of k independent hashes at the cost of one.
+"""
+
+import hashlib
+import math
+
+
+def optimal_size(capacity: int, error_rate: float) -> tuple[int, int]:
+    """``(bits, hashes)`` for ``capacity`` items at ``error_rate`` false positives."""
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    return bits, max(round(bits / capacity * math.log(2)), 1)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.bits, self.hashes = optimal_size(self.capacity, error_rate)
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: bytes):
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.bits
+        return ((h1 + i * h2) % m for i in range(self.hashes))
+
+    def add(self, item: bytes) -> None:
+        array = self._array
+        for pos in self._positions(item):
+            array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: bytes) -> bool:
+        array = self._array
+        return all(array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._array)
+
+    def estimated_error_rate(self) -> float:
+        """False-positive rate at the current fill: ``(1 - e^(-k n / m))^k``."""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
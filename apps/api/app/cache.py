@@ -1,14 +1,23 @@
-"""Redis cache client."""
+"""Redis cache client, fronted by the in-process near cache (app.near_cache).
 
-import json
-import time
-from typing import Any
+Values are stored in the binary format of app.cache_codec; entries written
+as plain JSON by older deployments are still readable.
+"""
+
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any, TypeVar
 
 import redis.asyncio as aioredis
 
+from app.cache_codec import as_type, get_codec
 from app.config import settings
+from app.near_cache import NearCache, get_near_cache
+from app.rate_limit import RateLimit, get_rate_limiter
+
+T = TypeVar("T")
 
 _redis: aioredis.Redis | None = None
+_redis_bytes: aioredis.Redis | None = None
 
 
 def get_redis() -> aioredis.Redis:
@@ -18,6 +27,14 @@ def get_redis() -> aioredis.Redis:
     return _redis
 
 
+def get_redis_bytes() -> aioredis.Redis:
+    """Client without response decoding, for codec-encoded cache values."""
+    global _redis_bytes
+    if _redis_bytes is None:
+        _redis_bytes = aioredis.from_url(settings.redis_url, decode_responses=False)
+    return _redis_bytes
+
+
 async def check_redis_health() -> bool:
     try:
         await get_redis().ping()
@@ -26,37 +43,108 @@ async def check_redis_health() -> bool:
         return False
 
 
-async def cache_get(key: str) -> Any | None:
-    data = await get_redis().get(key)
-    if data:
-        return json.loads(data)
-    return None
+def cache_namespace(key: str) -> str:
+    """Near-cache namespace of a key: ``nexus:<ns>:...`` or ``<ns>:...``."""
+    parts = key.split(":", 2)
+    return parts[1] if parts[0] == "nexus" and len(parts) > 2 else parts[0]
+
+
+def _near() -> NearCache | None:
+    return get_near_cache() if settings.near_cache_enabled else None
+
+
+async def cache_get(key: str, type_: type[T] | None = None) -> T | Any | None:
+    """Cached value for ``key``; ``type_`` builds a pydantic model or dataclass from it."""
+    near = _near()
+    if near is not None:
+        found, value = near.get(cache_namespace(key), key)
+        if found:
+            return as_type(value, type_)
+    data = await get_redis_bytes().get(key)
+    if not data:
+        return None
+    value = get_codec().decode(data)
+    if near is not None:
+        near.put(cache_namespace(key), key, value, len(data))
+    return as_type(value, type_)
+
+
+async def cache_get_many(keys: Iterable[str], type_: type[T] | None = None) -> dict[str, T | Any]:
+    """Values for every cached key in ``keys`` (misses are left out); one MGET for the near-cache misses."""
+    near = _near()
+    found: dict[str, Any] = {}
+    missing: list[str] = []
+    for key in dict.fromkeys(keys):
+        if near is not None:
+            hit, value = near.get(cache_namespace(key), key)
+            if hit:
+                found[key] = value
+                continue
+        missing.append(key)
+    if missing:
+        codec = get_codec()
+        for key, data in zip(missing, await get_redis_bytes().mget(missing)):
+            if not data:
+                continue
+            found[key] = value = codec.decode(data)
+            if near is not None:
+                near.put(cache_namespace(key), key, value, len(data))
+    return {key: as_type(value, type_) for key, value in found.items()}
 
 
 async def cache_set(key: str, value: Any, ttl: int = 3600) -> None:
-    await get_redis().setex(key, ttl, json.dumps(value, default=str))
+    await get_redis_bytes().setex(key, ttl, get_codec().encode(value))
+    if (near := _near()) is not None:
+        await near.invalidate(cache_namespace(key), key)
+
+
+async def cache_set_many(mapping: dict[str, Any], ttl: int = 3600) -> None:
+    """``cache_set`` for every item, pipelined into one round trip (not atomic)."""
+    if not mapping:
+        return
+    codec = get_codec()
+    async with get_redis_bytes().pipeline(transaction=False) as pipe:
+        for key, value in mapping.items():
+            pipe.setex(key, ttl, codec.encode(value))
+        await pipe.execute()
+    if (near := _near()) is not None:
+        await near.invalidate_many([(cache_namespace(key), key) for key in mapping])
 
 
 async def cache_delete(key: str) -> None:
     await get_redis().delete(key)
+    if (near := _near()) is not None:
+        await near.invalidate(cache_namespace(key), key)
+
+
+async def cache_get_or_load(key: str, loader: Callable[[], Awaitable[Any]], ttl: int = 3600) -> Any:
+    """Near cache → Redis → ``loader``, with one concurrent load per key in this worker.
+
+    A ``None`` result from ``loader`` is returned but not cached.
+    """
+    codec = get_codec()
+
+    async def load() -> tuple[Any, int]:
+        data = await get_redis_bytes().get(key)
+        if not data:
+            value = await loader()
+            if value is None:
+                return None, 0
+            data = codec.encode(value)
+            await get_redis_bytes().setex(key, ttl, data)
+        return codec.decode(data), len(data)
+
+    near = _near()
+    if near is None:
+        return (await load())[0]
+    return await near.get_or_load(cache_namespace(key), key, load, ttl)
 
 
 async def rate_limit_check(key: str, limit: int, window_seconds: int = 60) -> tuple[bool, int]:
-    """Sliding window rate limit. Returns (allowed, remaining)."""
-    lua = """
-    local key = KEYS[1]
-    local limit = tonumber(ARGV[1])
-    local window = tonumber(ARGV[2])
-    local now = tonumber(ARGV[3])
-    redis.call('ZREMRANGEBYSCORE', key, 0, now - window * 1000)
-    local count = redis.call('ZCARD', key)
-    if count < limit then
-        redis.call('ZADD', key, now, now)
-        redis.call('EXPIRE', key, window)
-        return {1, limit - count - 1}
-    end
-    return {0, 0}
+    """Rate limit of ``limit`` requests per ``window_seconds``. Returns (allowed, remaining).
+
+    Thin wrapper over ``app.rate_limit``; use ``get_rate_limiter().check`` for
+    multi-key checks, request costs and response headers.
     """
-    now = int(time.time() * 1000)
-    result = await get_redis().eval(lua, 1, key, limit, window_seconds, now)
-    return bool(result[0]), int(result[1])
+    result = await get_rate_limiter().check(RateLimit(key, limit, window_seconds))
+    return result.allowed, result.remaining
@@ -0,0 +1,122 @@
+"""
+NexusAI — Cache Codec
+Binary encoding for Redis cache values.
+
+Layout: one header byte, then the body.
+
+    0x01 orjson          0x03 orjson + zlib     0x05 orjson + zstd
+    0x02 msgpack         0x04 msgpack + zlib    0x06 msgpack + zstd
+
+Bodies above ``compress_threshold`` bytes are compressed (zstd when
+``zstandard`` is installed, zlib otherwise). No JSON text starts with a byte
+in 0x01-0x06, so values written before this codec existed are recognised
+and decoded as plain JSON.
+"""
+
+import dataclasses
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, TypeVar
+from uuid import UUID
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+T = TypeVar("T")
+
+SERIALIZER_ORJSON = 0x01
+SERIALIZER_MSGPACK = 0x02
+ZLIB = 0x02  # header offset for a zlib-compressed body
+ZSTD = 0x04  # header offset for a zstd-compressed body
+MAX_HEADER = 0x06
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, UUID | Decimal):
+        return str(value)
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+class CacheCodec:
+    def __init__(self, serializer: str = "msgpack", compress_threshold: int = 1024, level: int = 3):
+        if serializer == "msgpack" and msgpack is None:
+            serializer = "orjson"
+        self.serializer = SERIALIZER_MSGPACK if serializer == "msgpack" else SERIALIZER_ORJSON
+        self.compress_threshold = compress_threshold
+        self.level = level
+        self._zstd_c = zstandard.ZstdCompressor(level=level) if zstandard else None
+        self._zstd_d = zstandard.ZstdDecompressor() if zstandard else None
+
+    def encode(self, value: Any) -> bytes:
+        if self.serializer == SERIALIZER_MSGPACK:
+            body = msgpack.packb(value, default=_default, use_bin_type=True)
+        else:
+            body = orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        header = self.serializer
+        if self.compress_threshold and len(body) > self.compress_threshold:
+            if self._zstd_c is not None:
+                body, header = self._zstd_c.compress(body), header + ZSTD
+            else:
+                body, header = zlib.compress(body, min(self.level, 9)), header + ZLIB
+        return bytes((header,)) + body
+
+    def decode(self, raw: bytes, type_: type[T] | None = None) -> T | Any:
+        """Decode ``raw``; ``type_`` builds a pydantic model or dataclass from the result."""
+        header = raw[0]
+        if not 0 < header <= MAX_HEADER:
+            value = json.loads(raw)
+        else:
+            body = memoryview(raw)[1:]
+            if header > ZSTD:
+                if self._zstd_d is None:
+                    raise ValueError("zstd-compressed cache value but zstandard is not installed")
+                body, header = self._zstd_d.decompress(body), header - ZSTD
+            elif header > ZLIB:
+                body, header = zlib.decompress(body), header - ZLIB
+            if header == SERIALIZER_MSGPACK:
+                if msgpack is None:
+                    raise ValueError("msgpack cache value but msgpack is not installed")
+                value = msgpack.unpackb(body, raw=False, strict_map_key=False)
+            else:
+                value = orjson.loads(body)
+        return as_type(value, type_)
+
+
+def as_type(value: Any, type_: type[T] | None) -> T | Any:
+    """Build ``type_`` (pydantic model, dataclass or plain callable) from a decoded value."""
+    if type_ is None or value is None:
+        return value
+    if hasattr(type_, "model_validate"):
+        return type_.model_validate(value)
+    if dataclasses.is_dataclass(type_):
+        return type_(**value)
+    return type_(value)
+
+
+_codec: CacheCodec | None = None
+
+
+def get_codec() -> CacheCodec:
+    global _codec
+    if _codec is None:
+        from app.config import settings
+
+        _codec = CacheCodec(settings.cache_serializer, settings.cache_compress_threshold_bytes)
+    return _codec
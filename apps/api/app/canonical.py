@@ -0,0 +1,122 @@
+"""
+NexusAI — Canonical JSON
+Byte-exact, language-neutral JSON encoding for anything that gets hashed or
+signed (audit chains, checkpoints). The format is specified in
+docs/audit-canonical-json.md; any change to the output here is a new hash
+version, never an edit.
+
+orjson produces the canonical form natively; a pure-stdlib encoder produces
+the same bytes when orjson is not installed.
+"""
+
+import json
+import math
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised where orjson is absent
+    orjson = None
+
+INT_MIN = -(2**63)
+INT_MAX = 2**64 - 1
+
+
+class CanonicalEncodingError(TypeError):
+    pass
+
+
+def format_datetime(value: datetime) -> str:
+    """UTC, microsecond precision, ``Z`` suffix. Naive datetimes are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.astimezone(UTC).replace(tzinfo=None).isoformat(timespec="microseconds") + "Z"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise CanonicalEncodingError(f"cannot canonically encode {type(value).__name__}")
+
+
+def format_float(value: float) -> str:
+    """Shortest round-trip digits; decimal for exponents in [-5, 16), else ``<m>e<exp>``."""
+    if not math.isfinite(value):
+        return "null"
+    text = repr(value)
+    if "e" not in text:
+        return text
+    mantissa, exp = text.split("e")
+    exponent = int(exp)
+    if exponent == -5:
+        digits = mantissa.lstrip("-").replace(".", "")
+        return f"{'-' if value < 0 else ''}0.0000{digits}"
+    return f"{mantissa}e{exponent}"
+
+
+def _encode(value: Any, out: list[str]) -> None:
+    if value is None:
+        out.append("null")
+    elif value is True:
+        out.append("true")
+    elif value is False:
+        out.append("false")
+    elif isinstance(value, str):
+        out.append(json.dumps(value, ensure_ascii=False))
+    elif isinstance(value, int):
+        if not INT_MIN <= value <= INT_MAX:
+            raise CanonicalEncodingError("integer out of 64-bit range")
+        out.append(str(int(value)))
+    elif isinstance(value, float):
+        out.append(format_float(value))
+    elif isinstance(value, dict):
+        out.append("{")
+        for i, key in enumerate(sorted(value)):
+            if not isinstance(key, str):
+                raise CanonicalEncodingError("object keys must be strings")
+            if i:
+                out.append(",")
+            out.append(json.dumps(key, ensure_ascii=False))
+            out.append(":")
+            _encode(value[key], out)
+        out.append("}")
+    elif isinstance(value, list | tuple):
+        out.append("[")
+        for i, item in enumerate(value):
+            if i:
+                out.append(",")
+            _encode(item, out)
+        out.append("]")
+    else:
+        _encode(_default(value), out)
+
+
+def dumps_stdlib(value: Any) -> bytes:
+    out: list[str] = []
+    _encode(value, out)
+    return "".join(out).encode("utf-8")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def dumps(value: Any) -> bytes:
+        try:
+            return orjson.dumps(value, default=_default, option=_OPTIONS)
+        except orjson.JSONEncodeError as exc:
+            raise CanonicalEncodingError(str(exc)) from exc
+
+else:
+    dumps = dumps_stdlib
@@ -20,13 +20,44 @@ class Settings(BaseSettings):
     db_pool_size: int = 10
     db_max_overflow: int = 20
     db_pool_timeout: int = 30
+    database_replica_url: str = ""
+    db_replica_pool_size: int = 10
+    db_replica_max_overflow: int = 10
+    db_replica_max_lag_seconds: float = 5.0
+    db_replica_lag_check_seconds: float = 1.0
+    db_read_your_writes_seconds: float = 5.0
+    db_pool_warm_connections: int = 4
+    startup_warmup_timeout_seconds: float = 10.0
 
     redis_url: str = "redis://localhost:6379/0"
+    near_cache_enabled: bool = True
+    near_cache_ttl_seconds: float = 5.0
+    near_cache_max_entries: int = 10_000
+    cache_serializer: str = "msgpack"  # msgpack | orjson
+    cache_compress_threshold_bytes: int = 1024
 
     jwt_secret: str = "nexusai-jwt-secret-change-this-in-production-32chars+"
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 60
     jwt_refresh_expire_days: int = 30
+    jwt_claims_cache_size: int = 10_000
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64
+    login_attempts_per_ip: int = 30  # per minute
+    login_attempts_per_email: int = 10  # per login_email_window_seconds
+    login_email_window_seconds: int = 900
+    auth_context_ttl_seconds: int = 60
+    auth_context_negative_ttl_seconds: int = 10
+    api_key_filter_enabled: bool = True
+    api_key_filter_capacity: int = 1_000_000  # 1.7 MiB per worker at 0.1% false positives
+    api_key_filter_error_rate: float = 0.001
+    api_key_filter_rebuild_seconds: int = 3600
+    api_key_usage_flush_interval_ms: int = 30_000
+
+    rate_limit_enabled: bool = True
+    rate_limit_tokens_per_unit: int = 2048  # inference requests cost ceil(max_tokens / this)
+    rate_limit_max_body_bytes: int = 1_048_576  # token-weighted bodies are buffered; larger ones get 413
 
     master_encryption_key: str = "0" * 64
 
@@ -65,11 +96,36 @@ class Settings(BaseSettings):
 
     global_daily_budget_usd: float = 10_000.0
     cost_alert_threshold_pct: float = 0.80
+    cost_flush_interval_ms: int = 250
+    cost_flush_max_entries: int = 500
+    cost_max_unflushed_usd: float = 5.0
+    cost_persist_interval_ms: int = 1000
+    cost_persist_batch_size: int = 500
+    cost_persist_max_buffer: int = 50_000
+    budget_snapshot_ttl_seconds: float = 2.0
+    stats_flush_interval_ms: int = 1000
 
     enable_rag: bool = True
     enable_code_studio: bool = True
     enable_webhooks: bool = True
     enable_audit_chain: bool = True
+    audit_flush_interval_ms: int = 200
+    audit_batch_size: int = 500
+    audit_max_buffer: int = 20_000
+    audit_inline_flush_backoff_seconds: float = 1.0
+    audit_segment_size: int = 4096
+    audit_verify_workers: int = 0
+    audit_verify_max_segments: int = 16
+    audit_hash_version: int = 2
+    audit_export_page_size: int = 1000
+    inference_export_page_size: int = 1000
+    inference_log_flush_interval_ms: int = 1000
+    inference_log_batch_size: int = 1000
+    inference_log_max_buffer: int = 20_000
+    inference_log_spill_after_failures: int = 3
+    inference_log_spill_dir: str = "/tmp/nexusai/inference-log-spill"
+    inference_log_spill_max_bytes: int = 1024 * 1024 * 1024
+    partition_months_ahead: int = 3
     enable_pii_detection: bool = True
 
     @property
@@ -2,9 +2,10 @@
 
 from collections.abc import AsyncGenerator
 
-from sqlalchemy import text
+from fastapi import Request
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 
 from app.config import settings
 
@@ -19,14 +20,44 @@ engine = create_async_engine(
 
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+# Optional streaming replica for read-only endpoints (see app/read_replica.py).
+replica_engine = (
+    create_async_engine(
+        settings.database_replica_url,
+        pool_size=settings.db_replica_pool_size,
+        max_overflow=settings.db_replica_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=True,
+        echo=settings.is_development,
+    )
+    if settings.database_replica_url
+    else None
+)
+
+ReplicaSessionLocal = async_sessionmaker(replica_engine, expire_on_commit=False) if replica_engine else None
+
+
+@event.listens_for(Session, "after_flush")
+def _flagged_flush(session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flagged_dml(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
 
 class Base(DeclarativeBase):
     pass
 
 
 async def create_tables() -> None:
+    from app.partitions import ensure_partitions
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await ensure_partitions(conn)
 
 
 async def check_db_health() -> bool:
@@ -38,7 +69,7 @@ async def check_db_health() -> bool:
         return False
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -46,3 +77,7 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+        if session.info.get("wrote"):
+            from app.read_replica import get_replica_router
+
+            get_replica_router().mark_write(getattr(request.state, "tenant_id", ""))
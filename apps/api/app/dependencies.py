@@ -4,15 +4,11 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import settings
-from app.database import get_db
+from app.middleware.auth_middleware import request_claims
 from app.models.api_key import APIKey
-from app.models.tenant import Tenant
-from app.models.user import User
+from app.services.auth_context import get_auth_context
+from app.services.key_usage import get_key_usage_tracker
 from app.services.nexus_orchestrator import NexusOrchestrator
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token", auto_error=False)
@@ -29,83 +25,70 @@ def get_nexus() -> NexusOrchestrator:
 
 
 async def get_current_user(
+    request: Request,
     token: Annotated[str | None, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(get_db)],
 ) -> dict:
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        user_id: str = payload.get("sub", "")
-    except JWTError:
+    claims = request_claims(request)
+    if claims is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    result = await db.execute(select(User).where(User.id == user_id, User.is_active.is_(True)))
-    user = result.scalar_one_or_none()
+    user = await get_auth_context().user(claims.get("sub", ""))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return {"id": user.id, "email": user.email, "role": user.role, "tenant_id": user.tenant_id}
+    return dict(user)
 
 
-async def get_current_tenant(
-    request: Request,
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> dict:
+async def get_current_tenant(request: Request) -> dict:
     tenant_id = request.headers.get("X-Tenant-ID") or getattr(request.state, "tenant_id", "")
 
     if not tenant_id:
-        auth_header = request.headers.get("Authorization", "")
-        if auth_header.startswith("Bearer "):
-            token = auth_header.removeprefix("Bearer ").strip()
-            try:
-                payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-                tenant_id = payload.get("tenant_id", "")
-            except JWTError:
-                tenant_id = ""
+        claims = request_claims(request)
+        tenant_id = claims.get("tenant_id", "") if claims else ""
 
     if not tenant_id:
         raw_api_key = request.headers.get("X-API-Key", "")
         if raw_api_key:
-            key_hash = APIKey.hash(raw_api_key)
-            key_result = await db.execute(
-                select(APIKey).where(APIKey.key_hash == key_hash, APIKey.is_active.is_(True))
-            )
-            key = key_result.scalar_one_or_none()
-            tenant_id = key.tenant_id if key else ""
+            key = await get_auth_context().api_key(APIKey.hash(raw_api_key))
+            if key:
+                track_key_use(request, key)
+            tenant_id = key["tenant_id"] if key else ""
 
     if not tenant_id:
         raise HTTPException(status_code=400, detail="Tenant context not found")
 
-    result = await db.execute(select(Tenant).where(Tenant.id == tenant_id, Tenant.status == "active"))
-    tenant = result.scalar_one_or_none()
+    tenant = await get_auth_context().tenant(tenant_id)
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
+    request.state.tenant_id = tenant["id"]  # read-your-writes key for get_db / get_read_db
     return {
-        "id": tenant.id,
-        "name": tenant.name,
-        "plan": tenant.plan,
-        "nexus_enabled": tenant.nexus_enabled,
-        "daily_budget_usd": tenant.daily_budget_usd,
+        "id": tenant["id"],
+        "name": tenant["name"],
+        "plan": tenant["plan"],
+        "nexus_enabled": tenant["nexus_enabled"],
+        "daily_budget_usd": tenant["daily_budget_usd"],
     }
 
 
 async def get_api_key_context(
+    request: Request,
     api_key: Annotated[str | None, Depends(api_key_header)],
-    db: Annotated[AsyncSession, Depends(get_db)],
 ) -> dict | None:
     if not api_key:
         return None
-    key_hash = APIKey.hash(api_key)
-    result = await db.execute(select(APIKey).where(APIKey.key_hash == key_hash, APIKey.is_active.is_(True)))
-    key = result.scalar_one_or_none()
+    key = await get_auth_context().api_key(APIKey.hash(api_key))
     if not key:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
-    return {
-        "id": key.id,
-        "tenant_id": key.tenant_id,
-        "permissions": key.permissions,
-        "rate_limit_rpm": key.rate_limit_rpm,
-    }
+    track_key_use(request, key)
+    return dict(key)
+
+
+def track_key_use(request: Request, key: dict) -> None:
+    """Count one use of ``key`` per request, however many dependencies resolve it."""
+    if getattr(request.state, "api_key_id", None) != key["id"]:
+        request.state.api_key_id = key["id"]
+        get_key_usage_tracker().record(key["id"])
 
 
 def require_role(*roles: str):
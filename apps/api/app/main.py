@@ -1,21 +1,21 @@
 """NexusAI — FastAPI main application entrypoint."""
 
 import time
+
+_import_started = time.perf_counter()
+
+from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
 
 import structlog
 from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 
 from app.cache import check_redis_health
 from app.config import settings
-from app.database import check_db_health, create_tables
-from app.middleware.auth_middleware import AuthMiddleware
-from app.middleware.cost_circuit_breaker import CostCircuitBreakerMiddleware
-from app.middleware.tenant_middleware import TenantMiddleware
+from app.database import check_db_health
+from app.middleware.pipeline import middleware_pipeline
+from app.near_cache import get_near_cache
 from app.routers import (
     api_keys,
     auth,
@@ -31,15 +31,27 @@ from app.routers import (
     users,
     webhooks,
 )
+from app.services.api_key_filter import get_api_key_filter
+from app.services.flusher import stop_flushers
+from app.startup import start
 
 log = structlog.get_logger(__name__)
 
+IMPORT_MS = (time.perf_counter() - _import_started) * 1000
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator:
     log.info("nexusai.startup", env=settings.environment, version="3.0.0")
-    await create_tables()
+    await start(import_ms=IMPORT_MS)
+    if settings.near_cache_enabled:
+        get_near_cache().start_listener()
+    if settings.api_key_filter_enabled:
+        get_api_key_filter().start()
     yield
+    await get_api_key_filter().stop()
+    await get_near_cache().stop_listener()
+    await stop_flushers()
     log.info("nexusai.shutdown")
 
 
@@ -50,31 +62,9 @@ app = FastAPI(
     docs_url="/docs" if settings.is_development else None,
     redoc_url="/redoc" if settings.is_development else None,
     lifespan=lifespan,
+    middleware=middleware_pipeline(),
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["X-Request-ID", "X-Tenant-ID", "X-Cost-USD", "X-Latency-MS"],
-)
-app.add_middleware(CostCircuitBreakerMiddleware)
-app.add_middleware(TenantMiddleware)
-app.add_middleware(AuthMiddleware)
-
-
-@app.middleware("http")
-async def add_timing_headers(request: Request, call_next):
-    start = time.monotonic()
-    response = await call_next(request)
-    elapsed = (time.monotonic() - start) * 1000
-    response.headers["X-Latency-MS"] = f"{elapsed:.2f}"
-    return response
-
-
 PREFIX = "/api/v1"
 
 app.include_router(auth.router, prefix=f"{PREFIX}/auth", tags=["Auth"])
@@ -122,4 +112,4 @@ async def global_exception_handler(request: Request, exc: Exception):
     return JSONResponse(
         status_code=500,
         content={"detail": "Internal server error", "type": type(exc).__name__},
-    )
\ No newline at end of file
+    )
@@ -1,8 +1,17 @@
-"""Auth middleware — validates JWT or API key on every request."""
+"""Auth middleware — requires credentials and verifies the bearer token once per request.
 
-from starlette.middleware.base import BaseHTTPMiddleware
+The verified claims (``None`` for an invalid or missing token) are put on
+the request scope as ``request.state.claims``; dependencies and later
+middleware read them from there instead of decoding the JWT again.
+"""
+
+from starlette.datastructures import Headers
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.auth_context import get_auth_context
+from app.services.token_verifier import get_token_verifier
 
 PUBLIC_PATHS = {
     "/health",
@@ -14,16 +23,53 @@ PUBLIC_PATHS = {
     "/api/v1/auth/register",
 }
 
+_UNSET = object()
+
+
+def bearer_token(authorization: str) -> str:
+    return authorization.removeprefix("Bearer ").strip() if authorization.startswith("Bearer ") else ""
+
+
+def request_claims(request: Request) -> dict | None:
+    """Verified JWT claims for this request, verifying only if the middleware hasn't."""
+    claims = getattr(request.state, "claims", _UNSET)
+    if claims is _UNSET:
+        token = bearer_token(request.headers.get("Authorization", ""))
+        claims = get_token_verifier().verify(token) if token else None
+        request.state.claims = claims
+    return claims
+
+
+async def authenticated_tenant_id(scope: Scope) -> str:
+    """Tenant of the verified JWT, else of the API key; ``""`` if neither resolves. Never the X-Tenant-ID header."""
+    state = scope.setdefault("state", {})
+    if "auth_tenant_id" not in state:
+        tenant_id = (state.get("claims") or {}).get("tenant_id") or ""
+        if not tenant_id and (raw_key := Headers(scope=scope).get("x-api-key")):
+            from app.models.api_key import APIKey
+
+            key = await get_auth_context().api_key(APIKey.hash(raw_key))
+            tenant_id = key["tenant_id"] if key else ""
+        state["auth_tenant_id"] = tenant_id
+    return state["auth_tenant_id"]
+
+
+class AuthMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        if request.url.path in PUBLIC_PATHS or request.url.path.startswith("/api/v1/auth"):
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path in PUBLIC_PATHS or path.startswith("/api/v1/auth"):
+            return await self.app(scope, receive, send)
 
-        auth = request.headers.get("Authorization", "")
-        api_key = request.headers.get("X-API-Key", "")
+        headers = Headers(scope=scope)
+        auth = headers.get("authorization", "")
+        api_key = headers.get("x-api-key", "")
 
         if not auth and not api_key:
-            return JSONResponse({"detail": "Not authenticated"}, status_code=401)
+            return await JSONResponse({"detail": "Not authenticated"}, status_code=401)(scope, receive, send)
 
-        return await call_next(request)
+        token = bearer_token(auth)
+        scope.setdefault("state", {})["claims"] = get_token_verifier().verify(token) if token else None
+        await self.app(scope, receive, send)
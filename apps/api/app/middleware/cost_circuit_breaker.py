@@ -1,22 +1,33 @@
 """Cost circuit breaker — stops requests when budget exceeded."""
 
 import structlog
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.middleware.auth_middleware import authenticated_tenant_id
+from app.services.budget_enforcer import get_budget_enforcer
 
 log = structlog.get_logger(__name__)
 
 INFERENCE_PATHS = {"/api/v1/nexus/chat", "/api/v1/nexus/stream"}
 
 
-class CostCircuitBreakerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        if request.url.path not in INFERENCE_PATHS:
-            return await call_next(request)
+class CostCircuitBreakerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("path", "") not in INFERENCE_PATHS:
+            return await self.app(scope, receive, send)
 
-        tenant_id = request.headers.get("X-Tenant-ID", "")
-        if tenant_id:
-            log.debug("cost.breaker.check", tenant_id=tenant_id)
+        try:
+            tenant_id = await authenticated_tenant_id(scope)
+        except Exception as exc:
+            # Same stance as rate limiting: an unavailable auth cache must not take the API down.
+            log.warning("cost.breaker.context.failed", error=str(exc))
+            tenant_id = ""
+        if tenant_id and get_budget_enforcer().is_over_budget(tenant_id):
+            log.warning("cost.breaker.open", tenant_id=tenant_id)
+            return await JSONResponse({"detail": "Daily budget exceeded"}, status_code=402)(scope, receive, send)
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -0,0 +1,48 @@
+"""Middleware pipeline — the request path, outermost first, as pure ASGI layers.
+
+No layer is a ``BaseHTTPMiddleware``: each one is a single call that at most
+wraps ``send`` to add response headers. So a request costs no extra task or
+memory stream per layer, and streamed responses (``/nexus/stream``) reach the
+client chunk by chunk, untouched.
+"""
+
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+
+from app.config import settings
+from app.middleware.auth_middleware import AuthMiddleware
+from app.middleware.cost_circuit_breaker import CostCircuitBreakerMiddleware
+from app.middleware.rate_limit_middleware import RateLimitMiddleware
+from app.middleware.tenant_middleware import TenantMiddleware
+from app.middleware.timing_middleware import TimingMiddleware
+
+EXPOSE_HEADERS = [
+    "X-Request-ID",
+    "X-Tenant-ID",
+    "X-Cost-USD",
+    "X-Latency-MS",
+    "RateLimit-Limit",
+    "RateLimit-Remaining",
+    "RateLimit-Reset",
+    "Retry-After",
+]
+
+
+def middleware_pipeline() -> list[Middleware]:
+    return [
+        Middleware(TimingMiddleware),
+        Middleware(AuthMiddleware),
+        Middleware(RateLimitMiddleware),
+        Middleware(TenantMiddleware),
+        Middleware(CostCircuitBreakerMiddleware),
+        Middleware(
+            CORSMiddleware,
+            allow_origins=settings.cors_origins,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+            expose_headers=EXPOSE_HEADERS,
+        ),
+        Middleware(GZipMiddleware, minimum_size=1000),
+    ]
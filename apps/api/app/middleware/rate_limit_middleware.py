@@ -0,0 +1,149 @@
+"""Rate limit middleware — enforces tenant and API-key RPM before any handler runs.
+
+Pure ASGI (no BaseHTTPMiddleware), so a rejected request costs one cached
+context lookup and one Redis round trip, never a DB session. Inference
+requests are weighted by ``max_tokens``, which means buffering their body;
+bodies over ``rate_limit_max_body_bytes`` are refused with 413 before that.
+"""
+
+import math
+
+import orjson
+import structlog
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.middleware.auth_middleware import PUBLIC_PATHS, authenticated_tenant_id
+from app.rate_limit import RateLimit, RateLimitResult, get_rate_limiter
+from app.services.auth_context import get_auth_context
+
+log = structlog.get_logger(__name__)
+
+TOKEN_WEIGHTED_PATHS = {"/api/v1/nexus/chat", "/api/v1/nexus/stream", "/api/v1/nexus/compare"}
+DEFAULT_MAX_TOKENS = 2048  # ChatRequest.max_tokens default
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or not settings.rate_limit_enabled
+            or path in PUBLIC_PATHS
+            or path.startswith("/api/v1/auth")
+        ):
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        try:
+            limits = await self._limits(scope, headers)
+        except Exception as exc:
+            log.warning("rate_limit.context.failed", path=path, error=str(exc))
+            limits = []
+        if not limits:
+            return await self.app(scope, receive, send)
+
+        if path in TOKEN_WEIGHTED_PATHS and scope["method"] == "POST":
+            try:
+                body, receive = await _buffer_body(receive, headers, settings.rate_limit_max_body_bytes)
+            except _BodyTooLargeError:
+                response = JSONResponse({"detail": "Request body too large"}, status_code=413)
+                return await response(scope, receive, send)
+            cost = _token_cost(body)
+            limits = [RateLimit(rl.key, rl.limit, rl.period, cost) for rl in limits]
+
+        try:
+            result = await get_rate_limiter().check(*limits)
+        except Exception as exc:
+            # Fail open: an unavailable Redis must not take the API down with it.
+            log.warning("rate_limit.check.failed", path=path, error=str(exc))
+            return await self.app(scope, receive, send)
+
+        if not result.allowed:
+            log.info("rate_limit.rejected", key=result.key, retry_after=result.retry_after)
+            response = JSONResponse({"detail": "Rate limit exceeded"}, status_code=429, headers=result.headers())
+            return await response(scope, receive, send)
+
+        await self.app(scope, receive, _with_headers(send, result))
+
+    async def _limits(self, scope: Scope, headers: Headers) -> list[RateLimit]:
+        from app.models.api_key import APIKey
+
+        contexts = get_auth_context()
+        limits = []
+        if raw_key := headers.get("x-api-key"):
+            key = await contexts.api_key(APIKey.hash(raw_key))
+            if key is not None:
+                limits.append(RateLimit(f"key:{key['id']}", key["rate_limit_rpm"]))
+        # Only the verified JWT or API key names the tenant: a spoofed X-Tenant-ID
+        # (AuthMiddleware only checks that a bearer is present) can't drain someone else's quota.
+        tenant_id = await authenticated_tenant_id(scope)
+        if tenant_id and (tenant := await contexts.tenant(tenant_id)) is not None:
+            limits.append(RateLimit(f"tenant:{tenant['id']}", tenant["rate_limit_rpm"]))
+        return limits
+
+
+def _token_cost(body: bytes) -> int:
+    try:
+        max_tokens = int(orjson.loads(body).get("max_tokens") or DEFAULT_MAX_TOKENS)
+    except (orjson.JSONDecodeError, AttributeError, TypeError, ValueError):
+        max_tokens = DEFAULT_MAX_TOKENS
+    return max(math.ceil(max_tokens / settings.rate_limit_tokens_per_unit), 1)
+
+
+class _BodyTooLargeError(Exception):
+    pass
+
+
+async def _buffer_body(receive: Receive, headers: Headers, max_bytes: int) -> tuple[bytes, Receive]:
+    """Read the whole request body and return it with a ``receive`` that replays it.
+
+    Raises ``_BodyTooLargeError`` as soon as the declared ``Content-Length``
+    or the bytes actually received exceed ``max_bytes``.
+    """
+    try:
+        declared = int(headers.get("content-length", 0))
+    except ValueError:
+        declared = 0
+    if declared > max_bytes:
+        raise _BodyTooLargeError
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > max_bytes:
+            raise _BodyTooLargeError
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
+
+
+def _with_headers(send: Send, result: RateLimitResult) -> Send:
+    extra = [(k.lower().encode(), v.encode()) for k, v in result.headers().items()]
+
+    async def wrapped(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            message["headers"] = [*message.get("headers", []), *extra]
+        await send(message)
+
+    return wrapped
@@ -1,14 +1,23 @@
 """Tenant context middleware — injects tenant info into request state."""
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-
-
-class TenantMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        tenant_id = request.headers.get("X-Tenant-ID", "")
-        request.state.tenant_id = tenant_id
-        response = await call_next(request)
-        response.headers["X-Tenant-ID"] = tenant_id
-        return response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class TenantMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        tenant_id = Headers(scope=scope).get("x-tenant-id", "")
+        scope.setdefault("state", {})["tenant_id"] = tenant_id
+
+        async def send_with_tenant(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Tenant-ID"] = tenant_id
+            await send(message)
+
+        await self.app(scope, receive, send_with_tenant)
@@ -0,0 +1,24 @@
+"""Timing middleware — ``X-Latency-MS``: time until the response headers are sent."""
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class TimingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.monotonic()
+
+        async def send_with_latency(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Latency-MS"] = f"{(time.monotonic() - start) * 1000:.2f}"
+            await send(message)
+
+        await self.app(scope, receive, send_with_latency)
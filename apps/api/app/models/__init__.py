@@ -7,8 +7,8 @@ from app.models.api_key import APIKey
 from app.models.inference_log import InferenceLog
 from app.models.pipeline import Pipeline
 from app.models.knowledge_base import KnowledgeBase, Document
-from app.models.cost_record import CostRecord
-from app.models.audit_log import AuditLog
+from app.models.cost_record import CostRecord, DailyCostAggregate
+from app.models.audit_log import AuditChainHead, AuditCheckpoint, AuditLog
 
 __all__ = [
     "Tenant",
@@ -19,5 +19,8 @@ __all__ = [
     "KnowledgeBase",
     "Document",
     "CostRecord",
+    "DailyCostAggregate",
     "AuditLog",
+    "AuditChainHead",
+    "AuditCheckpoint",
 ]
@@ -1,9 +1,9 @@
 """Audit log — append-only, hash-chained."""
 
 import uuid
-from datetime import datetime, timezone
+from datetime import UTC, datetime
 
-from sqlalchemy import DateTime, JSON, String
+from sqlalchemy import BigInteger, DateTime, Index, Integer, JSON, LargeBinary, SmallInteger, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -11,9 +11,19 @@ from app.database import Base
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Not unique: a partitioned table's unique keys must include created_at.
+        # seq stays unique per tenant because appends serialize on AuditChainHead.
+        Index("ix_audit_logs_tenant_seq", "tenant_id", "seq"),
+        # Keyset pagination / export order: WHERE tenant_id = ? AND (created_at, id) > (?, ?)
+        Index("ix_audit_logs_tenant_created_id", "tenant_id", "created_at", "id"),
+        # Monthly partitions (app/partitions.py).
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
     actor_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
 
     event: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -26,5 +36,46 @@ class AuditLog(Base):
 
     entry_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     prev_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # 1 = legacy json.dumps hashing, 2 = canonical JSON (docs/audit-canonical-json.md).
+    hash_version: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=1, server_default="1")
 
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(UTC)
+    )
+
+
+class AuditChainHead(Base):
+    """Last link of each tenant's chain — row-locked by writers to serialize appends."""
+
+    __tablename__ = "audit_chain_heads"
+
+    tenant_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    seq: Mapped[int] = mapped_column(BigInteger, default=0)
+    last_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+    )
+
+
+class AuditCheckpoint(Base):
+    """Signed summary of one sealed segment of a tenant chain.
+
+    ``tree`` holds every Merkle level of the segment concatenated (32 bytes
+    per node, leaves first), so a membership proof only reads the log2(n)
+    sibling slices it needs.
+    """
+
+    __tablename__ = "audit_checkpoints"
+
+    tenant_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    segment: Mapped[int] = mapped_column(Integer, primary_key=True)
+    first_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    prev_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    last_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    merkle_root: Mapped[str] = mapped_column(String(64), nullable=False)
+    tree: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    signature: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC))
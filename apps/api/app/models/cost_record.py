@@ -3,7 +3,7 @@
 import uuid
 from datetime import date, datetime, timezone
 
-from sqlalchemy import Date, DateTime, Float, ForeignKey, Integer, JSON, String
+from sqlalchemy import Date, DateTime, Float, ForeignKey, Index, Integer, JSON, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -11,6 +11,11 @@ from app.database import Base
 
 class CostRecord(Base):
     __tablename__ = "cost_records"
+    __table_args__ = (
+        Index("ix_cost_records_tenant_period", "tenant_id", "period_date"),
+        # Monthly partitions (app/partitions.py); unique keys must include created_at.
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id: Mapped[str] = mapped_column(String(36), ForeignKey("tenants.id"), nullable=False)
@@ -24,11 +29,14 @@ class CostRecord(Base):
     cost_usd: Mapped[float] = mapped_column(Float, nullable=False)
 
     period_date: Mapped[date] = mapped_column(Date, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc)
+    )
 
 
 class DailyCostAggregate(Base):
     __tablename__ = "daily_cost_aggregates"
+    __table_args__ = (UniqueConstraint("tenant_id", "period_date", name="uq_daily_cost_tenant_period"),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id: Mapped[str] = mapped_column(String(36), nullable=False)
@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, JSON, String, Text
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -11,9 +11,16 @@ from app.database import Base
 
 class InferenceLog(Base):
     __tablename__ = "inference_logs"
+    __table_args__ = (
+        # Keyset pagination, newest first: WHERE tenant_id = ? AND (created_at, id) < (?, ?)
+        Index("ix_inference_logs_tenant_created_id", "tenant_id", "created_at", "id"),
+        Index("ix_inference_logs_tenant_model_created_id", "tenant_id", "model", "created_at", "id"),
+        # Monthly partitions (app/partitions.py); unique keys must include created_at.
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    request_id: Mapped[str] = mapped_column(String(36), unique=True, nullable=False)
+    request_id: Mapped[str] = mapped_column(String(36), index=True, nullable=False)
     tenant_id: Mapped[str] = mapped_column(String(36), ForeignKey("tenants.id"), nullable=False)
     user_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
     api_key_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
@@ -43,4 +50,6 @@ class InferenceLog(Base):
     status_code: Mapped[int] = mapped_column(Integer, default=200)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc)
+    )
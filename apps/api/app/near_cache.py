@@ -0,0 +1,313 @@
+"""
+NexusAI — Near Cache
+In-process tier in front of Redis for hot, read-mostly keys.
+
+- Per-namespace policy: LRU bound on entries, fresh TTL and a stale window.
+- Stampede protection: one in-flight load per key (single-flight); within the
+  stale window the old value is served while one background refresh runs.
+- Cross-worker invalidation over Redis pub/sub; after a listener reconnect
+  every namespace is cleared, since invalidations may have been missed.
+- Per-namespace stats: hits, misses, stale hits, loads, evictions, bytes.
+
+Values are shared between callers and must be treated as read-only.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from app.config import settings
+
+log = structlog.get_logger(__name__)
+
+INVALIDATION_CHANNEL = "nexus:cache:invalidate"
+ALL_KEYS = "*"
+_SEP = "\x1f"
+
+
+@dataclass(frozen=True)
+class NamespacePolicy:
+    max_entries: int = settings.near_cache_max_entries
+    ttl_seconds: float = settings.near_cache_ttl_seconds
+    stale_seconds: float = 0.0
+
+
+# Namespaces not listed here get NamespacePolicy() defaults from settings.
+POLICIES = {
+    "stats": NamespacePolicy(max_entries=64, ttl_seconds=1.0, stale_seconds=5.0),
+}
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+    size: int
+
+
+@dataclass
+class NamespaceStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    load_errors: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {**self.__dict__, "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0}
+
+
+@dataclass
+class _Namespace:
+    policy: NamespacePolicy
+    entries: OrderedDict[str, _Entry] = field(default_factory=OrderedDict)
+    stats: NamespaceStats = field(default_factory=NamespaceStats)
+    bytes: int = 0
+    generation: int = 0  # bumped on invalidation so in-flight loads don't resurrect old values
+
+
+class NearCache:
+    def __init__(self, policies: dict[str, NamespacePolicy] | None = None):
+        self._policies = dict(policies or {})
+        self._namespaces: dict[str, _Namespace] = {}
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+        self._refreshing: set[tuple[str, str]] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._origin = f"{os.getpid()}-{id(self):x}"
+        self._listener: asyncio.Task | None = None
+
+    def configure(self, namespace: str, policy: NamespacePolicy) -> None:
+        self._policies[namespace] = policy
+        if namespace in self._namespaces:
+            self._namespaces[namespace].policy = policy
+
+    def _ns(self, namespace: str) -> _Namespace:
+        ns = self._namespaces.get(namespace)
+        if ns is None:
+            ns = self._namespaces[namespace] = _Namespace(self._policies.get(namespace, NamespacePolicy()))
+        return ns
+
+    # ── local tier ───────────────────────────────────────────────────────────
+
+    def _lookup(self, namespace: str, key: str, allow_stale: bool) -> tuple[bool, Any, bool]:
+        """``(found, value, is_stale)``; counts the lookup in the namespace stats."""
+        ns = self._ns(namespace)
+        entry = ns.entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            if now < entry.fresh_until:
+                ns.entries.move_to_end(key)
+                ns.stats.hits += 1
+                return True, entry.value, False
+            if allow_stale and now < entry.stale_until:
+                ns.stats.stale_hits += 1
+                return True, entry.value, True
+            if now >= entry.stale_until:
+                self._remove(ns, key)
+                ns.stats.expirations += 1
+        ns.stats.misses += 1
+        return False, None, False
+
+    def get(self, namespace: str, key: str) -> tuple[bool, Any]:
+        found, value, _ = self._lookup(namespace, key, allow_stale=False)
+        return found, value
+
+    def put(self, namespace: str, key: str, value: Any, size: int = 0, ttl: float | None = None) -> None:
+        ns = self._ns(namespace)
+        ttl = ns.policy.ttl_seconds if ttl is None else min(ttl, ns.policy.ttl_seconds)
+        if ttl <= 0 or ns.policy.max_entries <= 0:
+            return
+        now = time.monotonic()
+        if key in ns.entries:
+            self._remove(ns, key)
+        ns.entries[key] = _Entry(value, now + ttl, now + ttl + ns.policy.stale_seconds, size)
+        ns.bytes += size
+        while len(ns.entries) > ns.policy.max_entries:
+            _, evicted = ns.entries.popitem(last=False)
+            ns.bytes -= evicted.size
+            ns.stats.evictions += 1
+
+    def _remove(self, ns: _Namespace, key: str) -> None:
+        entry = ns.entries.pop(key, None)
+        if entry is not None:
+            ns.bytes -= entry.size
+
+    def discard(self, namespace: str, key: str = ALL_KEYS) -> None:
+        ns = self._namespaces.get(namespace)
+        if ns is None:
+            return
+        ns.stats.invalidations += 1
+        ns.generation += 1
+        if key == ALL_KEYS:
+            ns.entries.clear()
+            ns.bytes = 0
+        else:
+            self._remove(ns, key)
+
+    def clear(self) -> None:
+        for namespace in list(self._namespaces):
+            self.discard(namespace)
+
+    # ── loading ──────────────────────────────────────────────────────────────
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[tuple[Any, int]]],
+        ttl: float | Callable[[Any], float] | None = None,
+    ) -> Any:
+        """Return the cached value or run ``loader`` once for all concurrent callers.
+
+        ``loader`` returns ``(value, size_bytes)``; a ``None`` value is not
+        cached. ``ttl`` may be a function of the loaded value. A stale hit is
+        returned immediately and refreshed in the background.
+        """
+        found, value, stale = self._lookup(namespace, key, allow_stale=True)
+        if found:
+            if stale and (namespace, key) not in self._refreshing:
+                self._refreshing.add((namespace, key))
+                task = asyncio.create_task(self._refresh(namespace, key, loader, ttl))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return value
+        return await self._load(namespace, key, loader, ttl)
+
+    async def _load(self, namespace: str, key: str, loader, ttl: float | None) -> Any:
+        while (flight := self._inflight.get((namespace, key))) is not None:
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # The caller that owned the load was cancelled; take it over.
+
+        flight = self._inflight[(namespace, key)] = asyncio.get_running_loop().create_future()
+        ns = self._ns(namespace)
+        stats, generation = ns.stats, ns.generation
+        try:
+            value, size = await loader()
+        except Exception as exc:
+            stats.load_errors += 1
+            flight.set_exception(exc)
+            flight.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            stats.loads += 1
+            if ns.generation == generation and value is not None:
+                self.put(namespace, key, value, size, ttl(value) if callable(ttl) else ttl)
+            flight.set_result(value)
+            return value
+        finally:
+            if not flight.done():
+                flight.cancel()
+            del self._inflight[(namespace, key)]
+
+    async def _refresh(self, namespace: str, key: str, loader, ttl: float | None) -> None:
+        try:
+            await self._load(namespace, key, loader, ttl)
+        except Exception as exc:
+            log.warning("near_cache.refresh.failed", namespace=namespace, key=key, error=str(exc))
+        finally:
+            self._refreshing.discard((namespace, key))
+
+    # ── cross-worker invalidation ────────────────────────────────────────────
+
+    async def invalidate(self, namespace: str, key: str = ALL_KEYS) -> None:
+        """Drop ``key`` here and tell every other worker to drop it too."""
+        self.discard(namespace, key)
+        try:
+            from app.cache import get_redis
+
+            await get_redis().publish(INVALIDATION_CHANNEL, _SEP.join((self._origin, namespace, key)))
+        except Exception as exc:
+            log.warning("near_cache.publish.failed", namespace=namespace, error=str(exc))
+
+    async def invalidate_many(self, items: list[tuple[str, str]]) -> None:
+        """``invalidate`` for several ``(namespace, key)`` pairs in one round trip."""
+        for namespace, key in items:
+            self.discard(namespace, key)
+        try:
+            from app.cache import get_redis
+
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for namespace, key in items:
+                    pipe.publish(INVALIDATION_CHANNEL, _SEP.join((self._origin, namespace, key)))
+                await pipe.execute()
+        except Exception as exc:
+            log.warning("near_cache.publish.failed", keys=len(items), error=str(exc))
+
+    def start_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(), name="near-cache-invalidation")
+
+    async def stop_listener(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        from app.cache import get_redis
+
+        backoff = 0.5
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Anything published while we were disconnected is lost.
+                self.clear()
+                backoff = 0.5
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    origin, namespace, key = message["data"].split(_SEP, 2)
+                    if origin != self._origin:
+                        self.discard(namespace, key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                log.warning("near_cache.listener.disconnected", error=str(exc), retry_in=backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                await pubsub.aclose()
+
+    # ── observability ────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                **ns.stats.as_dict(),
+                "entries": len(ns.entries),
+                "bytes": ns.bytes,
+                "max_entries": ns.policy.max_entries,
+                "ttl_seconds": ns.policy.ttl_seconds,
+                "stale_seconds": ns.policy.stale_seconds,
+            }
+            for name, ns in sorted(self._namespaces.items())
+        }
+
+
+_near_cache: NearCache | None = None
+
+
+def get_near_cache() -> NearCache:
+    global _near_cache
+    if _near_cache is None:
+        _near_cache = NearCache(POLICIES)
+    return _near_cache
@@ -0,0 +1,35 @@
+"""NexusAI — Keyset (seek) pagination helpers.
+
+A cursor is the sort key of the last row returned, so fetching the next page
+is an index range scan that costs the same on page 1 and page 10,000 —
+unlike OFFSET, which re-reads every skipped row.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Inverse of ``encode_cursor``; ``types`` coerces each value (``datetime`` is parsed from ISO)."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if len(values) != len(types):
+            raise ValueError("cursor arity mismatch")
+        return tuple(datetime.fromisoformat(v) if t is datetime else t(v) for v, t in zip(values, types))
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def after(columns: tuple, values: tuple, descending: bool = False):
+    """Row-value predicate selecting rows strictly past ``values`` in ``columns`` order."""
+    key, bound = tuple_(*columns), tuple_(*values)
+    return key < bound if descending else key > bound
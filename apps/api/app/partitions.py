@@ -0,0 +1,104 @@
+"""
+NexusAI — Table Partitioning
+Monthly ``RANGE (created_at)`` partitions for the append-only tables.
+
+Partition management lives in two PL/pgSQL functions installed by migration
+0003 (and by ``create_tables()`` in development) so every caller — Alembic,
+the API and the standalone Celery worker — runs the same code:
+
+* ``nexus_ensure_partitions(parent, months_ahead)`` creates the missing
+  monthly partitions from the newest existing one up to ``months_ahead``
+  months past the current month. Partitions are named ``<parent>_pYYYYMM``.
+* ``nexus_archive_partitions(parent, retention_months)`` detaches every
+  partition that ended more than ``retention_months`` months ago and moves
+  it to the ``archive`` schema — a metadata-only change however many rows
+  it holds. ``retention_months <= 0`` keeps everything.
+
+Both are no-ops on tables that are not partitioned yet, so they are safe to
+call before the migration has run. Bounds are computed in UTC.
+"""
+
+PARTITIONED_TABLES = ("inference_logs", "cost_records", "audit_logs")
+ARCHIVE_SCHEMA = "archive"
+
+FUNCTIONS_SQL = (
+    f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}",
+    r"""
+CREATE OR REPLACE FUNCTION nexus_partition_bounds(parent text)
+RETURNS TABLE (child text, upper_bound timestamptz)
+LANGUAGE sql STABLE AS $$
+    SELECT c.relname::text,
+           (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \(''([^'']+)''\)'))[1]::timestamptz
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = to_regclass(parent)
+$$
+""",
+    r"""
+CREATE OR REPLACE FUNCTION nexus_ensure_partitions(parent text, months_ahead int DEFAULT 3)
+RETURNS SETOF text
+LANGUAGE plpgsql SET timezone = 'UTC' AS $$
+DECLARE
+    from_ts timestamptz;
+    to_ts timestamptz;
+    horizon timestamptz := date_trunc('month', now()) + make_interval(months => months_ahead + 1);
+    child text;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass(parent)) IS DISTINCT FROM 'p' THEN
+        RETURN;
+    END IF;
+    SELECT coalesce(max(upper_bound), date_trunc('month', now())) INTO from_ts
+    FROM nexus_partition_bounds(parent);
+    WHILE from_ts < horizon LOOP
+        to_ts := from_ts + interval '1 month';
+        child := format('%s_p%s', parent, to_char(from_ts, 'YYYYMM'));
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            child, parent, from_ts, to_ts
+        );
+        RETURN NEXT child;
+        from_ts := to_ts;
+    END LOOP;
+END
+$$
+""",
+    rf"""
+CREATE OR REPLACE FUNCTION nexus_archive_partitions(parent text, retention_months int)
+RETURNS SETOF text
+LANGUAGE plpgsql SET timezone = 'UTC' AS $$
+DECLARE
+    part record;
+BEGIN
+    IF retention_months <= 0 THEN
+        RETURN;
+    END IF;
+    FOR part IN
+        SELECT child FROM nexus_partition_bounds(parent)
+        WHERE upper_bound <= date_trunc('month', now()) - make_interval(months => retention_months)
+        ORDER BY upper_bound
+    LOOP
+        EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, part.child);
+        EXECUTE format('ALTER TABLE %I SET SCHEMA {ARCHIVE_SCHEMA}', part.child);
+        RETURN NEXT part.child;
+    END LOOP;
+END
+$$
+""",
+)
+
+
+def ensure_sql(table: str, months_ahead: int) -> str:
+    return f"SELECT nexus_ensure_partitions('{table}', {int(months_ahead)})"
+
+
+async def ensure_partitions(conn, months_ahead: int | None = None) -> None:
+    """Install the functions and create upcoming partitions on an ``AsyncConnection``."""
+    from sqlalchemy import text
+
+    from app.config import settings
+
+    months_ahead = settings.partition_months_ahead if months_ahead is None else months_ahead
+    for stmt in FUNCTIONS_SQL:
+        await conn.execute(text(stmt))
+    for table in PARTITIONED_TABLES:
+        await conn.execute(text(ensure_sql(table, months_ahead)))
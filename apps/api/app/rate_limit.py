@@ -0,0 +1,180 @@
+"""
+NexusAI — Rate Limiting
+GCRA (generic cell rate algorithm) limiter on Redis.
+
+Each key stores a single value — its theoretical arrival time (TAT) in ms —
+so memory per key is constant whatever the rate. The script is loaded once
+and invoked by SHA (redis-py ``Script`` falls back to ``SCRIPT LOAD`` after a
+Redis restart) and checks several keys in one round trip: a request is
+admitted only if every key admits it, and only then are the keys charged.
+
+A worker remembers when a denied key can next admit anything and rejects
+it locally until then; denials never move a TAT, so short of an explicit
+``reset`` elsewhere this can't reject a request Redis would have allowed.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+
+KEY_PREFIX = "nexus:gcra:"
+
+# KEYS[i]: limiter key. ARGV[3i-2..3i]: limit, period_ms, cost.
+# Returns per key: allowed, remaining, retry_after_ms, reset_after_ms.
+GCRA_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local out, tats, admit = {}, {}, true
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 3 - 2])
+    local period = tonumber(ARGV[i * 3 - 1])
+    local cost = tonumber(ARGV[i * 3])
+    local interval = period / limit
+    local tat = math.max(tonumber(redis.call('GET', key)) or now, now)
+    local new_tat = tat + interval * cost
+    local allow_at = new_tat - period
+    if now < allow_at then
+        admit = false
+        table.insert(out, 0)
+        table.insert(out, math.max(math.floor((period - (tat - now)) / interval), 0))
+        table.insert(out, math.ceil(allow_at - now))
+        table.insert(out, math.ceil(tat - now))
+    else
+        tats[i] = new_tat
+        table.insert(out, 1)
+        table.insert(out, math.floor((period - (new_tat - now)) / interval))
+        table.insert(out, 0)
+        table.insert(out, math.ceil(new_tat - now))
+    end
+end
+if admit then
+    for i, key in ipairs(KEYS) do
+        redis.call('SET', key, tats[i], 'PX', math.max(math.ceil(tats[i] - now), 1))
+    end
+end
+return out
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``limit`` units per ``period`` seconds on ``key``; bursts up to ``limit`` are allowed."""
+
+    key: str
+    limit: int
+    period: float = 60.0
+    cost: int = 1
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.limit
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0  # seconds until the request would be admitted
+    reset_after: float = 0.0  # seconds until the bucket is full again
+    key: str = ""  # the limiting key
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(math.ceil(self.retry_after), 1))
+        return headers
+
+
+class RateLimiter:
+    def __init__(self, prefix: str = KEY_PREFIX, max_blocked: int = 10_000):
+        self.prefix = prefix
+        self.max_blocked = max_blocked
+        self._script = None
+        self._blocked: dict[str, float] = {}  # key -> monotonic time it may admit again
+
+    def _gcra(self):
+        if self._script is None:
+            from app.cache import get_redis
+
+            self._script = get_redis().register_script(GCRA_LUA)
+        return self._script
+
+    def _precheck(self, limits: tuple[RateLimit, ...]) -> RateLimitResult | None:
+        now = time.monotonic()
+        for rl in limits:
+            until = self._blocked.get(rl.key)
+            if until is None:
+                continue
+            if now < until:
+                wait = until - now + rl.interval * (rl.cost - 1)
+                return RateLimitResult(False, rl.limit, 0, wait, wait + rl.interval, rl.key)
+            del self._blocked[rl.key]
+        return None
+
+    def _block(self, rl: RateLimit, retry_after: float) -> None:
+        if len(self._blocked) >= self.max_blocked:
+            now = time.monotonic()
+            self._blocked = {k: t for k, t in self._blocked.items() if t > now}
+            if len(self._blocked) >= self.max_blocked:
+                return
+        # Earliest moment a single-unit request on this key could pass.
+        self._blocked[rl.key] = time.monotonic() + retry_after - rl.interval * (rl.cost - 1)
+
+    async def reset(self, *keys: str) -> None:
+        """Forget all usage of ``keys`` (e.g. failed logins after a successful one)."""
+        for key in keys:
+            self._blocked.pop(key, None)
+        from app.cache import get_redis
+
+        await get_redis().delete(*(self.prefix + key for key in keys))
+
+    async def check(self, *limits: RateLimit) -> RateLimitResult:
+        """Charge ``cost`` against every limit, or none of them if any would be exceeded.
+
+        The result describes the most restrictive limit: the one that denied
+        (longest wait first), otherwise the one with the fewest units left.
+        """
+        # A request costing more than the bucket holds drains it rather than never passing.
+        limits = tuple(
+            RateLimit(rl.key, rl.limit, rl.period, min(max(rl.cost, 1), rl.limit))
+            for rl in limits
+            if rl.limit > 0
+        )
+        if not limits:
+            return RateLimitResult(True, 0, 0)
+        if (local := self._precheck(limits)) is not None:
+            return local
+
+        args: list[int] = []
+        for rl in limits:
+            args += (rl.limit, int(rl.period * 1000), rl.cost)
+        raw = await self._gcra()(keys=[self.prefix + rl.key for rl in limits], args=args)
+
+        results = []
+        for i, rl in enumerate(limits):
+            allowed, remaining, retry_ms, reset_ms = (int(v) for v in raw[i * 4 : i * 4 + 4])
+            result = RateLimitResult(bool(allowed), rl.limit, remaining, retry_ms / 1000, reset_ms / 1000, rl.key)
+            if not result.allowed:
+                self._block(rl, result.retry_after)
+            results.append(result)
+        denied = [r for r in results if not r.allowed]
+        if denied:
+            worst = max(denied, key=lambda r: r.retry_after)
+            # Nothing was charged, so the other keys' remaining counts are unchanged.
+            return RateLimitResult(False, worst.limit, 0, worst.retry_after, worst.reset_after, worst.key)
+        return min(results, key=lambda r: (r.remaining, -r.reset_after))
+
+
+_rate_limiter: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
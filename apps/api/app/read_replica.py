@@ -0,0 +1,197 @@
+"""
+NexusAI — Read Replica Routing
+Sends read-only endpoints to ``DATABASE_REPLICA_URL`` when it is safe to.
+
+A read goes to the primary instead when:
+
+* no replica is configured, or the last probe could not reach it;
+* replication lag exceeds ``db_replica_max_lag_seconds`` — measured at most
+  every ``db_replica_lag_check_seconds`` by a background probe, so requests
+  never wait on it;
+* the tenant committed a write through ``get_db`` within the last
+  ``db_read_your_writes_seconds`` (read-your-writes). The mark is kept
+  locally and in Redis, so it holds whichever worker serves the next read.
+
+The replica has its own pool (``db_replica_pool_size``), so dashboard reads
+no longer queue behind writes for primary connections.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Annotated
+
+import structlog
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.dependencies import get_current_tenant
+
+log = structlog.get_logger(__name__)
+
+STICKY_PREFIX = "nexus:rw:"
+
+# Seconds behind the primary; 0 when everything received has been replayed
+# (an idle primary leaves pg_last_xact_replay_timestamp() old) or when the
+# target is not a standby at all.
+LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+def pool_stats(engine) -> dict | None:
+    if engine is None:
+        return None
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        max_lag: float = settings.db_replica_max_lag_seconds,
+        check_interval: float = settings.db_replica_lag_check_seconds,
+        sticky_seconds: float = settings.db_read_your_writes_seconds,
+        max_sticky: int = 10_000,
+    ):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self.max_sticky = max_sticky
+        self.lag: float | None = None  # None: never measured or unreachable
+        self._checked_at = float("-inf")
+        self._probe: asyncio.Task | None = None
+        self._sticky: dict[str, float] = {}  # tenant_id -> monotonic expiry
+        self.routed = dict.fromkeys(
+            ("replica", "primary_no_replica", "primary_unavailable", "primary_lag", "primary_sticky"), 0
+        )
+
+    @property
+    def enabled(self) -> bool:
+        from app.database import replica_engine
+
+        return replica_engine is not None
+
+    def _maybe_probe(self) -> None:
+        if self._probe is None and time.monotonic() - self._checked_at >= self.check_interval:
+            self._probe = asyncio.get_running_loop().create_task(self._measure_lag())
+
+    async def _measure_lag(self) -> None:
+        from app.database import replica_engine
+
+        try:
+            async with replica_engine.connect() as conn:
+                self.lag = float(await conn.scalar(text(LAG_SQL)) or 0.0)
+        except Exception as exc:
+            if self.lag is not None:
+                log.warning("replica.unreachable", error=str(exc))
+            self.lag = None
+        finally:
+            self._checked_at = time.monotonic()
+            self._probe = None
+
+    def mark_write(self, tenant_id: str) -> None:
+        if not tenant_id or not self.enabled:
+            return
+        if len(self._sticky) >= self.max_sticky:
+            now = time.monotonic()
+            self._sticky = {t: until for t, until in self._sticky.items() if until > now}
+        self._sticky[tenant_id] = time.monotonic() + self.sticky_seconds
+        asyncio.get_running_loop().create_task(self._publish_write(tenant_id))
+
+    async def _publish_write(self, tenant_id: str) -> None:
+        from app.cache import get_redis
+
+        try:
+            await get_redis().set(STICKY_PREFIX + tenant_id, 1, px=int(self.sticky_seconds * 1000))
+        except Exception as exc:
+            log.warning("replica.sticky.publish_failed", tenant_id=tenant_id, error=str(exc))
+
+    async def _is_sticky(self, tenant_id: str) -> bool:
+        until = self._sticky.get(tenant_id)
+        if until is not None:
+            if until > time.monotonic():
+                return True
+            del self._sticky[tenant_id]
+        from app.cache import get_redis
+
+        try:
+            return bool(await get_redis().exists(STICKY_PREFIX + tenant_id))
+        except Exception:
+            return True  # can't tell: stay consistent
+
+    async def choose(self, tenant_id: str = "") -> str:
+        """``"replica"`` or the reason the primary has to serve this read."""
+        if not self.enabled:
+            target = "primary_no_replica"
+        else:
+            self._maybe_probe()
+            if self.lag is None:
+                target = "primary_unavailable"
+            elif self.lag > self.max_lag:
+                target = "primary_lag"
+            elif tenant_id and await self._is_sticky(tenant_id):
+                target = "primary_sticky"
+            else:
+                target = "replica"
+        self.routed[target] += 1
+        return target
+
+    @asynccontextmanager
+    async def session(self, tenant_id: str = "") -> AsyncGenerator[AsyncSession, None]:
+        from app.database import AsyncSessionLocal, ReplicaSessionLocal
+
+        if await self.choose(tenant_id) == "replica":
+            async with ReplicaSessionLocal() as session:
+                try:
+                    await session.connection()
+                except Exception as exc:
+                    # Died since the last probe: stop routing to it until one succeeds.
+                    self.lag = None
+                    self.routed["replica"] -= 1
+                    self.routed["primary_unavailable"] += 1
+                    log.warning("replica.connect_failed", error=str(exc))
+                else:
+                    yield session
+                    return
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    def stats(self) -> dict:
+        from app.database import engine, replica_engine
+
+        return {
+            "routed": dict(self.routed),
+            "replica_lag_seconds": self.lag,
+            "sticky_tenants": len(self._sticky),
+            "pools": {"primary": pool_stats(engine), "replica": pool_stats(replica_engine)},
+        }
+
+
+_router: ReplicaRouter | None = None
+
+
+def get_replica_router() -> ReplicaRouter:
+    global _router
+    if _router is None:
+        _router = ReplicaRouter()
+    return _router
+
+
+async def get_read_db(
+    tenant: Annotated[dict, Depends(get_current_tenant)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for endpoints that only read; never commits."""
+    async with get_replica_router().session(tenant["id"]) as session:
+        yield session
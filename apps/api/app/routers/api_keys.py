@@ -11,6 +11,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.dependencies import get_current_tenant, get_current_user
 from app.models.api_key import APIKey
+from app.read_replica import get_read_db
+from app.services.api_key_filter import get_api_key_filter
+from app.services.auth_context import get_auth_context
 
 router = APIRouter()
 
@@ -25,7 +28,7 @@ class CreateKeyRequest(BaseModel):
 
 @router.get("/")
 async def list_keys(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     tenant: Annotated[dict, Depends(get_current_tenant)],
 ) -> dict:
     result = await db.execute(
@@ -41,6 +44,7 @@ async def list_keys(
                 "permissions": k.permissions,
                 "rate_limit_rpm": k.rate_limit_rpm,
                 "last_used_at": k.last_used_at,
+                "request_count": k.request_count,
                 "created_at": k.created_at,
                 "expires_at": k.expires_at,
             }
@@ -74,6 +78,7 @@ async def create_key(
     )
     db.add(key)
     await db.commit()
+    await get_api_key_filter().add(hashed)
     return {
         "id": key.id,
         "key": raw_key,
@@ -95,4 +100,5 @@ async def revoke_key(
     if not key:
         raise HTTPException(status_code=404, detail="Key not found")
     key.is_active = False
-    await db.commit()
\ No newline at end of file
+    await db.commit()
+    await get_auth_context().invalidate_api_key(key.key_hash)
\ No newline at end of file
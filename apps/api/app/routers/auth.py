@@ -1,13 +1,13 @@
 """Auth endpoints: login, refresh, logout, OAuth2 callback."""
 
-from datetime import datetime, timedelta, timezone
-from typing import Annotated
 import re
+from datetime import UTC, datetime, timedelta
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,10 +16,13 @@ from app.config import settings
 from app.database import get_db
 from app.models.tenant import Tenant
 from app.models.user import User
+from app.rate_limit import RateLimit, get_rate_limiter
+from app.services.passwords import PasswordHasherBusyError, get_password_hasher, hash_password
+
+log = structlog.get_logger(__name__)
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
 
@@ -47,18 +50,32 @@ class RegisterRequest(BaseModel):
     tenant_name: str
 
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+async def throttle_login(request: Request, email: str | None = None) -> None:
+    """Cap password attempts per client IP and, when given, per account."""
+    ip = request.client.host if request.client else "unknown"
+    limits = [RateLimit(f"login:ip:{ip}", settings.login_attempts_per_ip)]
+    if email:
+        limits.append(
+            RateLimit(f"login:email:{email.lower()}", settings.login_attempts_per_email, settings.login_email_window_seconds)
+        )
+    try:
+        result = await get_rate_limiter().check(*limits)
+    except Exception as exc:
+        log.warning("auth.throttle.unavailable", error=str(exc))
+        return
+    if not result.allowed:
+        log.info("auth.throttled", key=result.key)
+        raise HTTPException(status_code=429, detail="Too many login attempts", headers=result.headers())
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+def hasher_busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Authentication service busy", headers={"Retry-After": "1"})
 
 
 def create_token(data: dict, expires_delta: timedelta) -> str:
     payload = data.copy()
-    payload["exp"] = datetime.now(timezone.utc) + expires_delta
-    payload["iat"] = datetime.now(timezone.utc)
+    payload["exp"] = datetime.now(UTC) + expires_delta
+    payload["iat"] = datetime.now(UTC)
     return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
@@ -76,20 +93,35 @@ def create_refresh_token(user_id: str) -> str:
 @router.post("/token", response_model=TokenResponse)
 async def login(
     form: Annotated[OAuth2PasswordRequestForm, Depends()],
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> TokenResponse:
+    await throttle_login(request, form.username)
     result = await db.execute(select(User).where(User.email == form.username, User.is_active.is_(True)))
     user = result.scalar_one_or_none()
 
-    if not user or not user.hashed_password or not verify_password(form.password, user.hashed_password):
+    try:
+        valid, new_hash = await get_password_hasher().verify_and_update(
+            form.password, user.hashed_password if user else None
+        )
+    except PasswordHasherBusyError as exc:
+        raise hasher_busy() from exc
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user.last_active_at = datetime.now(timezone.utc)
+    if new_hash:
+        user.hashed_password = new_hash
+        log.info("auth.password.rehashed", user_id=user.id)
+    user.last_active_at = datetime.now(UTC)
     await db.commit()
+    try:
+        await get_rate_limiter().reset(f"login:email:{form.username.lower()}")
+    except Exception as exc:
+        log.warning("auth.throttle.reset_failed", error=str(exc))
 
     return TokenResponse(
         access_token=create_access_token(user.id, user.tenant_id, user.role),
@@ -100,11 +132,21 @@ async def login(
 
 
 @router.post("/register", response_model=TokenResponse, status_code=201)
-async def register(req: RegisterRequest, db: Annotated[AsyncSession, Depends(get_db)]) -> TokenResponse:
+async def register(
+    req: RegisterRequest,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> TokenResponse:
+    await throttle_login(request)
     existing = await db.execute(select(User).where(User.email == req.email))
     if existing.scalar_one_or_none():
         raise HTTPException(status_code=409, detail="Email already registered")
 
+    try:
+        hashed_password = await hash_password(req.password)
+    except PasswordHasherBusyError as exc:
+        raise hasher_busy() from exc
+
     slug = re.sub(r"[^a-z0-9]", "-", req.tenant_name.lower()).strip("-") or "tenant"
 
     tenant = Tenant(name=req.tenant_name, slug=f"{slug}-{req.email.split('@')[0]}", plan="starter")
@@ -114,7 +156,7 @@ async def register(req: RegisterRequest, db: Annotated[AsyncSession, Depends(get
     user = User(
         tenant_id=tenant.id,
         email=req.email,
-        hashed_password=hash_password(req.password),
+        hashed_password=hashed_password,
         full_name=req.full_name,
         role="admin",
         is_verified=False,
@@ -137,8 +179,8 @@ async def refresh(req: RefreshRequest, db: Annotated[AsyncSession, Depends(get_d
         if payload.get("type") != "refresh":
             raise HTTPException(status_code=401, detail="Invalid token type")
         user_id = payload["sub"]
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    except JWTError as exc:
+        raise HTTPException(status_code=401, detail="Invalid refresh token") from exc
 
     result = await db.execute(select(User).where(User.id == user_id, User.is_active.is_(True)))
     user = result.scalar_one_or_none()
@@ -161,8 +203,8 @@ async def me(
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
         user_id = payload["sub"]
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    except JWTError as exc:
+        raise HTTPException(status_code=401, detail="Invalid token") from exc
 
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
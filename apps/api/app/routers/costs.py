@@ -1,31 +1,104 @@
 """Cost analytics endpoints."""
 
-from fastapi import APIRouter
+import calendar
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import desc, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.models.cost_record import DailyCostAggregate
+from app.models.tenant import Tenant
 
 router = APIRouter()
 
+_BY_MODEL_MTD = text(
+    """
+    SELECT m.value ->> 'provider' AS provider, m.value ->> 'model' AS model,
+           SUM((m.value ->> 'cost_usd')::float) AS cost_usd
+    FROM daily_cost_aggregates a, json_each(a.by_model) AS m
+    WHERE a.period_date >= :start
+    GROUP BY 1, 2
+    ORDER BY cost_usd DESC
+    """
+)
+
 
 @router.get("/summary")
-async def cost_summary() -> dict:
+async def cost_summary(db: Annotated[AsyncSession, Depends(get_db)]) -> dict:
+    today = date.today()
+    month_start = today.replace(day=1)
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+
+    daily_rows = (
+        await db.execute(
+            select(
+                DailyCostAggregate.period_date,
+                func.sum(DailyCostAggregate.total_cost_usd),
+                func.sum(DailyCostAggregate.total_tokens),
+            )
+            .where(DailyCostAggregate.period_date >= month_start)
+            .group_by(DailyCostAggregate.period_date)
+            .order_by(DailyCostAggregate.period_date)
+        )
+    ).all()
+    model_rows = (await db.execute(_BY_MODEL_MTD, {"start": month_start})).all()
+
+    mtd = sum(cost or 0.0 for _, cost, _ in daily_rows)
+    tokens = sum(t or 0 for _, _, t in daily_rows)
     return {
-        "mtd_spend_usd": 24100.0,
-        "projected_eom_usd": 31400.0,
-        "budget_usd": 30000.0,
-        "saved_by_nexus_usd": 8400.0,
-        "cost_per_1m_tokens": 4.82,
+        "mtd_spend_usd": round(mtd, 4),
+        "projected_eom_usd": round(mtd / today.day * days_in_month, 2),
+        "budget_usd": settings.global_daily_budget_usd * days_in_month,
+        "cost_per_1m_tokens": round(mtd / tokens * 1_000_000, 4) if tokens else 0.0,
         "by_model": [
-            {"model": "gpt-4o", "cost_usd": 10800, "pct": 0.45},
-            {"model": "claude-3-5-sonnet", "cost_usd": 4800, "pct": 0.20},
-            {"model": "deepseek-r1", "cost_usd": 1900, "pct": 0.08},
-            {"model": "others", "cost_usd": 6600, "pct": 0.27},
+            {
+                "provider": provider,
+                "model": model,
+                "cost_usd": round(cost, 4),
+                "pct": round(cost / mtd, 4) if mtd else 0.0,
+            }
+            for provider, model, cost in model_rows
+        ],
+        "daily": [
+            {"date": day.isoformat(), "actual_usd": round(cost or 0.0, 4), "projected_usd": None}
+            for day, cost, _ in daily_rows
         ],
-        "daily": [{"date": "2025-02-01", "actual_usd": 820.0, "projected_usd": None}],
     }
 
 
 @router.get("/by-tenant")
-async def costs_by_tenant() -> dict:
-    return {"tenants": []}
+async def costs_by_tenant(db: Annotated[AsyncSession, Depends(get_db)]) -> dict:
+    month_start = date.today().replace(day=1)
+    total_cost = func.sum(DailyCostAggregate.total_cost_usd).label("cost_usd")
+    rows = await db.execute(
+        select(
+            DailyCostAggregate.tenant_id,
+            Tenant.name,
+            total_cost,
+            func.sum(DailyCostAggregate.total_requests),
+            func.sum(DailyCostAggregate.total_tokens),
+        )
+        .join(Tenant, Tenant.id == DailyCostAggregate.tenant_id, isouter=True)
+        .where(DailyCostAggregate.period_date >= month_start)
+        .group_by(DailyCostAggregate.tenant_id, Tenant.name)
+        .order_by(desc(total_cost))
+    )
+    return {
+        "tenants": [
+            {
+                "tenant_id": tenant_id,
+                "name": name,
+                "mtd_spend_usd": round(cost or 0.0, 4),
+                "requests": requests or 0,
+                "tokens": tokens or 0,
+            }
+            for tenant_id, name, cost, requests, tokens in rows.all()
+        ]
+    }
 
 
 @router.get("/budget-alerts")
@@ -1,9 +1,20 @@
 """Governance: policies, PII stats, compliance."""
 
-from fastapi import APIRouter, Depends
+from dataclasses import asdict
+from datetime import datetime
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
+from app.dependencies import get_current_tenant
+from app.pagination import decode_cursor, encode_cursor
+from app.services.audit_export import AuditFilter, ChainStatus, export_ndjson, fetch_page, serialize
+from app.services.audit_verifier import get_audit_verifier
+from app.services.platform_stats import get_platform_stats
 
 router = APIRouter()
 
@@ -53,16 +64,83 @@ async def list_policies() -> dict:
 
 @router.get("/stats")
 async def governance_stats() -> dict:
+    stats = await get_platform_stats().cached_snapshot()
+    counters = stats["counters"]
+    inferences = stats["inferences"]
+    blocks = int(counters.get("safety_blocks", 0))
     return {
-        "pii_detections_24h": 841,
-        "content_flags": 23,
-        "nexus_safety_blocks": 1204,
-        "compliance_rate": 0.991,
-        "pii_by_type": {"email": 312, "phone": 198, "cpf": 224, "credit_card": 107},
+        "pii_detections_today": int(counters.get("pii_detections", 0)),
+        # Requests the content checks acted on: PII found or a safety block.
+        "content_flags": int(counters.get("pii_requests", 0)) + blocks,
+        "nexus_safety_blocks": blocks,
+        "compliance_rate": round(1 - blocks / inferences, 4) if inferences else 1.0,
+        "pii_by_type": stats["pii_by_type"],
     }
 
 
+def audit_filter(
+    event: str | None = None,
+    resource: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> AuditFilter:
+    return AuditFilter(event=event, resource=resource, since=since, until=until)
+
+
 @router.get("/audit-trail")
-async def audit_trail(limit: int = 50, db: AsyncSession = Depends(get_db)) -> dict:
-    _ = (limit, db)
-    return {"logs": [], "total": 0}
+async def audit_trail(
+    tenant: Annotated[dict, Depends(get_current_tenant)],
+    filters: Annotated[AuditFilter, Depends(audit_filter)],
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+) -> dict:
+    after = decode_cursor(cursor, datetime, str) if cursor else None
+    rows = await fetch_page(db, tenant["id"], filters, after, limit)
+    status = ChainStatus()
+    return {
+        "logs": [serialize(row, status.check(row)) for row in rows],
+        "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if len(rows) == limit else None,
+    }
+
+
+@router.get("/audit-trail/export")
+async def export_audit_trail(
+    tenant: Annotated[dict, Depends(get_current_tenant)],
+    filters: Annotated[AuditFilter, Depends(audit_filter)],
+    format: Literal["ndjson", "ndjson.gz"] = "ndjson",
+) -> StreamingResponse:
+    compress = format == "ndjson.gz"
+    filename = f"audit-{tenant['id']}-{datetime.now():%Y%m%dT%H%M%S}.{format}"
+    return StreamingResponse(
+        export_ndjson(tenant["id"], filters, compress=compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/audit-trail/verify")
+async def verify_audit_trail(
+    tenant: Annotated[dict, Depends(get_current_tenant)],
+    from_seq: Annotated[int, Query(ge=1)] = 1,
+    to_seq: Annotated[int | None, Query(ge=1)] = None,
+) -> dict:
+    """Verify at most ``audit_verify_max_segments`` checkpoint segments from ``from_seq``.
+
+    The range is cut at a segment boundary; ``next_from_seq`` is where the
+    next call resumes, or null once ``to_seq`` (or the chain head) is reached.
+    """
+    verifier = get_audit_verifier()
+    _, limit = verifier.segment_bounds(verifier.segment_of(from_seq) + settings.audit_verify_max_segments - 1)
+    end = limit if to_seq is None else min(to_seq, limit)
+    report = await verifier.verify_range(tenant["id"], from_seq, end)
+    more = report.ok and end == limit and to_seq != limit and report.entries == end - from_seq + 1
+    return {**asdict(report), "from_seq": from_seq, "to_seq": end, "next_from_seq": end + 1 if more else None}
+
+
+@router.get("/audit-trail/{seq}/proof")
+async def verify_audit_entry(seq: int, tenant: Annotated[dict, Depends(get_current_tenant)]) -> dict:
+    result = await get_audit_verifier().verify_entry(tenant["id"], seq)
+    if not result["found"]:
+        raise HTTPException(status_code=404, detail="Audit entry not found")
+    return result
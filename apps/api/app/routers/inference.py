@@ -1,41 +1,55 @@
 """Inference logs endpoints."""
 
+from datetime import datetime
+from typing import Annotated, Literal
+
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import desc, select
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models.inference_log import InferenceLog
+from app.dependencies import get_current_tenant
+from app.pagination import decode_cursor, encode_cursor
+from app.read_replica import get_read_db
+from app.services.inference_logs import InferenceLogFilter, export_ndjson, fetch_page, serialize
 
 router = APIRouter()
 
 
+def inference_log_filter(
+    model: str | None = None,
+    status: Literal["ok", "error"] | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> InferenceLogFilter:
+    return InferenceLogFilter(model=model, status=status, since=since, until=until)
+
+
 @router.get("/logs")
 async def get_logs(
-    db: AsyncSession = Depends(get_db),
-    page: int = Query(1, ge=1),
+    tenant: Annotated[dict, Depends(get_current_tenant)],
+    filters: Annotated[InferenceLogFilter, Depends(inference_log_filter)],
+    db: AsyncSession = Depends(get_read_db),
     limit: int = Query(50, ge=1, le=500),
-    model: str | None = None,
+    cursor: str | None = None,
 ) -> dict:
-    query = select(InferenceLog).order_by(desc(InferenceLog.created_at)).limit(limit).offset((page - 1) * limit)
-    if model:
-        query = query.where(InferenceLog.model == model)
-    result = await db.execute(query)
-    logs = result.scalars().all()
+    after = decode_cursor(cursor, datetime, str) if cursor else None
+    rows = await fetch_page(db, tenant["id"], filters, after, limit)
     return {
-        "logs": [
-            {
-                "id": l.id,
-                "request_id": l.request_id,
-                "model": l.model,
-                "latency_ms": l.latency_ms,
-                "cost_usd": l.cost_usd,
-                "total_tokens": l.total_tokens,
-                "safety_passed": l.safety_passed,
-                "created_at": l.created_at,
-            }
-            for l in logs
-        ],
-        "page": page,
-        "limit": limit,
+        "logs": [serialize(row) for row in rows],
+        "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if len(rows) == limit else None,
     }
+
+
+@router.get("/logs/export")
+async def export_logs(
+    tenant: Annotated[dict, Depends(get_current_tenant)],
+    filters: Annotated[InferenceLogFilter, Depends(inference_log_filter)],
+    format: Literal["ndjson", "ndjson.gz"] = "ndjson",
+) -> StreamingResponse:
+    compress = format == "ndjson.gz"
+    filename = f"inference-logs-{tenant['id']}-{datetime.now():%Y%m%dT%H%M%S}.{format}"
+    return StreamingResponse(
+        export_ndjson(tenant["id"], filters, compress=compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"},
+    )
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.dependencies import get_current_tenant
 from app.models.knowledge_base import Document, KnowledgeBase
+from app.read_replica import get_read_db
 
 router = APIRouter()
 
@@ -23,7 +24,7 @@ class SearchRequest(BaseModel):
 
 @router.get("/")
 async def list_knowledge_bases(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     tenant: Annotated[dict, Depends(get_current_tenant)],
 ) -> dict:
     result = await db.execute(
@@ -59,13 +60,11 @@ async def create_kb(
 @router.post("/{kb_id}/upload")
 async def upload_document(
     kb_id: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    background_tasks: BackgroundTasks | None = None,
     db: AsyncSession = Depends(get_db),
     tenant: dict = Depends(get_current_tenant),
 ) -> dict:
-    if background_tasks is None:
-        background_tasks = BackgroundTasks()
     result = await db.execute(
         select(KnowledgeBase).where(
             KnowledgeBase.id == kb_id,
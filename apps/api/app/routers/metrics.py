@@ -3,6 +3,19 @@
 from fastapi import APIRouter
 from fastapi.responses import PlainTextResponse
 
+from app.near_cache import get_near_cache
+from app.read_replica import get_replica_router
+from app.services.api_key_filter import get_api_key_filter
+from app.services.audit_writer import get_audit_writer
+from app.services.auth_context import get_auth_context
+from app.services.cost_aggregator import get_cost_aggregator
+from app.services.cost_persistence import get_cost_record_writer
+from app.services.inference_log_writer import get_inference_log_writer
+from app.services.model_router import MODEL_REGISTRY, ModelRouter
+from app.services.platform_stats import get_platform_stats
+from app.services.token_verifier import get_token_verifier
+from app.startup import startup_report
+
 router = APIRouter()
 
 
@@ -28,11 +41,58 @@ nexusai_cost_usd_total{tenant="acme"} 24100.0
 
 @router.get("/platform")
 async def platform_stats() -> dict:
+    stats = await get_platform_stats().cached_snapshot()
+    router_ = ModelRouter()
+    providers = {info["provider"] for model_id, info in MODEL_REGISTRY.items() if router_.is_available(model_id)}
+    return {
+        "inferences_today": stats["inferences"],
+        "nexus_tasks_resolved": int(stats["counters"].get("multi_model", 0)),
+        "avg_latency_ms": round(stats["avg_latency_ms"], 2),
+        "latency_ms": {q: round(v, 2) for q, v in stats["latency_ms"].items()},
+        "active_tenants_today": stats["active_tenants"],
+        "active_users_today": stats["active_users"],
+        "monthly_cost_usd": round(stats["mtd"].get("cost_usd", 0.0), 4),
+        "providers_online": len(providers),
+    }
+
+
+@router.get("/cache")
+async def cache_stats() -> dict:
     return {
-        "inferences_today": 4_820_000,
-        "nexus_tasks_resolved": 18_400,
-        "avg_latency_ms": 198,
-        "monthly_cost_usd": 24100,
-        "providers_online": 6,
-        "sla_uptime_30d": 0.9997,
+        "namespaces": get_near_cache().stats(),
+        "auth_context_db_loads": get_auth_context().db_loads,
+        "auth_context_stale_loads": get_auth_context().stale_loads,
+        "auth_context_redis_errors": get_auth_context().redis_errors,
+        "api_key_filter": get_api_key_filter().stats(),
+        "jwt_claims": get_token_verifier().stats(),
     }
+
+
+@router.get("/audit")
+async def audit_writer_stats() -> dict:
+    return get_audit_writer().stats()
+
+
+@router.get("/cost-aggregator")
+async def cost_aggregator_stats() -> dict:
+    return get_cost_aggregator().stats()
+
+
+@router.get("/cost-records")
+async def cost_record_stats() -> dict:
+    return get_cost_record_writer().stats()
+
+
+@router.get("/inference-log")
+async def inference_log_stats() -> dict:
+    return get_inference_log_writer().stats()
+
+
+@router.get("/db")
+async def db_stats() -> dict:
+    return get_replica_router().stats()
+
+
+@router.get("/startup")
+async def startup_stats() -> dict:
+    return startup_report
@@ -10,6 +10,7 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.dependencies import get_current_tenant, get_nexus
+from app.services.budget_enforcer import BudgetExceededError
 from app.services.nexus_orchestrator import NexusMode, NexusOrchestrator
 
 router = APIRouter()
@@ -60,18 +61,22 @@ async def chat(
 
     messages = [{"role": m.role, "content": m.content} for m in req.messages]
 
-    result = await nexus.orchestrate(
-        prompt=last_user.content,
-        mode=req.mode,
-        tenant_id=tenant["id"],
-        user_id=request.state.__dict__.get("user_id", ""),
-        messages=messages,
-        override_models=req.model_override,
-        max_models=req.max_models,
-        system_prompt=req.system_prompt,
-        temperature=req.temperature,
-        max_tokens=req.max_tokens,
-    )
+    try:
+        result = await nexus.orchestrate(
+            prompt=last_user.content,
+            mode=req.mode,
+            tenant_id=tenant["id"],
+            user_id=request.state.__dict__.get("user_id", ""),
+            messages=messages,
+            override_models=req.model_override,
+            max_models=req.max_models,
+            system_prompt=req.system_prompt,
+            temperature=req.temperature,
+            max_tokens=req.max_tokens,
+            daily_budget_usd=tenant["daily_budget_usd"],
+        )
+    except BudgetExceededError as exc:
+        raise HTTPException(status_code=402, detail=str(exc)) from exc
 
     return ChatResponse(
         request_id=result.request_id,
@@ -111,6 +116,19 @@ async def stream(
 
     messages = [{"role": m.role, "content": m.content} for m in req.messages]
 
+    try:
+        reservation = await nexus.reserve_budget(
+            tenant_id=tenant["id"],
+            daily_budget_usd=tenant["daily_budget_usd"],
+            models=await nexus.router.select_models(last_user.content, req.mode, max_models=1),
+            prompt=last_user.content,
+            messages=messages,
+            system_prompt=req.system_prompt,
+            max_tokens=req.max_tokens,
+        )
+    except BudgetExceededError as exc:
+        raise HTTPException(status_code=402, detail=str(exc)) from exc
+
     async def event_generator():
         async for chunk in nexus.stream(
             prompt=last_user.content,
@@ -120,6 +138,7 @@ async def stream(
             system_prompt=req.system_prompt,
             temperature=req.temperature,
             max_tokens=req.max_tokens,
+            reservation=reservation,
         ):
             yield chunk
 
@@ -143,14 +162,18 @@ async def compare(
     if not last_user:
         raise HTTPException(status_code=422, detail="No user message found")
 
-    result = await nexus.orchestrate(
-        prompt=last_user.content,
-        mode=NexusMode.MULTI_MODEL,
-        tenant_id=tenant["id"],
-        messages=[{"role": m.role, "content": m.content} for m in req.messages],
-        override_models=req.model_override,
-        max_models=len(req.model_override),
-    )
+    try:
+        result = await nexus.orchestrate(
+            prompt=last_user.content,
+            mode=NexusMode.MULTI_MODEL,
+            tenant_id=tenant["id"],
+            messages=[{"role": m.role, "content": m.content} for m in req.messages],
+            override_models=req.model_override,
+            max_models=len(req.model_override),
+            daily_budget_usd=tenant["daily_budget_usd"],
+        )
+    except BudgetExceededError as exc:
+        raise HTTPException(status_code=402, detail=str(exc)) from exc
 
     return {
         "request_id": result.request_id,
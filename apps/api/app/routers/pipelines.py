@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.dependencies import get_current_tenant, get_current_user
 from app.models.pipeline import Pipeline, PipelineExecution
+from app.read_replica import get_read_db
 
 router = APIRouter()
 
@@ -28,7 +29,7 @@ class ExecuteRequest(BaseModel):
 
 @router.get("/")
 async def list_pipelines(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     tenant: Annotated[dict, Depends(get_current_tenant)],
 ) -> dict:
     result = await db.execute(
@@ -107,7 +108,7 @@ async def run_pipeline_async(execution_id: str, pipeline_id: str) -> None:
 @router.get("/{pipeline_id}/executions")
 async def list_executions(
     pipeline_id: str,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     tenant: Annotated[dict, Depends(get_current_tenant)],
 ) -> dict:
     result = await db.execute(
@@ -1,5 +1,7 @@
 """Tenant management."""
 
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy import select
@@ -7,6 +9,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.tenant import Tenant
+from app.services.auth_context import get_auth_context
+from app.services.budget_enforcer import get_budget_enforcer
 
 router = APIRouter()
 
@@ -16,6 +20,7 @@ class TenantUpdate(BaseModel):
     plan: str | None = None
     daily_budget_usd: float | None = None
     nexus_enabled: bool | None = None
+    status: Literal["active", "suspended"] | None = None
 
 
 @router.get("/")
@@ -54,5 +59,9 @@ async def update_tenant(tenant_id: str, req: TenantUpdate, db: AsyncSession = De
         tenant.daily_budget_usd = req.daily_budget_usd
     if req.nexus_enabled is not None:
         tenant.nexus_enabled = req.nexus_enabled
+    if req.status is not None:
+        tenant.status = req.status
     await db.commit()
+    get_budget_enforcer().invalidate(tenant_id)
+    await get_auth_context().invalidate_tenant(tenant_id)
     return {"id": tenant.id, "updated": True}
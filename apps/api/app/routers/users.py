@@ -10,7 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.dependencies import get_current_tenant, require_role
 from app.models.user import User
-from app.routers.auth import hash_password
+from app.services.auth_context import get_auth_context
+from app.services.passwords import hash_password
 
 router = APIRouter()
 
@@ -66,7 +67,7 @@ async def invite_user(
         email=req.email,
         full_name=req.full_name,
         role=req.role,
-        hashed_password=hash_password(req.password) if req.password else None,
+        hashed_password=await hash_password(req.password) if req.password else None,
     )
     db.add(user)
     await db.commit()
@@ -94,6 +95,7 @@ async def update_user(
     if req.is_active is not None:
         user.is_active = req.is_active
     await db.commit()
+    await get_auth_context().invalidate_user(user.id)
     return {"id": user.id, "updated": True}
 
 
@@ -111,4 +113,5 @@ async def delete_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.is_active = False
-    await db.commit()
\ No newline at end of file
+    await db.commit()
+    await get_auth_context().invalidate_user(user.id)
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+NexusAI — API Key Filter
+Per-worker Bloom filter of active ``APIKey.key_hash`` values, consulted
+before any cache or DB lookup so floods of made-up keys are rejected in a
+few microseconds.
+
+- Built from Postgres at startup (streamed), then rebuilt periodically to
+  shed revoked keys and resize when the key count outgrows the capacity.
+- New keys are added locally and published on ``nexus:apikeys:created`` so
+  every worker adds them before the key is returned to its owner.
+- Until the first build finishes, or after the listener loses its
+  subscription, the filter answers "maybe" for everything (fail open).
+
+Revoked keys stay in the filter until the next rebuild; a "maybe" only
+means the auth-context lookup runs, which rejects them as before.
+"""
+
+import asyncio
+import time
+
+import structlog
+
+from app.bloom import BloomFilter
+from app.config import settings
+
+log = structlog.get_logger(__name__)
+
+CREATED_CHANNEL = "nexus:apikeys:created"
+
+
+class APIKeyFilter:
+    def __init__(
+        self,
+        capacity: int = settings.api_key_filter_capacity,
+        error_rate: float = settings.api_key_filter_error_rate,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom: BloomFilter | None = None
+        self._added_during_build: list[bytes] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._rebuild_lock = asyncio.Lock()
+        self.rejected = 0
+        self.built_at = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self._bloom is not None
+
+    def might_exist(self, key_hash: str) -> bool:
+        """False only if no active key has this hash."""
+        bloom = self._bloom
+        if bloom is None or key_hash.encode() in bloom:
+            return True
+        self.rejected += 1
+        return False
+
+    def _add_local(self, key_hash: str) -> None:
+        item = key_hash.encode()
+        if self._bloom is not None:
+            self._bloom.add(item)
+        if self._added_during_build is not None:
+            self._added_during_build.append(item)
+
+    async def add(self, key_hash: str) -> None:
+        """Record a newly created key here and on every other worker."""
+        self._add_local(key_hash)
+        from app.cache import get_redis
+
+        try:
+            await get_redis().publish(CREATED_CHANNEL, key_hash)
+        except Exception as exc:
+            # Other workers reject this key until their next rebuild.
+            log.error("api_key_filter.publish.failed", error=str(exc))
+
+    async def rebuild(self) -> None:
+        from sqlalchemy import func, select
+
+        from app.database import AsyncSessionLocal
+        from app.models.api_key import APIKey
+
+        async with self._rebuild_lock:
+            start = time.monotonic()
+            self._added_during_build = []
+            try:
+                async with AsyncSessionLocal() as session:
+                    active = APIKey.is_active.is_(True)
+                    count = (await session.execute(select(func.count()).where(active))).scalar_one()
+                    # Headroom so keys created before the next rebuild keep the error rate.
+                    capacity = max(self.capacity, count * 2)
+                    bloom = BloomFilter(capacity, self.error_rate)
+                    rows = await session.stream_scalars(select(APIKey.key_hash).where(active))
+                    async for batch in rows.partitions(10_000):
+                        for key_hash in batch:
+                            bloom.add(key_hash.encode())
+                        await asyncio.sleep(0)  # ~35 ms of hashing per batch; let requests through
+                for item in self._added_during_build:
+                    bloom.add(item)
+            finally:
+                self._added_during_build = None
+            self._bloom, self.capacity, self.built_at = bloom, capacity, time.time()
+        log.info(
+            "api_key_filter.rebuilt",
+            keys=bloom.count,
+            capacity=capacity,
+            size_bytes=bloom.size_bytes,
+            elapsed_ms=round((time.monotonic() - start) * 1000, 1),
+        )
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._listen(), name="api-key-filter-listener"),
+                asyncio.create_task(self._periodic_rebuild(), name="api-key-filter-rebuild"),
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _listen(self) -> None:
+        from app.cache import get_redis
+
+        backoff = 0.5
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(CREATED_CHANNEL)
+                # Subscribe first, then build, so no key created in between is missed.
+                await self.rebuild()
+                backoff = 0.5
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._add_local(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._bloom = None  # may have missed creations: answer "maybe" until rebuilt
+                log.warning("api_key_filter.listener.disconnected", error=str(exc), retry_in=backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                await pubsub.aclose()
+
+    async def _periodic_rebuild(self) -> None:
+        while True:
+            await asyncio.sleep(settings.api_key_filter_rebuild_seconds)
+            if not self.ready:
+                continue
+            try:
+                await self.rebuild()
+            except Exception as exc:
+                log.warning("api_key_filter.rebuild.failed", error=str(exc))
+
+    def stats(self) -> dict:
+        bloom = self._bloom
+        return {
+            "ready": bloom is not None,
+            "keys": bloom.count if bloom else 0,
+            "capacity": self.capacity,
+            "size_bytes": bloom.size_bytes if bloom else 0,
+            "hashes": bloom.hashes if bloom else 0,
+            "estimated_error_rate": round(bloom.estimated_error_rate(), 6) if bloom else None,
+            "rejected": self.rejected,
+            "built_at": self.built_at,
+        }
+
+
+_api_key_filter: APIKeyFilter | None = None
+
+
+def get_api_key_filter() -> APIKeyFilter:
+    global _api_key_filter
+    if _api_key_filter is None:
+        _api_key_filter = APIKeyFilter()
+    return _api_key_filter
@@ -0,0 +1,140 @@
+"""
+NexusAI — Audit Export
+Keyset-paginated reads of a tenant's audit log in ``(created_at, id)`` order,
+backed by ``ix_audit_logs_tenant_created_id``. Filters are pushed into the
+SQL, every row carries its own chain-verification status, and the NDJSON
+export walks the table page by page so memory stays flat for any export size.
+"""
+
+import zlib
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+
+import orjson
+import structlog
+from sqlalchemy import select
+
+from app.config import settings
+from app.pagination import after
+from app.services.audit_writer import GENESIS_HASH, compute_entry_hash, row_to_entry
+
+log = structlog.get_logger(__name__)
+
+
+@dataclass
+class AuditFilter:
+    event: str | None = None
+    resource: str | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+
+    def apply(self, query):
+        from app.models.audit_log import AuditLog
+
+        if self.event:
+            query = query.where(AuditLog.event == self.event)
+        if self.resource:
+            query = query.where(AuditLog.resource == self.resource)
+        if self.since:
+            query = query.where(AuditLog.created_at >= self.since)
+        if self.until:
+            query = query.where(AuditLog.created_at < self.until)
+        return query
+
+
+class ChainStatus:
+    """Per-row verification while walking rows in ``created_at`` order.
+
+    The entry hash is always recomputed. The link to the predecessor is only
+    checkable when that predecessor (``seq - 1``) was the previous row seen —
+    filters or commit interleaving across workers can reorder ``seq`` relative
+    to ``created_at`` — otherwise it is reported as ``None`` (not checked).
+    """
+
+    def __init__(self):
+        self._last_seq: int | None = None
+        self._last_hash: str | None = None
+
+    def check(self, row) -> dict:
+        hash_ok = compute_entry_hash(row_to_entry(row)) == row.entry_hash
+        if row.seq == 1:
+            link_ok = row.prev_hash == GENESIS_HASH
+        elif self._last_seq is not None and row.seq == self._last_seq + 1:
+            link_ok = row.prev_hash == self._last_hash
+        else:
+            link_ok = None
+        self._last_seq, self._last_hash = row.seq, row.entry_hash
+        return {"hash": hash_ok, "link": link_ok}
+
+
+def serialize(row, status: dict) -> dict:
+    return {
+        "id": row.id,
+        "seq": row.seq,
+        "actor_id": row.actor_id,
+        "event": row.event,
+        "resource": row.resource,
+        "resource_id": row.resource_id,
+        "details": row.details,
+        "ip_address": row.ip_address,
+        "created_at": row.created_at,
+        "prev_hash": row.prev_hash,
+        "entry_hash": row.entry_hash,
+        "hash_version": row.hash_version,
+        "verified": status,
+    }
+
+
+async def fetch_page(
+    session,
+    tenant_id: str,
+    filters: AuditFilter,
+    cursor: tuple[datetime, str] | None = None,
+    limit: int = 50,
+) -> list:
+    from app.models.audit_log import AuditLog
+
+    query = filters.apply(select(AuditLog).where(AuditLog.tenant_id == tenant_id))
+    if cursor is not None:
+        query = query.where(after((AuditLog.created_at, AuditLog.id), cursor))
+    query = query.order_by(AuditLog.created_at, AuditLog.id).limit(limit)
+    return list((await session.execute(query)).scalars())
+
+
+async def iter_rows(
+    tenant_id: str,
+    filters: AuditFilter,
+    page_size: int = settings.audit_export_page_size,
+) -> AsyncIterator:
+    """Every matching row, one short read per page (no long-held transaction)."""
+    from app.database import AsyncSessionLocal
+
+    cursor = None
+    while True:
+        async with AsyncSessionLocal() as session:
+            rows = await fetch_page(session, tenant_id, filters, cursor, page_size)
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        cursor = (rows[-1].created_at, rows[-1].id)
+
+
+async def export_ndjson(tenant_id: str, filters: AuditFilter, compress: bool = False) -> AsyncIterator[bytes]:
+    status = ChainStatus()
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    chunk = bytearray()
+    exported = 0
+    async for row in iter_rows(tenant_id, filters):
+        chunk += orjson.dumps(serialize(row, status.check(row)))
+        chunk += b"\n"
+        exported += 1
+        if len(chunk) >= 64 * 1024:
+            yield gzip.compress(bytes(chunk)) if gzip else bytes(chunk)
+            chunk.clear()
+    if gzip:
+        yield gzip.compress(bytes(chunk)) + gzip.flush()
+    elif chunk:
+        yield bytes(chunk)
+    log.info("audit.exported", tenant_id=tenant_id, rows=exported, compressed=compress)
@@ -1,28 +1,34 @@
 """
 NexusAI — Audit Service
 Append-only, cryptographically hash-chained audit log.
-Every entry references the hash of the previous entry — tamper-evident.
+Every entry references the hash of the previous entry of the same tenant —
+tamper-evident. Chaining and persistence happen in the AuditWriter.
 """
 
-import hashlib
-import json
 import uuid
 from datetime import UTC, datetime
 
 import structlog
 
+from app.services.audit_writer import (
+    GENESIS_HASH,
+    AuditBackpressureError,
+    AuditWriter,
+    compute_entry_hash,
+    get_audit_writer,
+)
+
 log = structlog.get_logger(__name__)
 
-_GENESIS_HASH = "0" * 64
+_GENESIS_HASH = GENESIS_HASH
 
 
 class AuditService:
-    def __init__(self):
-        self._last_hash: str = _GENESIS_HASH
+    def __init__(self, writer: AuditWriter | None = None):
+        self.writer = writer or get_audit_writer()
 
     def _compute_hash(self, entry: dict) -> str:
-        canonical = json.dumps(entry, sort_keys=True, default=str)
-        return hashlib.sha256(canonical.encode()).hexdigest()
+        return compute_entry_hash(entry)
 
     async def log(
         self,
@@ -44,14 +50,15 @@ class AuditService:
             "resource_id": resource_id,
             "details": details or {},
             "ip_address": ip_address,
-            "prev_hash": self._last_hash,
-            "created_at": datetime.now(UTC).isoformat(),
+            "created_at": datetime.now(UTC),
         }
-        entry_hash = self._compute_hash(entry)
-        entry["entry_hash"] = entry_hash
-        self._last_hash = entry_hash
+        try:
+            await self.writer.append(entry)
+        except (AuditBackpressureError, ValueError) as exc:
+            log.error("audit.refused", audit_event=event, tenant_id=tenant_id, entry_id=entry_id, error=str(exc))
+            raise
 
-        log.info("audit.event", event=event, resource=resource, tenant_id=tenant_id, hash=entry_hash[:16])
+        log.info("audit.event", audit_event=event, resource=resource, tenant_id=tenant_id, entry_id=entry_id)
         return entry_id
 
     async def log_inference(
@@ -110,15 +117,18 @@ class AuditService:
             resource_id=key_id,
         )
 
+    async def verify_tenant_chain(self, tenant_id: str) -> tuple[bool, int | None]:
+        """Streamed, segment-wise verification; returns the first bad ``seq`` on failure."""
+        from app.services.audit_verifier import get_audit_verifier
+
+        report = await get_audit_verifier().verify_tenant(tenant_id)
+        return report.ok, report.bad_seq
+
     async def verify_chain(self, entries: list[dict]) -> tuple[bool, int | None]:
         prev_hash = _GENESIS_HASH
         for i, entry in enumerate(entries):
-            stored_hash = entry.pop("entry_hash", "")
-            computed = self._compute_hash(entry)
-            entry["entry_hash"] = stored_hash
-            if computed != stored_hash:
-                return False, i
-            if entry.get("prev_hash") != prev_hash:
+            stored_hash = entry.get("entry_hash", "")
+            if self._compute_hash(entry) != stored_hash or entry.get("prev_hash") != prev_hash:
                 return False, i
             prev_hash = stored_hash
         return True, None
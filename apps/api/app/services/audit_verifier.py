@@ -0,0 +1,398 @@
+"""
+NexusAI — Audit Verifier
+Checkpointed, Merkle-backed verification of per-tenant audit chains.
+
+Each tenant chain is cut into fixed-size segments by ``seq``. Once a segment
+is full it is verified once and sealed into a signed ``AuditCheckpoint``
+holding its Merkle tree, which gives:
+
+- single-entry verification in O(log n): entry hash + log2(segment) sibling
+  slices + the checkpoint signature;
+- range verification that only touches the segments overlapping the range;
+- full verification that streams rows through a server-side cursor in
+  constant memory, fanning segments out to a process pool or, with no
+  workers configured, to a thread — hashing never runs on the event loop.
+"""
+
+import asyncio
+import hashlib
+import hmac
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import settings
+from app.services.audit_writer import GENESIS_HASH, compute_entry_hash, row_to_entry
+
+log = structlog.get_logger(__name__)
+
+NODE_SIZE = 32
+
+
+# ─── MERKLE TREE ─────────────────────────────────────────────────────────────
+
+
+def _leaf(entry_hash: bytes) -> bytes:
+    return hashlib.sha256(b"\x00" + entry_hash).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def build_tree(entry_hashes: list[str]) -> list[list[bytes]]:
+    """All levels, leaves first. An odd trailing node is promoted unchanged."""
+    level = [_leaf(bytes.fromhex(h)) for h in entry_hashes]
+    levels = [level]
+    while len(level) > 1:
+        level = [
+            _node(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+        levels.append(level)
+    return levels
+
+
+def sibling_offsets(n: int, index: int) -> list[int]:
+    """Node offsets (into the concatenated tree) of the proof for leaf ``index``."""
+    offsets = []
+    base, size = 0, n
+    while size > 1:
+        sibling = index ^ 1
+        if sibling < size:
+            offsets.append(base + sibling)
+        base += size
+        index //= 2
+        size = (size + 1) // 2
+    return offsets
+
+
+def verify_proof(entry_hash: str, index: int, n: int, siblings: list[bytes], root: str) -> bool:
+    node = _leaf(bytes.fromhex(entry_hash))
+    it = iter(siblings)
+    size = n
+    while size > 1:
+        if index ^ 1 < size:
+            sibling = next(it)
+            node = _node(sibling, node) if index & 1 else _node(node, sibling)
+        index //= 2
+        size = (size + 1) // 2
+    return node.hex() == root
+
+
+def sign_checkpoint(tenant_id: str, segment: int, first_seq: int, last_seq: int, prev_hash: str, last_hash: str, root: str) -> str:
+    message = f"{tenant_id}|{segment}|{first_seq}|{last_seq}|{prev_hash}|{last_hash}|{root}"
+    return hmac.new(settings.secret_key.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+
+# ─── SEGMENT VERIFICATION (runs in worker processes) ─────────────────────────
+
+
+@dataclass
+class SegmentResult:
+    first_seq: int
+    last_seq: int
+    first_prev_hash: str
+    last_hash: str
+    merkle_root: str
+    bad_seq: int | None = None
+
+
+def verify_segment(entries: list[dict]) -> SegmentResult:
+    """Check hashes and internal links of one contiguous run of entries."""
+    bad_seq = None
+    prev_hash = entries[0]["prev_hash"]
+    for entry in entries:
+        if compute_entry_hash(entry) != entry["entry_hash"] or entry["prev_hash"] != prev_hash:
+            bad_seq = entry["seq"]
+            break
+        prev_hash = entry["entry_hash"]
+    root = build_tree([e["entry_hash"] for e in entries])[-1][0].hex()
+    return SegmentResult(
+        first_seq=entries[0]["seq"],
+        last_seq=entries[-1]["seq"],
+        first_prev_hash=entries[0]["prev_hash"],
+        last_hash=entries[-1]["entry_hash"],
+        merkle_root=root,
+        bad_seq=bad_seq,
+    )
+
+
+def seal_segment(entries: list[dict]) -> tuple[SegmentResult, bytes]:
+    """``verify_segment`` plus the concatenated Merkle tree stored in its checkpoint."""
+    result = verify_segment(entries)
+    tree = b"".join(node for level in build_tree([e["entry_hash"] for e in entries]) for node in level)
+    return result, tree
+
+
+@dataclass
+class VerifyReport:
+    ok: bool
+    entries: int
+    segments: int
+    bad_seq: int | None = None
+    reason: str | None = None
+
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+class AuditVerifier:
+    def __init__(self, segment_size: int = settings.audit_segment_size):
+        self.segment_size = segment_size
+
+    def segment_of(self, seq: int) -> int:
+        return (seq - 1) // self.segment_size
+
+    def segment_bounds(self, segment: int) -> tuple[int, int]:
+        first = segment * self.segment_size + 1
+        return first, first + self.segment_size - 1
+
+    # ── checkpoints ──────────────────────────────────────────────────────────
+
+    async def checkpoint_tenant(self, tenant_id: str) -> int:
+        """Seal every full, not-yet-checkpointed segment. Returns segments sealed."""
+        from app.database import AsyncSessionLocal
+        from app.models.audit_log import AuditChainHead, AuditCheckpoint, AuditLog
+
+        sealed = 0
+        async with AsyncSessionLocal() as session, session.begin():
+            head_seq = await session.scalar(select(AuditChainHead.seq).where(AuditChainHead.tenant_id == tenant_id))
+            last = (
+                await session.execute(
+                    select(AuditCheckpoint.segment, AuditCheckpoint.last_hash)
+                    .where(AuditCheckpoint.tenant_id == tenant_id)
+                    .order_by(AuditCheckpoint.segment.desc())
+                    .limit(1)
+                )
+            ).first()
+            next_segment, prev_hash = (last[0] + 1, last[1]) if last else (0, GENESIS_HASH)
+
+            for segment in range(next_segment, (head_seq or 0) // self.segment_size):
+                first_seq, last_seq = self.segment_bounds(segment)
+                rows = await session.execute(
+                    select(AuditLog)
+                    .where(AuditLog.tenant_id == tenant_id, AuditLog.seq.between(first_seq, last_seq))
+                    .order_by(AuditLog.seq)
+                )
+                entries = [row_to_entry(r) for r in rows.scalars()]
+                if len(entries) != self.segment_size:
+                    break
+                result, tree = await asyncio.to_thread(seal_segment, entries)
+                if result.bad_seq is not None or result.first_prev_hash != prev_hash:
+                    log.error("audit.checkpoint.broken_chain", tenant_id=tenant_id, segment=segment, bad_seq=result.bad_seq)
+                    break
+                await session.execute(
+                    pg_insert(AuditCheckpoint)
+                    .values(
+                        tenant_id=tenant_id,
+                        segment=segment,
+                        first_seq=first_seq,
+                        last_seq=last_seq,
+                        prev_hash=prev_hash,
+                        last_hash=result.last_hash,
+                        merkle_root=result.merkle_root,
+                        tree=tree,
+                        signature=sign_checkpoint(
+                            tenant_id, segment, first_seq, last_seq, prev_hash, result.last_hash, result.merkle_root
+                        ),
+                    )
+                    .on_conflict_do_nothing(index_elements=["tenant_id", "segment"])
+                )
+                prev_hash = result.last_hash
+                sealed += 1
+        if sealed:
+            log.info("audit.checkpointed", tenant_id=tenant_id, segments=sealed)
+        return sealed
+
+    # ── single entry: O(log n) ───────────────────────────────────────────────
+
+    async def verify_entry(self, tenant_id: str, seq: int) -> dict:
+        from app.database import AsyncSessionLocal
+        from app.models.audit_log import AuditCheckpoint, AuditLog
+
+        segment = self.segment_of(seq)
+        first_seq, _ = self.segment_bounds(segment)
+        async with AsyncSessionLocal() as session:
+            row = await session.scalar(select(AuditLog).where(AuditLog.tenant_id == tenant_id, AuditLog.seq == seq))
+            if row is None:
+                return {"seq": seq, "found": False, "verified": False}
+            entry = row_to_entry(row)
+            if compute_entry_hash(entry) != entry["entry_hash"]:
+                return {"seq": seq, "found": True, "verified": False, "reason": "hash_mismatch"}
+
+            offsets = sibling_offsets(self.segment_size, seq - first_seq)
+            cp = (
+                await session.execute(
+                    select(
+                        AuditCheckpoint.first_seq,
+                        AuditCheckpoint.last_seq,
+                        AuditCheckpoint.prev_hash,
+                        AuditCheckpoint.last_hash,
+                        AuditCheckpoint.merkle_root,
+                        AuditCheckpoint.signature,
+                        *(func.substring(AuditCheckpoint.tree, off * NODE_SIZE + 1, NODE_SIZE) for off in offsets),
+                    ).where(AuditCheckpoint.tenant_id == tenant_id, AuditCheckpoint.segment == segment)
+                )
+            ).first()
+
+        if cp is None:
+            # Tail segment not sealed yet: bounded walk over at most one segment.
+            report = await self.verify_range(tenant_id, first_seq, seq)
+            return {"seq": seq, "found": True, "verified": report.ok, "checkpointed": False}
+
+        cp_first, cp_last, prev_hash, last_hash, root, signature, *siblings = cp
+        signed = hmac.compare_digest(
+            signature, sign_checkpoint(tenant_id, segment, cp_first, cp_last, prev_hash, last_hash, root)
+        )
+        proven = verify_proof(entry["entry_hash"], seq - first_seq, self.segment_size, list(siblings), root)
+        return {
+            "seq": seq,
+            "found": True,
+            "verified": signed and proven,
+            "checkpointed": True,
+            "merkle_root": root,
+            "proof_length": len(siblings),
+        }
+
+    # ── ranges and full chains: streamed ────────────────────────────────────
+
+    async def verify_range(
+        self,
+        tenant_id: str,
+        from_seq: int = 1,
+        to_seq: int | None = None,
+        workers: int = settings.audit_verify_workers,
+    ) -> VerifyReport:
+        """Stream ``[from_seq, to_seq]`` and verify it segment by segment.
+
+        Rows come through a server-side cursor and at most ``2 * workers``
+        segments are held at once, so memory stays flat regardless of size.
+        Segments are hashed in the process pool, or in a thread when
+        ``workers`` is 0. Links across segment boundaries and sealed
+        checkpoints are checked in order as segment results come back.
+
+        Ranges that reach the tenant's ``AuditChainHead`` (always the case when
+        ``to_seq`` is None) must end exactly at the head's ``seq`` and
+        ``last_hash``; otherwise the newest entries were deleted and the
+        report says ``truncated``.
+        """
+        from app.database import AsyncSessionLocal
+        from app.models.audit_log import AuditChainHead, AuditCheckpoint, AuditLog
+
+        loop = asyncio.get_running_loop()
+        pool = _get_pool(workers) if workers > 0 else None
+        in_flight: deque = deque()
+        checkpoints: dict[int, tuple] = {}
+        state = {"prev_hash": None, "entries": 0, "segments": 0}
+
+        def check(result: SegmentResult) -> VerifyReport | None:
+            if result.bad_seq is not None:
+                return VerifyReport(False, state["entries"], state["segments"], result.bad_seq, "hash_or_link_mismatch")
+            expected_prev = state["prev_hash"]
+            if expected_prev is not None and result.first_prev_hash != expected_prev:
+                return VerifyReport(False, state["entries"], state["segments"], result.first_seq, "segment_link_mismatch")
+            if result.first_seq == 1 and result.first_prev_hash != GENESIS_HASH:
+                return VerifyReport(False, state["entries"], state["segments"], 1, "genesis_mismatch")
+            cp = checkpoints.get(self.segment_of(result.first_seq))
+            if cp is not None and result.first_seq == cp[0] and result.last_seq == cp[1]:
+                _, _, cp_prev, cp_last, cp_root, cp_sig, segment = cp
+                if (cp_last, cp_root, cp_prev) != (result.last_hash, result.merkle_root, result.first_prev_hash):
+                    return VerifyReport(False, state["entries"], state["segments"], result.first_seq, "checkpoint_mismatch")
+                if not hmac.compare_digest(
+                    cp_sig,
+                    sign_checkpoint(tenant_id, segment, cp[0], cp[1], cp_prev, cp_last, cp_root),
+                ):
+                    return VerifyReport(False, state["entries"], state["segments"], result.first_seq, "bad_signature")
+            state["prev_hash"] = result.last_hash
+            state["entries"] += result.last_seq - result.first_seq + 1
+            state["segments"] += 1
+            return None
+
+        async def submit(entries: list[dict]) -> VerifyReport | None:
+            if pool is None:
+                return check(await asyncio.to_thread(verify_segment, entries))
+            in_flight.append(loop.run_in_executor(pool, verify_segment, entries))
+            if len(in_flight) >= 2 * workers:
+                return check(await in_flight.popleft())
+            return None
+
+        async with AsyncSessionLocal() as session:
+            cp_rows = await session.execute(
+                select(
+                    AuditCheckpoint.first_seq,
+                    AuditCheckpoint.last_seq,
+                    AuditCheckpoint.prev_hash,
+                    AuditCheckpoint.last_hash,
+                    AuditCheckpoint.merkle_root,
+                    AuditCheckpoint.signature,
+                    AuditCheckpoint.segment,
+                ).where(AuditCheckpoint.tenant_id == tenant_id)
+            )
+            checkpoints = {row[-1]: tuple(row) for row in cp_rows}
+            head = (
+                await session.execute(
+                    select(AuditChainHead.seq, AuditChainHead.last_hash).where(AuditChainHead.tenant_id == tenant_id)
+                )
+            ).first()
+            # Entries appended after the head was read are left for the next run.
+            end_seq = to_seq if head is None else min(head[0], to_seq if to_seq is not None else head[0])
+
+            query = select(AuditLog).where(AuditLog.tenant_id == tenant_id, AuditLog.seq >= from_seq)
+            if end_seq is not None:
+                query = query.where(AuditLog.seq <= end_seq)
+            stream = await session.stream(
+                query.order_by(AuditLog.seq).execution_options(yield_per=self.segment_size)
+            )
+
+            batch: list[dict] = []
+            expected_seq = from_seq
+            async for row in stream.scalars():
+                if row.seq != expected_seq:
+                    return VerifyReport(False, state["entries"], state["segments"], expected_seq, "missing_entry")
+                expected_seq += 1
+                batch.append(row_to_entry(row))
+                if row.seq % self.segment_size == 0:
+                    if (failure := await submit(batch)) is not None:
+                        return failure
+                    batch = []
+            if batch and (failure := await submit(batch)) is not None:
+                return failure
+
+        while in_flight:
+            if (failure := check(await in_flight.popleft())) is not None:
+                return failure
+        if head is None:
+            if state["entries"]:
+                return VerifyReport(False, state["entries"], state["segments"], from_seq, "missing_chain_head")
+        elif expected_seq <= end_seq:
+            # Rows up to end_seq must exist: a short read is deletion, not the end of the chain.
+            reason = "truncated" if end_seq == head[0] else "missing_entry"
+            return VerifyReport(False, state["entries"], state["segments"], expected_seq, reason)
+        elif end_seq == head[0] and state["prev_hash"] is not None and state["prev_hash"] != head[1]:
+            return VerifyReport(False, state["entries"], state["segments"], end_seq, "head_mismatch")
+        return VerifyReport(True, state["entries"], state["segments"])
+
+    async def verify_tenant(self, tenant_id: str, workers: int = settings.audit_verify_workers) -> VerifyReport:
+        return await self.verify_range(tenant_id, 1, None, workers=workers)
+
+
+_verifier: AuditVerifier | None = None
+
+
+def get_audit_verifier() -> AuditVerifier:
+    global _verifier
+    if _verifier is None:
+        _verifier = AuditVerifier()
+    return _verifier
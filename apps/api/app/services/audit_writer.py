@@ -0,0 +1,254 @@
+"""
+NexusAI — Audit Writer
+Group-committed persistence for the hash-chained audit log.
+
+Entries are buffered in process and linked into per-tenant chains only at
+commit time, inside one transaction that row-locks each tenant's chain head
+(``audit_chain_heads``). Any number of workers can therefore append to the
+same tenant without forking its chain, and a whole batch costs one
+transaction regardless of how many entries it carries.
+
+The buffer is bounded. At ``audit_max_buffer`` an append first tries to drain
+the buffer inline. After a failed commit that is attempted at most once per
+``audit_inline_flush_backoff_seconds``. If the buffer is still full, the
+append raises ``AuditBackpressureError``: entries are refused loudly, never
+dropped. Entries the database rejects (IntegrityError/DataError) are
+isolated by committing the batch entry by entry; they are logged and counted
+in ``stats()`` so they cannot stall other tenants' chains. Details that
+cannot be canonically encoded are refused at ``append``.
+
+Entry hashes are versioned per row (``hash_version``):
+  1 — legacy ``json.dumps(sort_keys=True, default=str)``; still verified.
+  2 — canonical JSON (docs/audit-canonical-json.md); written by default.
+"""
+
+import hashlib
+import json
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.canonical import dumps as canonical_dumps
+from app.config import settings
+from app.services.flusher import BackgroundFlusher
+
+log = structlog.get_logger(__name__)
+
+GENESIS_HASH = "0" * 64
+CHAIN_FIELDS = ("seq", "prev_hash", "entry_hash", "hash_version")
+
+
+class AuditBackpressureError(Exception):
+    """The audit buffer is full and the database is not draining it."""
+
+
+HASHED_FIELDS = (
+    "id",
+    "tenant_id",
+    "seq",
+    "actor_id",
+    "event",
+    "resource",
+    "resource_id",
+    "details",
+    "ip_address",
+    "prev_hash",
+    "created_at",
+)
+HASHED_FIELDS_V2 = (*HASHED_FIELDS, "hash_version")
+
+
+def _legacy_hash(entry: dict) -> str:
+    data = {f: entry[f] for f in HASHED_FIELDS}
+    if isinstance(data["created_at"], datetime):
+        data["created_at"] = data["created_at"].isoformat()
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def compute_entry_hash(entry: dict) -> str:
+    """Hash ``entry`` under its own ``hash_version``; extra keys are ignored."""
+    if entry.get("hash_version", 1) == 1:
+        return _legacy_hash(entry)
+    return hashlib.sha256(canonical_dumps({f: entry[f] for f in HASHED_FIELDS_V2})).hexdigest()
+
+
+def row_to_entry(row) -> dict:
+    """Rebuild the hashed fields (plus ``entry_hash``) from an ``AuditLog`` row."""
+    entry = {f: getattr(row, f) for f in HASHED_FIELDS_V2}
+    entry["entry_hash"] = row.entry_hash
+    return entry
+
+
+class AuditWriter(BackgroundFlusher):
+    name = "audit"
+
+    def __init__(
+        self,
+        interval_ms: int = settings.audit_flush_interval_ms,
+        batch_size: int = settings.audit_batch_size,
+        max_buffer: int = settings.audit_max_buffer,
+    ):
+        super().__init__(interval_ms)
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self._buffer: list[dict] = []
+        self._inline_flush_at = 0.0  # monotonic; pushed back after a failed commit
+        self.committed = 0
+        self.rejected = 0
+        self.refused = 0
+
+    async def append(self, entry: dict) -> None:
+        try:
+            canonical_dumps(entry["details"])
+        except (TypeError, ValueError) as exc:
+            self.refused += 1
+            raise ValueError(f"audit details are not JSON-encodable: {exc}") from exc
+
+        if len(self._buffer) >= self.max_buffer:
+            if time.monotonic() >= self._inline_flush_at:
+                await self.flush_now()
+            if len(self._buffer) >= self.max_buffer:
+                self.refused += 1
+                raise AuditBackpressureError(f"audit buffer full ({len(self._buffer)} entries)")
+        self._buffer.append(entry)
+        self.ensure_running()
+        if len(self._buffer) >= self.batch_size:
+            self.wake()
+
+    async def flush(self) -> None:
+        while self._buffer:
+            batch = self._buffer[: self.batch_size]
+            del self._buffer[: self.batch_size]
+            try:
+                sealed = await self._commit(batch)
+            except (IntegrityError, DataError) as exc:
+                _unchain(batch)
+                log.warning("audit.commit.rejected", error=str(exc.orig), entries=len(batch))
+                sealed, unwritten = await self._commit_each(batch)
+                if unwritten:
+                    self._requeue(unwritten)
+                    return
+            except Exception as exc:
+                _unchain(batch)
+                self._requeue(batch)
+                log.error("audit.commit.failed", error=str(exc), entries=len(batch))
+                return
+            self._inline_flush_at = 0.0
+            await self._checkpoint(sealed)
+
+    def _requeue(self, batch: list[dict]) -> None:
+        self._buffer[:0] = batch
+        self._inline_flush_at = time.monotonic() + settings.audit_inline_flush_backoff_seconds
+
+    async def _commit_each(self, batch: list[dict]) -> tuple[list[str], list[dict]]:
+        """Commit entries one at a time, isolating rejected ones; returns (sealed, unwritten)."""
+        sealed: set[str] = set()
+        for i, entry in enumerate(batch):
+            try:
+                sealed.update(await self._commit([entry]))
+            except (IntegrityError, DataError) as exc:
+                _unchain([entry])
+                self.rejected += 1
+                log.error(
+                    "audit.entry.rejected",
+                    error=str(exc.orig),
+                    entry_id=entry["id"],
+                    tenant_id=entry["tenant_id"],
+                    audit_event=entry["event"],
+                )
+            except Exception as exc:
+                _unchain([entry])
+                log.error("audit.commit.failed", error=str(exc), entries=len(batch) - i)
+                return sorted(sealed), batch[i:]
+        return sorted(sealed), []
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "committed": self.committed,
+            "rejected": self.rejected,
+            "refused": self.refused,
+        }
+
+    async def _checkpoint(self, tenants: list[str]) -> None:
+        """Seal segments completed by the last commit. Failures are retried on the next crossing."""
+        from app.services.audit_verifier import get_audit_verifier
+
+        for tenant_id in tenants:
+            try:
+                await get_audit_verifier().checkpoint_tenant(tenant_id)
+            except Exception as exc:
+                log.error("audit.checkpoint.failed", tenant_id=tenant_id, error=str(exc))
+
+    async def _commit(self, batch: list[dict]) -> list[str]:
+        """Chain and insert ``batch``; returns tenants whose head crossed a segment boundary."""
+        from app.database import AsyncSessionLocal
+        from app.models.audit_log import AuditChainHead, AuditLog
+
+        by_tenant: dict[str, list[dict]] = defaultdict(list)
+        for entry in batch:
+            by_tenant[entry["tenant_id"]].append(entry)
+        tenants = sorted(by_tenant)
+
+        async with AsyncSessionLocal() as session, session.begin():
+            await session.execute(
+                pg_insert(AuditChainHead)
+                .values([{"tenant_id": t, "seq": 0, "last_hash": GENESIS_HASH} for t in tenants])
+                .on_conflict_do_nothing(index_elements=["tenant_id"])
+            )
+            # Lock heads in a stable order so concurrent workers cannot deadlock.
+            heads = {
+                h.tenant_id: h
+                for h in (
+                    await session.execute(
+                        select(AuditChainHead)
+                        .where(AuditChainHead.tenant_id.in_(tenants))
+                        .order_by(AuditChainHead.tenant_id)
+                        .with_for_update()
+                    )
+                ).scalars()
+            }
+
+            rows = []
+            sealed = []
+            for tenant_id in tenants:
+                head = heads[tenant_id]
+                seq, prev_hash = head.seq, head.last_hash
+                start_segment = seq // settings.audit_segment_size
+                for entry in by_tenant[tenant_id]:
+                    seq += 1
+                    entry["seq"] = seq
+                    entry["prev_hash"] = prev_hash
+                    entry["hash_version"] = settings.audit_hash_version
+                    entry["entry_hash"] = prev_hash = compute_entry_hash(entry)
+                    rows.append(dict(entry))
+                head.seq, head.last_hash = seq, prev_hash
+                if seq // settings.audit_segment_size > start_segment:
+                    sealed.append(tenant_id)
+
+            await session.execute(pg_insert(AuditLog), rows)
+        self.committed += len(batch)
+        log.debug("audit.committed", entries=len(batch), tenants=len(tenants))
+        return sealed
+
+
+def _unchain(batch: list[dict]) -> None:
+    """Drop chain fields assigned by a rolled-back commit; they are re-assigned on retry."""
+    for entry in batch:
+        for name in CHAIN_FIELDS:
+            entry.pop(name, None)
+
+
+_writer: AuditWriter | None = None
+
+
+def get_audit_writer() -> AuditWriter:
+    global _writer
+    if _writer is None:
+        _writer = AuditWriter()
+    return _writer
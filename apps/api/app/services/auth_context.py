@@ -0,0 +1,196 @@
+"""
+NexusAI — Auth Context
+Cached snapshots of the tenant, API-key and user rows that every
+authenticated request needs (status, plan, role, limits), read through the near cache and Redis
+so hot tenants and keys don't cost a Postgres query per request.
+
+Unknown or inactive keys and tenants are cached too, as a miss marker with
+a shorter TTL, so repeated bad credentials don't reach Postgres either.
+Writers call the matching ``invalidate_*`` method after committing;
+that drops the Redis entry and every worker's near-cache copy.
+
+Each entry has a generation counter that ``invalidate_*`` bumps. A load
+writes its snapshot back only if the generation is still the one it read
+before querying Postgres, so a load racing a revocation can't re-cache the
+revoked row; it reads the row again instead.
+
+Redis is an optimisation here, not a dependency: if it fails, the row is
+read from Postgres and returned without writing it back, so authentication
+keeps working through a Redis outage.
+"""
+
+import structlog
+from redis.exceptions import RedisError
+from sqlalchemy import select
+
+from app.cache import cache_namespace, get_redis, get_redis_bytes
+from app.cache_codec import get_codec
+from app.config import settings
+from app.near_cache import get_near_cache
+
+log = structlog.get_logger(__name__)
+
+TENANT_KEY = "nexus:auth:tenant:{tenant_id}"
+API_KEY_KEY = "nexus:auth:apikey:{key_hash}"
+USER_KEY = "nexus:auth:user:{user_id}"
+
+GENERATION_KEY = "{key}:gen"
+GENERATION_TTL_SECONDS = 3600  # only has to outlive the slowest load
+LOAD_ATTEMPTS = 3
+
+MISSING: dict = {}  # cached in place of a row that doesn't exist or isn't active
+
+# KEYS[1]: entry, KEYS[2]: its generation. ARGV: generation read before the load, value, ttl.
+SET_IF_GENERATION_LUA = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+def tenant_snapshot(tenant) -> dict:
+    return {
+        "id": tenant.id,
+        "name": tenant.name,
+        "plan": tenant.plan,
+        "nexus_enabled": tenant.nexus_enabled,
+        "daily_budget_usd": tenant.daily_budget_usd,
+        "rate_limit_rpm": tenant.rate_limit_rpm,
+    }
+
+
+def api_key_snapshot(key) -> dict:
+    return {
+        "id": key.id,
+        "tenant_id": key.tenant_id,
+        "permissions": key.permissions,
+        "rate_limit_rpm": key.rate_limit_rpm,
+    }
+
+
+def user_snapshot(user) -> dict:
+    return {"id": user.id, "email": user.email, "role": user.role, "tenant_id": user.tenant_id}
+
+
+class AuthContextCache:
+    def __init__(
+        self,
+        ttl: int = settings.auth_context_ttl_seconds,
+        negative_ttl: int = settings.auth_context_negative_ttl_seconds,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.db_loads = 0
+        self.stale_loads = 0  # loads whose write-back lost to an invalidation
+        self.redis_errors = 0  # loads served straight from Postgres because Redis failed
+        self._set_if_generation = None
+
+    async def tenant(self, tenant_id: str) -> dict | None:
+        """Snapshot of an active tenant, or ``None``."""
+        from app.models.tenant import Tenant
+
+        query = select(Tenant).where(Tenant.id == tenant_id, Tenant.status == "active")
+        return await self._load(TENANT_KEY.format(tenant_id=tenant_id), query, tenant_snapshot)
+
+    async def api_key(self, key_hash: str) -> dict | None:
+        """Snapshot of an active API key by its SHA-256 hash, or ``None``."""
+        from app.models.api_key import APIKey
+        from app.services.api_key_filter import get_api_key_filter
+
+        if not get_api_key_filter().might_exist(key_hash):
+            return None
+
+        query = select(APIKey).where(APIKey.key_hash == key_hash, APIKey.is_active.is_(True))
+        return await self._load(API_KEY_KEY.format(key_hash=key_hash), query, api_key_snapshot)
+
+    async def user(self, user_id: str) -> dict | None:
+        """Snapshot of an active user, or ``None``."""
+        from app.models.user import User
+
+        query = select(User).where(User.id == user_id, User.is_active.is_(True))
+        return await self._load(USER_KEY.format(user_id=user_id), query, user_snapshot)
+
+    async def invalidate_tenant(self, tenant_id: str) -> None:
+        await self._invalidate(TENANT_KEY.format(tenant_id=tenant_id))
+
+    async def invalidate_api_key(self, key_hash: str) -> None:
+        await self._invalidate(API_KEY_KEY.format(key_hash=key_hash))
+
+    async def invalidate_user(self, user_id: str) -> None:
+        await self._invalidate(USER_KEY.format(user_id=user_id))
+
+    async def _invalidate(self, key: str) -> None:
+        generation = GENERATION_KEY.format(key=key)
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.incr(generation)
+            pipe.expire(generation, GENERATION_TTL_SECONDS)
+            pipe.delete(key)
+            await pipe.execute()
+        if settings.near_cache_enabled:
+            await get_near_cache().invalidate(cache_namespace(key), key)
+
+    def _ttl(self, value: dict) -> int:
+        return self.ttl if value else self.negative_ttl
+
+    async def _load(self, key: str, query, snapshot) -> dict | None:
+        codec = get_codec()
+        generation_key = GENERATION_KEY.format(key=key)
+        if self._set_if_generation is None:
+            self._set_if_generation = get_redis_bytes().register_script(SET_IF_GENERATION_LUA)
+
+        async def query_db() -> dict:
+            from app.database import AsyncSessionLocal
+
+            self.db_loads += 1
+            async with AsyncSessionLocal() as session:
+                row = (await session.execute(query)).scalar_one_or_none()
+            return snapshot(row) if row is not None else MISSING
+
+        async def load() -> tuple[dict, int]:
+            try:
+                data, generation = await get_redis_bytes().mget(key, generation_key)
+            except RedisError as exc:
+                self.redis_errors += 1
+                log.warning("auth_context.redis_failed", key=key, error=str(exc))
+                value = await query_db()
+                return value, len(codec.encode(value))
+            attempts = 0
+            while not data:
+                attempts += 1
+                value = await query_db()
+                encoded = codec.encode(value)
+                try:
+                    written = await self._set_if_generation(
+                        keys=[key, generation_key], args=[generation or b"0", encoded, self._ttl(value)]
+                    )
+                    if not written:
+                        # Invalidated while we were reading Postgres: the row may be stale.
+                        self.stale_loads += 1
+                    if written or attempts == LOAD_ATTEMPTS:
+                        data = encoded
+                    else:
+                        data, generation = await get_redis_bytes().mget(key, generation_key)
+                except RedisError as exc:
+                    # Serve what Postgres returned; nothing is cached without a generation check.
+                    self.redis_errors += 1
+                    log.warning("auth_context.redis_failed", key=key, error=str(exc))
+                    data = encoded
+            return codec.decode(data), len(data)
+
+        if settings.near_cache_enabled:
+            value = await get_near_cache().get_or_load(cache_namespace(key), key, load, self._ttl)
+        else:
+            value, _ = await load()
+        return value or None
+
+
+_auth_context: AuthContextCache | None = None
+
+
+def get_auth_context() -> AuthContextCache:
+    global _auth_context
+    if _auth_context is None:
+        _auth_context = AuthContextCache()
+    return _auth_context
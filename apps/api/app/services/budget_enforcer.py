@@ -0,0 +1,144 @@
+"""
+NexusAI — Budget Enforcer
+Per-tenant daily spend snapshots with bounded staleness and up-front
+cost reservations, so concurrent requests cannot overshoot the budget.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+
+import structlog
+
+from app.config import settings
+from app.services.cost_tracker import CostTracker
+
+log = structlog.get_logger(__name__)
+
+
+class BudgetExceededError(Exception):
+    def __init__(self, tenant_id: str, spend_usd: float, budget_usd: float):
+        super().__init__(f"Daily budget exceeded for tenant {tenant_id}: ${spend_usd:.2f} of ${budget_usd:.2f}")
+        self.tenant_id = tenant_id
+        self.spend_usd = spend_usd
+        self.budget_usd = budget_usd
+
+
+@dataclass(eq=False)
+class Reservation:
+    tenant_id: str
+    amount_usd: float
+    expires_at: float
+    settled: bool = False
+
+
+@dataclass
+class _Snapshot:
+    day: date
+    spend_usd: float
+    budget_usd: float
+    fetched_at: float
+    reservations: set[Reservation] = field(default_factory=set)
+
+    @property
+    def reserved_usd(self) -> float:
+        # Reservations whose request never settled (e.g. a stream dropped before
+        # it started) lapse after the orchestration timeout instead of leaking.
+        now = time.monotonic()
+        self.reservations = {r for r in self.reservations if r.expires_at > now}
+        return sum(r.amount_usd for r in self.reservations)
+
+    @property
+    def committed_usd(self) -> float:
+        return self.spend_usd + self.reserved_usd
+
+
+class BudgetEnforcer:
+    def __init__(
+        self,
+        tracker: CostTracker | None = None,
+        staleness_seconds: float = settings.budget_snapshot_ttl_seconds,
+    ):
+        self.tracker = tracker or CostTracker()
+        self.staleness_seconds = staleness_seconds
+        self._snapshots: dict[str, _Snapshot] = {}
+        self._loads: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    def is_over_budget(self, tenant_id: str) -> bool:
+        """Local-only check for middleware — never touches the network."""
+        snap = self._snapshots.get(tenant_id)
+        if snap is None or snap.day != date.today():
+            return False
+        return snap.committed_usd >= snap.budget_usd
+
+    def invalidate(self, tenant_id: str) -> None:
+        self._snapshots.pop(tenant_id, None)
+
+    def _needs_load(self, snap: _Snapshot | None, today: date) -> bool:
+        return snap is None or snap.day != today or time.monotonic() - snap.fetched_at > self.staleness_seconds
+
+    async def _snapshot(self, tenant_id: str, budget_usd: float) -> _Snapshot:
+        today = date.today()
+        snap = self._snapshots.get(tenant_id)
+        if self._needs_load(snap, today):
+            # One load per tenant at a time; whoever waited re-checks instead of
+            # replacing a snapshot that may already hold other reservations.
+            async with self._loads[tenant_id]:
+                snap = self._snapshots.get(tenant_id)
+                if self._needs_load(snap, today):
+                    now = time.monotonic()
+                    spend = await self.tracker.get_daily_spend(tenant_id, today)
+                    snap = self._snapshots.get(tenant_id)
+                    if snap is None or snap.day != today:
+                        snap = _Snapshot(day=today, spend_usd=spend, budget_usd=budget_usd, fetched_at=now)
+                        self._snapshots[tenant_id] = snap
+                    else:
+                        snap.spend_usd = spend
+                        snap.fetched_at = now
+        snap.budget_usd = budget_usd
+        return snap
+
+    async def reserve(self, tenant_id: str, budget_usd: float, estimate_usd: float) -> Reservation:
+        snap = await self._snapshot(tenant_id, budget_usd)
+        if snap.committed_usd + estimate_usd > budget_usd:
+            log.warning(
+                "budget.rejected",
+                tenant_id=tenant_id,
+                spend_usd=snap.spend_usd,
+                estimate_usd=estimate_usd,
+                budget_usd=budget_usd,
+            )
+            raise BudgetExceededError(tenant_id, snap.committed_usd, budget_usd)
+        reservation = Reservation(
+            tenant_id=tenant_id,
+            amount_usd=estimate_usd,
+            expires_at=time.monotonic() + settings.nexus_timeout_seconds,
+        )
+        snap.reservations.add(reservation)
+        return reservation
+
+    def reconcile(self, reservation: Reservation, actual_usd: float) -> None:
+        """Swap the reserved estimate for the actual cost of the request."""
+        if reservation.settled:
+            return
+        reservation.settled = True
+        snap = self._snapshots.get(reservation.tenant_id)
+        if snap is None:
+            return
+        snap.reservations.discard(reservation)
+        snap.spend_usd += actual_usd
+
+    def release(self, reservation: Reservation) -> None:
+        self.reconcile(reservation, 0.0)
+
+
+_enforcer: BudgetEnforcer | None = None
+
+
+def get_budget_enforcer() -> BudgetEnforcer:
+    global _enforcer
+    if _enforcer is None:
+        _enforcer = BudgetEnforcer()
+    return _enforcer
@@ -0,0 +1,247 @@
+"""
+NexusAI — Cost Aggregator
+Write-behind accumulation of per-(tenant, day, model, provider) spend.
+Deltas are merged in process and flushed to Redis in a single MULTI/EXEC:
+scalar daily/MTD totals plus per-model hashes for breakdowns.
+
+Each flush carries an id that the transaction also writes as a marker key.
+A flush whose outcome is unknown (the EXEC reply was lost) is retried with the
+same id and batch. If the marker exists, the retry is skipped, so a cost is
+never counted twice.
+
+While Redis is failing there is no inline flush. Once ``max_unflushed_usd`` is
+reached, new deltas are dropped and counted in ``stats()``, which keeps both
+request latency and what a crash can lose bounded. Billing itself is
+unaffected: every cost is also written to ``cost_records`` by the
+CostRecordWriter. Only the live Redis totals undercount until Redis is back.
+"""
+
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+
+import structlog
+
+from app.config import settings
+from app.services.flusher import BackgroundFlusher
+
+log = structlog.get_logger(__name__)
+
+REDIS_KEY_DAILY = "nexus:cost:daily:{tenant_id}:{date}"
+REDIS_KEY_MTD = "nexus:cost:mtd:{tenant_id}:{year_month}"
+REDIS_KEY_MODELS_DAILY = "nexus:cost:models:daily:{tenant_id}:{date}"
+REDIS_KEY_MODELS_MTD = "nexus:cost:models:mtd:{tenant_id}:{year_month}"
+REDIS_KEY_FLUSH = "nexus:cost:flush:{flush_id}"
+
+DAILY_TTL = 86400 * 2
+MTD_TTL = 86400 * 35
+FLUSH_MARKER_TTL = 86400
+
+
+@dataclass
+class CostDelta:
+    cost_usd: float = 0.0
+    tokens: int = 0
+    calls: int = 0
+
+    def merge(self, other: "CostDelta") -> None:
+        self.cost_usd += other.cost_usd
+        self.tokens += other.tokens
+        self.calls += other.calls
+
+
+PendingKey = tuple[str, date, str, str]
+
+
+@dataclass
+class _Flush:
+    batch: dict[PendingKey, CostDelta]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+
+    @property
+    def cost_usd(self) -> float:
+        return sum(delta.cost_usd for delta in self.batch.values())
+
+
+def model_field(model: str, provider: str, metric: str) -> str:
+    """Hash field layout: ``<model>:<provider>:<cost|tokens|calls>``."""
+    return f"{model}:{provider}:{metric}"
+
+
+def parse_model_hash(raw: dict) -> dict[tuple[str, str], dict]:
+    """Turn an HGETALL reply into ``{(provider, model): {provider, model, cost_usd, tokens, calls}}``."""
+    rows: dict[tuple[str, str], dict] = {}
+    for key, value in raw.items():
+        model, provider, metric = key.rsplit(":", 2)
+        row = rows.setdefault(
+            (provider, model), {"provider": provider, "model": model, "cost_usd": 0.0, "tokens": 0, "calls": 0}
+        )
+        if metric == "cost":
+            row["cost_usd"] += float(value)
+        else:
+            row[metric] += int(value)
+    return rows
+
+
+class CostAggregator(BackgroundFlusher):
+    name = "cost"
+
+    def __init__(
+        self,
+        interval_ms: int = settings.cost_flush_interval_ms,
+        max_entries: int = settings.cost_flush_max_entries,
+        max_unflushed_usd: float = settings.cost_max_unflushed_usd,
+    ):
+        super().__init__(interval_ms)
+        self.max_entries = max_entries
+        self.max_unflushed_usd = max_unflushed_usd
+        self._pending: dict[PendingKey, CostDelta] = defaultdict(CostDelta)
+        self._unconfirmed: _Flush | None = None  # taken from _pending, not yet known to be in Redis
+        self._entries = 0
+        self._unflushed_usd = 0.0
+        self._failing = False
+        self._dropping = False
+        self.dropped = 0
+        self.dropped_usd = 0.0
+
+    async def add(
+        self,
+        tenant_id: str,
+        model: str,
+        cost_usd: float,
+        provider: str = "unknown",
+        tokens: int = 0,
+        day: date | None = None,
+    ) -> None:
+        if self._failing and self._unflushed_usd >= self.max_unflushed_usd:
+            if not self._dropping:
+                self._dropping = True
+                log.error("cost.aggregate.dropping", unflushed_usd=round(self._unflushed_usd, 6))
+            self.dropped += 1
+            self.dropped_usd += cost_usd
+            return
+
+        self._pending[(tenant_id, day or date.today(), model, provider)].merge(
+            CostDelta(cost_usd=cost_usd, tokens=tokens, calls=1)
+        )
+        self._entries += 1
+        self._unflushed_usd += cost_usd
+        self.ensure_running()
+
+        if self._unflushed_usd >= self.max_unflushed_usd and not self._failing:
+            # Bound what a crash can lose: flush inline instead of waiting for the loop.
+            await self.flush_now()
+        elif self._entries >= self.max_entries:
+            self.wake()
+
+    def _pending_items(self, tenant_id: str):
+        buffers = [self._pending] if self._unconfirmed is None else [self._pending, self._unconfirmed.batch]
+        for buf in buffers:
+            for (t, d, model, provider), delta in buf.items():
+                if t == tenant_id:
+                    yield d, model, provider, delta
+
+    def pending_daily(self, tenant_id: str, day: date) -> float:
+        return sum(delta.cost_usd for d, _, _, delta in self._pending_items(tenant_id) if d == day)
+
+    def pending_mtd(self, tenant_id: str, day: date) -> float:
+        return sum(
+            delta.cost_usd
+            for d, _, _, delta in self._pending_items(tenant_id)
+            if d.year == day.year and d.month == day.month
+        )
+
+    def pending_by_model(self, tenant_id: str, day: date, month: bool = False) -> dict[tuple[str, str], dict]:
+        raw: dict[str, float] = defaultdict(float)
+        for d, model, provider, delta in self._pending_items(tenant_id):
+            if d == day or (month and d.year == day.year and d.month == day.month):
+                raw[model_field(model, provider, "cost")] += delta.cost_usd
+                raw[model_field(model, provider, "tokens")] += delta.tokens
+                raw[model_field(model, provider, "calls")] += delta.calls
+        return parse_model_hash(raw)
+
+    async def flush(self) -> None:
+        # At most two rounds: an unconfirmed batch from an earlier failure, then what is pending now.
+        for _ in range(2):
+            if self._unconfirmed is None:
+                if not self._pending:
+                    break
+                self._unconfirmed = _Flush(self._pending)
+                self._pending = defaultdict(CostDelta)
+                self._entries = 0
+            pending = self._unconfirmed
+            try:
+                await self._apply(pending)
+            except Exception as exc:
+                pending.attempts += 1
+                self._failing = True
+                log.error("cost.flush.failed", error=str(exc), keys=len(pending.batch), attempts=pending.attempts)
+                return
+            self._unconfirmed = None
+            self._unflushed_usd = max(self._unflushed_usd - pending.cost_usd, 0.0)
+            if self._failing:
+                log.info("cost.flush.recovered", dropped=self.dropped, dropped_usd=round(self.dropped_usd, 6))
+                self._failing = False
+                self._dropping = False
+
+    async def _apply(self, pending: _Flush) -> None:
+        from app.cache import get_redis
+
+        redis = get_redis()
+        marker = REDIS_KEY_FLUSH.format(flush_id=pending.id)
+        if pending.attempts and await redis.exists(marker):
+            log.info("cost.flush.already_applied", flush_id=pending.id)
+            return
+
+        daily: dict[tuple[str, date], float] = defaultdict(float)
+        mtd: dict[tuple[str, str], float] = defaultdict(float)
+        for (tenant_id, day, _model, _provider), delta in pending.batch.items():
+            daily[(tenant_id, day)] += delta.cost_usd
+            mtd[(tenant_id, day.strftime("%Y-%m"))] += delta.cost_usd
+
+        pipe = redis.pipeline(transaction=True)
+        pipe.set(marker, 1, ex=FLUSH_MARKER_TTL)
+        for (tenant_id, day), cost in daily.items():
+            key = REDIS_KEY_DAILY.format(tenant_id=tenant_id, date=day.isoformat())
+            pipe.incrbyfloat(key, cost)
+            pipe.expire(key, DAILY_TTL)
+        for (tenant_id, year_month), cost in mtd.items():
+            key = REDIS_KEY_MTD.format(tenant_id=tenant_id, year_month=year_month)
+            pipe.incrbyfloat(key, cost)
+            pipe.expire(key, MTD_TTL)
+        hash_ttls: dict[str, int] = {}
+        for (tenant_id, day, model, provider), delta in pending.batch.items():
+            for key, ttl in (
+                (REDIS_KEY_MODELS_DAILY.format(tenant_id=tenant_id, date=day.isoformat()), DAILY_TTL),
+                (REDIS_KEY_MODELS_MTD.format(tenant_id=tenant_id, year_month=day.strftime("%Y-%m")), MTD_TTL),
+            ):
+                pipe.hincrbyfloat(key, model_field(model, provider, "cost"), delta.cost_usd)
+                pipe.hincrby(key, model_field(model, provider, "tokens"), delta.tokens)
+                pipe.hincrby(key, model_field(model, provider, "calls"), delta.calls)
+                hash_ttls[key] = ttl
+        for key, ttl in hash_ttls.items():
+            pipe.expire(key, ttl)
+        await pipe.execute()
+        log.debug("cost.flushed", keys=len(pending.batch), tenants=len(daily))
+
+    def stats(self) -> dict:
+        return {
+            "pending_keys": len(self._pending),
+            "unconfirmed_keys": len(self._unconfirmed.batch) if self._unconfirmed else 0,
+            "unflushed_usd": round(self._unflushed_usd, 6),
+            "failing": self._failing,
+            "dropped": self.dropped,
+            "dropped_usd": round(self.dropped_usd, 6),
+        }
+
+
+_aggregator: CostAggregator | None = None
+
+
+def get_cost_aggregator() -> CostAggregator:
+    global _aggregator
+    if _aggregator is None:
+        _aggregator = CostAggregator()
+    return _aggregator
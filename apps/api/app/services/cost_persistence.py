@@ -0,0 +1,227 @@
+"""
+NexusAI — Cost Persistence
+Durable CostRecord storage: batched bulk inserts plus an incremental
+DailyCostAggregate rollup maintained in the same transaction.
+
+Every entry carries its own id and rows go in with ``ON CONFLICT DO NOTHING``,
+so a batch whose commit outcome is unknown can be retried whole: rows that
+already landed are skipped and only rows actually inserted reach the rollup.
+``by_model`` is keyed by (provider, model) like the Redis breakdowns, and a
+request is counted once per day however many batches its costs span.
+
+A batch the database rejects (IntegrityError/DataError, such as a deleted
+tenant's FK) is rewritten row by row. Only the offending rows are dropped,
+and they are counted in ``stats()``, so one bad row can't wedge the writer.
+"""
+
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+
+import structlog
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.config import settings
+from app.services.flusher import BackgroundFlusher
+
+log = structlog.get_logger(__name__)
+
+
+@dataclass
+class CostEntry:
+    tenant_id: str
+    request_id: str
+    model: str
+    provider: str
+    input_tokens: int
+    output_tokens: int
+    cost_usd: float
+    period_date: date
+    created_at: datetime
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+
+def model_key(provider: str, model: str) -> str:
+    """``by_model`` key for a (provider, model) pair; the row itself also carries both fields."""
+    return f"{provider}:{model}"
+
+
+def merge_by_model(target: dict, delta: dict) -> dict:
+    merged = {model: dict(stats) for model, stats in (target or {}).items()}
+    for model, stats in delta.items():
+        row = merged.setdefault(model, {})
+        for name, value in stats.items():
+            row[name] = row.get(name, 0) + value if isinstance(value, int | float) else value
+    return merged
+
+
+class CostRecordWriter(BackgroundFlusher):
+    name = "cost_records"
+
+    def __init__(
+        self,
+        interval_ms: int = settings.cost_persist_interval_ms,
+        batch_size: int = settings.cost_persist_batch_size,
+        max_buffer: int = settings.cost_persist_max_buffer,
+    ):
+        super().__init__(interval_ms)
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self._buffer: list[CostEntry] = []
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def enqueue(self, entry: CostEntry) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            log.error("cost.persist.dropped", tenant_id=entry.tenant_id, request_id=entry.request_id)
+            return
+        self._buffer.append(entry)
+        self.ensure_running()
+        if len(self._buffer) >= self.batch_size:
+            self.wake()
+
+    async def flush(self) -> None:
+        while self._buffer:
+            batch = self._buffer[: self.batch_size]
+            del self._buffer[: self.batch_size]
+            try:
+                await self._write(batch)
+            except (IntegrityError, DataError) as exc:
+                log.warning("cost.persist.batch_rejected", error=str(exc.orig), records=len(batch))
+                unwritten = await self._write_each(batch)
+                if unwritten:
+                    self._buffer[:0] = unwritten
+                    return
+            except Exception as exc:
+                self._buffer[:0] = batch
+                log.error("cost.persist.failed", error=str(exc), records=len(batch))
+                return
+
+    async def _write_each(self, batch: list[CostEntry]) -> list[CostEntry]:
+        """Write rows one at a time, skipping rejected ones; returns the rest if the DB goes away."""
+        for i, entry in enumerate(batch):
+            try:
+                await self._write([entry])
+            except (IntegrityError, DataError) as exc:
+                self.rejected += 1
+                log.error(
+                    "cost.persist.row_rejected",
+                    error=str(exc.orig),
+                    tenant_id=entry.tenant_id,
+                    request_id=entry.request_id,
+                )
+            except Exception as exc:
+                log.error("cost.persist.failed", error=str(exc), records=len(batch) - i)
+                return batch[i:]
+        return []
+
+    async def _write(self, batch: list[CostEntry]) -> None:
+        from app.database import AsyncSessionLocal
+        from app.models.cost_record import CostRecord
+
+        async with AsyncSessionLocal() as session, session.begin():
+            result = await session.execute(
+                pg_insert(CostRecord)
+                .values([asdict(e) for e in batch])
+                .on_conflict_do_nothing(index_elements=["id", "created_at"])
+                .returning(CostRecord.id)
+            )
+            inserted = set(result.scalars())
+            fresh = [e for e in batch if e.id in inserted]
+            if fresh:
+                await self._rollup(session, fresh)
+        self.written += len(fresh)
+        if len(fresh) < len(batch):
+            log.info("cost.persist.already_written", records=len(batch) - len(fresh))
+        log.debug("cost.persisted", records=len(fresh))
+
+    async def _counted_requests(self, session, batch: list[CostEntry]) -> set[tuple[str, date, str]]:
+        """(tenant, day, request) triples already counted by rows written in earlier batches."""
+        from app.models.cost_record import CostRecord
+
+        keys = {(e.tenant_id, e.period_date, e.request_id) for e in batch}
+        rows = await session.execute(
+            select(CostRecord.tenant_id, CostRecord.period_date, CostRecord.request_id)
+            .where(tuple_(CostRecord.tenant_id, CostRecord.period_date, CostRecord.request_id).in_(list(keys)))
+            .where(CostRecord.id.not_in([e.id for e in batch]))
+            .distinct()
+        )
+        return {tuple(row) for row in rows.all()}
+
+    async def _rollup(self, session, batch: list[CostEntry]) -> None:
+        from app.models.cost_record import DailyCostAggregate
+
+        counted = await self._counted_requests(session, batch)
+        deltas: dict[tuple[str, date], dict] = {}
+        requests: dict[tuple[str, date], set[str]] = defaultdict(set)
+        for e in batch:
+            key = (e.tenant_id, e.period_date)
+            agg = deltas.setdefault(key, {"tokens": 0, "cost_usd": 0.0, "by_model": {}})
+            tokens = e.input_tokens + e.output_tokens
+            agg["tokens"] += tokens
+            agg["cost_usd"] += e.cost_usd
+            agg["by_model"] = merge_by_model(
+                agg["by_model"],
+                {
+                    model_key(e.provider, e.model): {
+                        "provider": e.provider,
+                        "model": e.model,
+                        "cost_usd": e.cost_usd,
+                        "tokens": tokens,
+                        "requests": 1,
+                    }
+                },
+            )
+            if (e.tenant_id, e.period_date, e.request_id) not in counted:
+                requests[key].add(e.request_id)
+
+        # Make sure every (tenant, day) row exists, then lock them all in one statement.
+        await session.execute(
+            pg_insert(DailyCostAggregate)
+            .values([{"tenant_id": t, "period_date": d, "by_model": {}} for t, d in deltas])
+            .on_conflict_do_nothing(index_elements=["tenant_id", "period_date"])
+        )
+        rows = await session.execute(
+            select(DailyCostAggregate)
+            .where(tuple_(DailyCostAggregate.tenant_id, DailyCostAggregate.period_date).in_(list(deltas)))
+            .order_by(DailyCostAggregate.tenant_id, DailyCostAggregate.period_date)
+            .with_for_update()
+        )
+        updates = []
+        for agg in rows.scalars():
+            key = (agg.tenant_id, agg.period_date)
+            delta = deltas[key]
+            updates.append(
+                {
+                    "id": agg.id,
+                    "total_requests": (agg.total_requests or 0) + len(requests[key]),
+                    "total_tokens": (agg.total_tokens or 0) + delta["tokens"],
+                    "total_cost_usd": (agg.total_cost_usd or 0.0) + delta["cost_usd"],
+                    "by_model": merge_by_model(agg.by_model, delta["by_model"]),
+                }
+            )
+        if updates:
+            await session.execute(update(DailyCostAggregate), updates)
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
+
+
+_writer: CostRecordWriter | None = None
+
+
+def get_cost_record_writer() -> CostRecordWriter:
+    global _writer
+    if _writer is None:
+        _writer = CostRecordWriter()
+    return _writer
@@ -3,30 +3,48 @@ NexusAI — Cost Tracker
 Records inference costs, enforces budgets, provides analytics.
 """
 
-from dataclasses import dataclass
+import calendar
 from datetime import UTC, date, datetime
 
 import structlog
 
+from app.services.cost_aggregator import (
+    REDIS_KEY_DAILY,
+    REDIS_KEY_MODELS_DAILY,
+    REDIS_KEY_MODELS_MTD,
+    REDIS_KEY_MTD,
+    CostAggregator,
+    get_cost_aggregator,
+    parse_model_hash,
+)
+from app.services.cost_persistence import (
+    CostEntry,
+    CostRecordWriter,
+    get_cost_record_writer,
+    merge_by_model,
+)
+
 log = structlog.get_logger(__name__)
 
+__all__ = ["CostTracker", "CostEntry"]
+
 
-@dataclass
-class CostEntry:
-    tenant_id: str
-    request_id: str
-    model: str
-    provider: str
-    input_tokens: int
-    output_tokens: int
-    cost_usd: float
-    period_date: date
-    created_at: datetime
+def by_cost(rows: dict[tuple[str, str], dict]) -> list[dict]:
+    """One row per (provider, model), most expensive first."""
+    return sorted(rows.values(), key=lambda row: -row["cost_usd"])
 
 
 class CostTracker:
-    REDIS_KEY_DAILY = "nexus:cost:daily:{tenant_id}:{date}"
-    REDIS_KEY_MTD = "nexus:cost:mtd:{tenant_id}:{year_month}"
+    REDIS_KEY_DAILY = REDIS_KEY_DAILY
+    REDIS_KEY_MTD = REDIS_KEY_MTD
+
+    def __init__(
+        self,
+        aggregator: CostAggregator | None = None,
+        writer: CostRecordWriter | None = None,
+    ):
+        self.aggregator = aggregator or get_cost_aggregator()
+        self.writer = writer or get_cost_record_writer()
 
     async def record(
         self,
@@ -39,47 +57,57 @@ class CostTracker:
         cost_usd: float,
     ) -> None:
         today = date.today()
-
         try:
-            from app.cache import get_redis
-
-            redis = get_redis()
-            daily_key = self.REDIS_KEY_DAILY.format(tenant_id=tenant_id, date=today.isoformat())
-            mtd_key = self.REDIS_KEY_MTD.format(tenant_id=tenant_id, year_month=today.strftime("%Y-%m"))
-
-            pipe = redis.pipeline()
-            pipe.incrbyfloat(daily_key, cost_usd)
-            pipe.expire(daily_key, 86400 * 2)
-            pipe.incrbyfloat(mtd_key, cost_usd)
-            pipe.expire(mtd_key, 86400 * 35)
-            await pipe.execute()
+            self.writer.enqueue(
+                CostEntry(
+                    tenant_id=tenant_id,
+                    request_id=request_id,
+                    model=model,
+                    provider=provider,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    cost_usd=cost_usd,
+                    period_date=today,
+                    created_at=datetime.now(UTC),
+                )
+            )
+            await self.aggregator.add(
+                tenant_id,
+                model,
+                cost_usd,
+                provider=provider,
+                tokens=input_tokens + output_tokens,
+                day=today,
+            )
             log.debug("cost.recorded", tenant_id=tenant_id, cost_usd=cost_usd, model=model)
         except Exception as exc:
             log.error("cost.record.failed", error=str(exc), tenant_id=tenant_id)
 
     async def get_daily_spend(self, tenant_id: str, day: date | None = None) -> float:
         day = day or date.today()
+        pending = self.aggregator.pending_daily(tenant_id, day)
         try:
             from app.cache import get_redis
 
             redis = get_redis()
             key = self.REDIS_KEY_DAILY.format(tenant_id=tenant_id, date=day.isoformat())
             val = await redis.get(key)
-            return float(val) if val else 0.0
+            return (float(val) if val else 0.0) + pending
         except Exception:
-            return 0.0
+            return pending
 
     async def get_mtd_spend(self, tenant_id: str) -> float:
         today = date.today()
+        pending = self.aggregator.pending_mtd(tenant_id, today)
         try:
             from app.cache import get_redis
 
             redis = get_redis()
             key = self.REDIS_KEY_MTD.format(tenant_id=tenant_id, year_month=today.strftime("%Y-%m"))
             val = await redis.get(key)
-            return float(val) if val else 0.0
+            return (float(val) if val else 0.0) + pending
         except Exception:
-            return 0.0
+            return pending
 
     async def check_budget(self, tenant_id: str, budget_usd: float) -> tuple[bool, float, float]:
         spend = await self.get_daily_spend(tenant_id)
@@ -87,18 +115,48 @@ class CostTracker:
         return spend < budget_usd, spend, pct
 
     async def get_cost_breakdown(self, tenant_id: str) -> dict:
+        today = date.today()
+        year_month = today.strftime("%Y-%m")
+        by_model = self.aggregator.pending_by_model(tenant_id, today, month=True)
+        today_by_model = self.aggregator.pending_by_model(tenant_id, today)
+        mtd_usd = self.aggregator.pending_mtd(tenant_id, today)
+        today_usd = self.aggregator.pending_daily(tenant_id, today)
+        try:
+            from app.cache import get_redis
+
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.get(self.REDIS_KEY_MTD.format(tenant_id=tenant_id, year_month=year_month))
+            pipe.get(self.REDIS_KEY_DAILY.format(tenant_id=tenant_id, date=today.isoformat()))
+            pipe.hgetall(REDIS_KEY_MODELS_MTD.format(tenant_id=tenant_id, year_month=year_month))
+            pipe.hgetall(REDIS_KEY_MODELS_DAILY.format(tenant_id=tenant_id, date=today.isoformat()))
+            mtd_val, today_val, mtd_models, today_models = await pipe.execute()
+            mtd_usd += float(mtd_val or 0.0)
+            today_usd += float(today_val or 0.0)
+            by_model = merge_by_model(parse_model_hash(mtd_models), by_model)
+            today_by_model = merge_by_model(parse_model_hash(today_models), today_by_model)
+        except Exception as exc:
+            log.error("cost.breakdown.failed", error=str(exc), tenant_id=tenant_id)
+
         return {
-            "mtd_usd": await self.get_mtd_spend(tenant_id),
-            "today_usd": await self.get_daily_spend(tenant_id),
-            "by_model": {},
+            "mtd_usd": mtd_usd,
+            "today_usd": today_usd,
+            "by_model": by_cost(by_model),
+            "today_by_model": by_cost(today_by_model),
         }
 
     async def get_platform_stats(self) -> dict:
+        from app.config import settings
+        from app.services.platform_stats import get_platform_stats
+
+        today = date.today()
+        days_in_month = calendar.monthrange(today.year, today.month)[1]
+        mtd = (await get_platform_stats().snapshot(today))["mtd"]
+        spend = mtd.get("cost_usd", 0.0)
+        tokens = mtd.get("tokens", 0.0)
         return {
-            "mtd_spend_usd": 24_100.0,
-            "projected_eom_usd": 31_400.0,
-            "budget_usd": 30_000.0,
-            "saved_by_nexus_usd": 8_400.0,
-            "cost_per_1m_tokens": 4.82,
+            "mtd_spend_usd": round(spend, 4),
+            "projected_eom_usd": round(spend / today.day * days_in_month, 2),
+            "budget_usd": settings.global_daily_budget_usd * days_in_month,
+            "cost_per_1m_tokens": round(spend / tokens * 1_000_000, 4) if tokens else 0.0,
             "generated_at": datetime.now(UTC).isoformat(),
         }
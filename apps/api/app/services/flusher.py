@@ -0,0 +1,81 @@
+"""
+NexusAI — Background Flusher
+Shared write-behind loop for in-process buffers that drain to Redis/Postgres.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+
+import structlog
+
+log = structlog.get_logger(__name__)
+
+_registry: list["BackgroundFlusher"] = []
+
+
+class BackgroundFlusher(ABC):
+    """Calls ``flush()`` every ``interval_ms`` or as soon as ``wake()`` is called.
+
+    The loop is started lazily from the first buffered write, so singletons
+    created on the request path do not need an explicit startup hook.
+    """
+
+    name = "flusher"
+
+    def __init__(self, interval_ms: int):
+        self.interval = interval_ms / 1000
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        _registry.append(self)
+
+    @abstractmethod
+    async def flush(self) -> None:
+        """Drain the buffer once.
+
+        Only safe under ``_flush_lock``, which the loop holds; anything else
+        (shutdown, tests, admin endpoints) calls ``flush_now()`` instead so it
+        can't interleave with a loop flush.
+        """
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def ensure_running(self) -> None:
+        if self._task is not None or self._stopping:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._run(), name=f"flusher:{self.name}")
+
+    async def flush_now(self) -> None:
+        async with self._flush_lock:
+            try:
+                await self.flush()
+            except Exception as exc:
+                log.error("flusher.failed", flusher=self.name, error=str(exc))
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush_now()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush_now()
+
+
+async def stop_flushers() -> None:
+    """Drain every registered buffer — called from the app lifespan on shutdown."""
+    await asyncio.gather(*(f.stop() for f in _registry), return_exceptions=True)
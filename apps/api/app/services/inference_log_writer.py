@@ -0,0 +1,333 @@
+"""
+NexusAI — Inference Log Writer
+Write-behind persistence of ``InferenceLog`` rows off the request path.
+
+Requests only append a tuple to an in-memory buffer; the flusher streams
+batches into Postgres with asyncpg's binary ``COPY``, which is several times
+cheaper per row than multi-row INSERTs.
+
+A batch that fails to write goes back on the buffer and is retried on the
+next tick. After ``inference_log_spill_after_failures`` consecutive failures
+the database is treated as unavailable: the whole buffer is moved to an
+NDJSON segment file under ``inference_log_spill_dir``, so memory stays at
+most ``inference_log_max_buffer`` rows however long the outage lasts. Once
+writes succeed again, segments are replayed oldest first. A segment is
+claimed by renaming it, so workers sharing the directory never replay the
+same file twice.
+
+A batch Postgres rejects outright (a constraint or data error, e.g. a
+duplicate from a replay cut short between commit and unlink) is retried row
+by row with ``INSERT ... ON CONFLICT DO NOTHING``, so one bad row never
+wedges the pipeline.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+import orjson
+import structlog
+
+from app.config import settings
+from app.services.flusher import BackgroundFlusher
+
+log = structlog.get_logger(__name__)
+
+COLUMNS = (
+    "id",
+    "request_id",
+    "tenant_id",
+    "user_id",
+    "api_key_id",
+    "pipeline_id",
+    "model",
+    "provider",
+    "mode",
+    "latency_ms",
+    "input_tokens",
+    "output_tokens",
+    "total_tokens",
+    "cost_usd",
+    "consensus_score",
+    "synthesized",
+    "models_used",
+    "safety_passed",
+    "pii_detected",
+    "pii_entities",
+    "prompt_hash",
+    "status_code",
+    "error_message",
+    "created_at",
+)
+JSON_COLUMNS = frozenset({"models_used", "pii_entities"})
+SEGMENT_SUFFIX = ".ndjson"
+
+
+@dataclass
+class InferenceRecord:
+    request_id: str
+    tenant_id: str
+    model: str
+    provider: str
+    latency_ms: float
+    mode: str = "chat"
+    user_id: str | None = None
+    api_key_id: str | None = None
+    pipeline_id: str | None = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    consensus_score: float | None = None
+    synthesized: bool = False
+    models_used: list = field(default_factory=list)
+    safety_passed: bool = True
+    pii_detected: bool = False
+    pii_entities: list = field(default_factory=list)
+    prompt_hash: str | None = None
+    status_code: int = 200
+    error_message: str | None = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+    def row(self) -> tuple:
+        """Values in ``COLUMNS`` order, JSON columns pre-encoded as asyncpg expects."""
+        values = {
+            **self.__dict__,
+            "id": str(uuid.uuid4()),
+            "user_id": self.user_id or None,
+            "total_tokens": self.input_tokens + self.output_tokens,
+        }
+        return tuple(orjson.dumps(values[c]).decode() if c in JSON_COLUMNS else values[c] for c in COLUMNS)
+
+
+def _encode_row(row: tuple) -> bytes:
+    return orjson.dumps(dict(zip(COLUMNS, row))) + b"\n"
+
+
+def _decode_row(line: bytes) -> tuple:
+    data = orjson.loads(line)
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    return tuple(data[c] for c in COLUMNS)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SpillDirectory:
+    """NDJSON segments of rows that could not be written, shared by every worker on the host."""
+
+    def __init__(
+        self,
+        path: str = settings.inference_log_spill_dir,
+        max_bytes: int = settings.inference_log_spill_max_bytes,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._recovered = False
+
+    def _segments(self, pattern: str) -> list[Path]:
+        try:
+            return sorted(self.path.glob(pattern))
+        except OSError:
+            return []
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self._segments(f"*{SEGMENT_SUFFIX}*") if p.exists())
+
+    def write(self, rows: list[tuple]) -> Path:
+        """Persist ``rows`` as a new segment; raises ``OSError`` when full or unwritable."""
+        data = b"".join(_encode_row(r) for r in rows)
+        self.path.mkdir(parents=True, exist_ok=True)
+        if self.size() + len(data) > self.max_bytes:
+            raise OSError(f"spill directory over {self.max_bytes} bytes")
+        # Zero-padded ns timestamp: lexical order is write order.
+        final = self.path / f"{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}"
+        tmp = final.with_suffix(".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        tmp.rename(final)
+        return final
+
+    def claim(self) -> Path | None:
+        """Oldest unclaimed segment, renamed so no other worker picks it up."""
+        self._release_orphans()
+        for segment in self._segments(f"*{SEGMENT_SUFFIX}"):
+            claimed = segment.with_name(f"{segment.name}.{os.getpid()}")
+            try:
+                segment.rename(claimed)
+            except FileNotFoundError:
+                continue  # another worker got there first
+            return claimed
+        return None
+
+    def release(self, claimed: Path) -> None:
+        claimed.rename(claimed.with_name(claimed.name.rsplit(".", 1)[0]))
+
+    def _release_orphans(self) -> None:
+        """Put back segments claimed by workers that died mid-replay.
+
+        Claims carrying our own pid before we have claimed anything come from
+        a dead predecessor that had the same pid (e.g. after a container restart).
+        """
+        own = str(os.getpid())
+        for claimed in self._segments(f"*{SEGMENT_SUFFIX}.*"):
+            pid = claimed.name.rsplit(".", 1)[1]
+            orphaned = not self._recovered if pid == own else pid.isdigit() and not _pid_alive(int(pid))
+            if orphaned:
+                try:
+                    self.release(claimed)
+                except FileNotFoundError:
+                    pass
+        self._recovered = True
+
+    @staticmethod
+    def read(claimed: Path) -> list[tuple]:
+        with open(claimed, "rb") as fh:
+            return [_decode_row(line) for line in fh if line.strip()]
+
+
+class InferenceLogWriter(BackgroundFlusher):
+    name = "inference_logs"
+
+    def __init__(
+        self,
+        interval_ms: int = settings.inference_log_flush_interval_ms,
+        batch_size: int = settings.inference_log_batch_size,
+        max_buffer: int = settings.inference_log_max_buffer,
+        spill_after_failures: int = settings.inference_log_spill_after_failures,
+        spill: SpillDirectory | None = None,
+    ):
+        super().__init__(interval_ms)
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.spill_after_failures = spill_after_failures
+        self.spill = spill or SpillDirectory()
+        self._buffer: list[tuple] = []
+        self._failures = 0
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def enqueue(self, record: InferenceRecord) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            log.warning("inference_log.dropped", tenant_id=record.tenant_id, request_id=record.request_id)
+            return
+        self._buffer.append(record.row())
+        self.ensure_running()
+        if len(self._buffer) >= self.batch_size:
+            self.wake()
+
+    async def flush(self) -> None:
+        while self._buffer:
+            batch = self._buffer[: self.batch_size]
+            del self._buffer[: self.batch_size]
+            try:
+                await self._copy(batch)
+            except Exception as exc:
+                self._buffer[:0] = batch
+                self._failures += 1
+                log.error("inference_log.flush.failed", error=str(exc), rows=len(batch), failures=self._failures)
+                if self._failures >= self.spill_after_failures or self._stopping:
+                    await self._spill()
+                return
+            self._failures = 0
+            self.written += len(batch)
+        if not self._stopping:
+            await self._replay()
+
+    async def _spill(self) -> None:
+        rows, self._buffer = self._buffer, []
+        try:
+            segment = await asyncio.to_thread(self.spill.write, rows)
+        except OSError as exc:
+            # Nowhere to put them: keep what fits in memory and keep retrying.
+            self._buffer = rows[-self.max_buffer :]
+            self.dropped += len(rows) - len(self._buffer)
+            log.error("inference_log.spill.failed", error=str(exc), rows=len(rows))
+            return
+        self.spilled += len(rows)
+        log.warning("inference_log.spilled", rows=len(rows), segment=str(segment))
+
+    async def _replay(self, max_segments: int = 4) -> None:
+        """Load a few spilled segments per healthy flush, so replay never starves live rows."""
+        for _ in range(max_segments):
+            claimed = await asyncio.to_thread(self.spill.claim)
+            if claimed is None:
+                return
+            try:
+                rows = await asyncio.to_thread(self.spill.read, claimed)
+                for i in range(0, len(rows), self.batch_size):
+                    await self._copy(rows[i : i + self.batch_size])
+            except Exception as exc:
+                await asyncio.to_thread(self.spill.release, claimed)
+                log.error("inference_log.replay.failed", error=str(exc), segment=str(claimed))
+                return
+            await asyncio.to_thread(claimed.unlink)
+            self.replayed += len(rows)
+            log.info("inference_log.replayed", rows=len(rows), segment=str(claimed))
+
+    async def _copy(self, rows: list[tuple]) -> None:
+        from asyncpg.exceptions import DataError, IntegrityConstraintViolationError
+
+        from app.database import engine
+
+        async with engine.connect() as conn:
+            driver = (await conn.get_raw_connection()).driver_connection
+            try:
+                async with driver.transaction():
+                    await driver.copy_records_to_table("inference_logs", records=rows, columns=COLUMNS)
+            except (IntegrityConstraintViolationError, DataError) as exc:
+                # Retrying the same COPY would fail forever: fall back to rows one by one.
+                log.warning("inference_log.copy.rejected", error=str(exc), rows=len(rows))
+                await self._insert_each(driver, rows)
+
+    async def _insert_each(self, driver, rows: list[tuple]) -> None:
+        from asyncpg.exceptions import PostgresError
+
+        stmt = (
+            f"INSERT INTO inference_logs ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join(f'${i}' for i in range(1, len(COLUMNS) + 1))}) ON CONFLICT DO NOTHING"
+        )
+        for row in rows:
+            try:
+                await driver.execute(stmt, *row)
+            except PostgresError as exc:
+                self.rejected += 1
+                log.error("inference_log.row.rejected", error=str(exc), request_id=row[1], tenant_id=row[2])
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "consecutive_failures": self._failures,
+            "spill_bytes": self.spill.size(),
+        }
+
+
+_writer: InferenceLogWriter | None = None
+
+
+def get_inference_log_writer() -> InferenceLogWriter:
+    global _writer
+    if _writer is None:
+        _writer = InferenceLogWriter()
+    return _writer
@@ -0,0 +1,129 @@
+"""
+NexusAI — Inference Logs
+Tenant-scoped, keyset-paginated reads of ``inference_logs``, newest first.
+
+Pages seek on ``(created_at, id)`` within a tenant, walking
+``ix_inference_logs_tenant_created_id`` (or the ``model`` variant when that
+filter is set) backwards, so page N costs the same as page 1. Filters are
+pushed into the SQL, and the NDJSON export reads page by page so memory stays
+flat for any export size.
+"""
+
+import zlib
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Literal
+
+import orjson
+import structlog
+from sqlalchemy import select
+
+from app.config import settings
+from app.pagination import after
+
+log = structlog.get_logger(__name__)
+
+
+@dataclass
+class InferenceLogFilter:
+    model: str | None = None
+    status: Literal["ok", "error"] | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+
+    def apply(self, query):
+        from app.models.inference_log import InferenceLog
+
+        if self.model:
+            query = query.where(InferenceLog.model == self.model)
+        if self.status == "ok":
+            query = query.where(InferenceLog.status_code < 400)
+        elif self.status == "error":
+            query = query.where(InferenceLog.status_code >= 400)
+        if self.since:
+            query = query.where(InferenceLog.created_at >= self.since)
+        if self.until:
+            query = query.where(InferenceLog.created_at < self.until)
+        return query
+
+
+def serialize(row) -> dict:
+    return {
+        "id": row.id,
+        "request_id": row.request_id,
+        "user_id": row.user_id,
+        "api_key_id": row.api_key_id,
+        "pipeline_id": row.pipeline_id,
+        "model": row.model,
+        "provider": row.provider,
+        "mode": row.mode,
+        "latency_ms": row.latency_ms,
+        "input_tokens": row.input_tokens,
+        "output_tokens": row.output_tokens,
+        "total_tokens": row.total_tokens,
+        "cost_usd": row.cost_usd,
+        "consensus_score": row.consensus_score,
+        "synthesized": row.synthesized,
+        "models_used": row.models_used,
+        "safety_passed": row.safety_passed,
+        "pii_detected": row.pii_detected,
+        "status_code": row.status_code,
+        "error_message": row.error_message,
+        "created_at": row.created_at,
+    }
+
+
+async def fetch_page(
+    session,
+    tenant_id: str,
+    filters: InferenceLogFilter,
+    cursor: tuple[datetime, str] | None = None,
+    limit: int = 50,
+) -> list:
+    from app.models.inference_log import InferenceLog
+
+    query = filters.apply(select(InferenceLog).where(InferenceLog.tenant_id == tenant_id))
+    if cursor is not None:
+        query = query.where(after((InferenceLog.created_at, InferenceLog.id), cursor, descending=True))
+    query = query.order_by(InferenceLog.created_at.desc(), InferenceLog.id.desc()).limit(limit)
+    return list((await session.execute(query)).scalars())
+
+
+async def iter_rows(
+    tenant_id: str,
+    filters: InferenceLogFilter,
+    page_size: int = settings.inference_export_page_size,
+) -> AsyncIterator:
+    """Every matching row, one short read per page (no long-held transaction)."""
+    from app.read_replica import get_replica_router
+
+    cursor = None
+    while True:
+        async with get_replica_router().session(tenant_id) as session:
+            rows = await fetch_page(session, tenant_id, filters, cursor, page_size)
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        cursor = (rows[-1].created_at, rows[-1].id)
+
+
+async def export_ndjson(
+    tenant_id: str, filters: InferenceLogFilter, compress: bool = False
+) -> AsyncIterator[bytes]:
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    chunk = bytearray()
+    exported = 0
+    async for row in iter_rows(tenant_id, filters):
+        chunk += orjson.dumps(serialize(row))
+        chunk += b"\n"
+        exported += 1
+        if len(chunk) >= 64 * 1024:
+            yield gzip.compress(bytes(chunk)) if gzip else bytes(chunk)
+            chunk.clear()
+    if gzip:
+        yield gzip.compress(bytes(chunk)) + gzip.flush()
+    elif chunk:
+        yield bytes(chunk)
+    log.info("inference_logs.exported", tenant_id=tenant_id, rows=exported, compressed=compress)
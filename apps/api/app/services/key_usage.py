@@ -0,0 +1,76 @@
+"""
+NexusAI — API Key Usage
+Write-behind tracking of ``APIKey.last_used_at`` and ``request_count``.
+
+Uses are counted in memory and coalesced per key; each flush writes every
+key touched since the last one with a single ``UPDATE ... FROM (VALUES ...)``,
+so a key costs at most one row update per interval however busy it is.
+"""
+
+from datetime import UTC, datetime
+
+import structlog
+from sqlalchemy import DateTime, Integer, String, column, func, update, values
+
+from app.config import settings
+from app.services.flusher import BackgroundFlusher
+
+log = structlog.get_logger(__name__)
+
+
+class KeyUsageTracker(BackgroundFlusher):
+    name = "api_key_usage"
+
+    def __init__(self, interval_ms: int = settings.api_key_usage_flush_interval_ms):
+        super().__init__(interval_ms)
+        self._pending: dict[str, tuple[datetime, int]] = {}
+
+    def record(self, key_id: str) -> None:
+        _, count = self._pending.get(key_id, (None, 0))
+        self._pending[key_id] = (datetime.now(UTC), count + 1)
+        self.ensure_running()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await self._write(batch)
+        except Exception as exc:
+            for key_id, (used_at, count) in batch.items():
+                latest, pending = self._pending.get(key_id, (used_at, 0))
+                self._pending[key_id] = (max(latest, used_at), pending + count)
+            log.error("api_key_usage.flush.failed", error=str(exc), keys=len(batch))
+
+    async def _write(self, batch: dict[str, tuple[datetime, int]]) -> None:
+        from app.database import AsyncSessionLocal
+        from app.models.api_key import APIKey
+
+        usage = values(
+            column("id", String),
+            column("used_at", DateTime(timezone=True)),
+            column("uses", Integer),
+            name="usage",
+        ).data([(key_id, used_at, count) for key_id, (used_at, count) in batch.items()])
+        stmt = (
+            update(APIKey)
+            .where(APIKey.id == usage.c.id)
+            .values(
+                last_used_at=func.greatest(func.coalesce(APIKey.last_used_at, usage.c.used_at), usage.c.used_at),
+                request_count=APIKey.request_count + usage.c.uses,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with AsyncSessionLocal() as session, session.begin():
+            await session.execute(stmt)
+        log.debug("api_key_usage.flushed", keys=len(batch))
+
+
+_tracker: KeyUsageTracker | None = None
+
+
+def get_key_usage_tracker() -> KeyUsageTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = KeyUsageTracker()
+    return _tracker
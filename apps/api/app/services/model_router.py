@@ -105,15 +105,15 @@ class ModelRouter:
         if exclude_providers:
             candidates = [m for m in candidates if MODEL_REGISTRY.get(m, {}).get("provider") not in exclude_providers]
 
-        available = [m for m in candidates if self._is_available(m)]
+        available = [m for m in candidates if self.is_available(m)]
         if not available:
-            available = ["gpt-4o"] if self._is_available("gpt-4o") else list(MODEL_REGISTRY.keys())[:1]
+            available = ["gpt-4o"] if self.is_available("gpt-4o") else list(MODEL_REGISTRY.keys())[:1]
 
         selected = available[:max_models]
         log.info("router.selected", task=task.value, mode=mode.value, models=selected)
         return selected
 
-    def _is_available(self, model_id: str) -> bool:
+    def is_available(self, model_id: str) -> bool:
         provider = MODEL_REGISTRY.get(model_id, {}).get("provider", "")
         key_map = {
             "openai": settings.openai_api_key,
@@ -12,14 +12,15 @@ from dataclasses import dataclass, field
 from typing import AsyncGenerator
 
 import structlog
-from anthropic import AsyncAnthropic
-from openai import AsyncOpenAI
 
 from app.config import settings
 from app.services.audit_service import AuditService
+from app.services.budget_enforcer import Reservation, get_budget_enforcer
 from app.services.cost_tracker import CostTracker
-from app.services.model_router import ModelRouter, NexusMode
+from app.services.inference_log_writer import InferenceRecord, get_inference_log_writer
+from app.services.model_router import MODEL_REGISTRY, ModelRouter, NexusMode
 from app.services.pii_detection import PIIDetector
+from app.services.platform_stats import get_platform_stats
 
 log = structlog.get_logger(__name__)
 
@@ -36,6 +37,8 @@ class ModelResult:
     tokens_used: int
     cost_usd: float
     error: str | None = None
+    input_tokens: int = 0
+    output_tokens: int = 0
 
 
 @dataclass
@@ -74,14 +77,61 @@ def compute_cost(model: str, input_tokens: int, output_tokens: int) -> float:
     return (input_tokens * inp + output_tokens * out) / 1_000_000
 
 
+def estimate_tokens(chars: int) -> int:
+    return chars // 4 + 1  # ~4 chars per token
+
+
+def estimate_cost(models: list[str], prompt_chars: int, max_tokens: int) -> float:
+    """Worst-case cost used for budget reservations."""
+    input_tokens = estimate_tokens(prompt_chars)
+    return sum(compute_cost(m, input_tokens, max_tokens) for m in models)
+
+
+def prompt_length(prompt: str, messages: list[dict] | None, system_prompt: str | None) -> int:
+    return len(system_prompt or "") + (
+        sum(len(str(m.get("content", ""))) for m in messages) if messages else len(prompt)
+    )
+
+
 class NexusOrchestrator:
     def __init__(self):
         self.router = ModelRouter()
         self.pii_detector = PIIDetector()
         self.cost_tracker = CostTracker()
         self.audit = AuditService()
-        self._openai = AsyncOpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
-        self._anthropic = AsyncAnthropic(api_key=settings.anthropic_api_key) if settings.anthropic_api_key else None
+        self.budget = get_budget_enforcer()
+        self.stats = get_platform_stats()
+        self.inference_log = get_inference_log_writer()
+        self._openai_client = None
+        self._anthropic_client = None
+        self._audit_tasks: set[asyncio.Task] = set()
+
+    # Provider SDKs are imported on first use: together they are a third of
+    # app.main's import time, and a worker may never call one of them.
+    @property
+    def _openai(self):
+        if self._openai_client is None and settings.openai_api_key:
+            from openai import AsyncOpenAI
+
+            self._openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
+        return self._openai_client
+
+    @property
+    def _anthropic(self):
+        if self._anthropic_client is None and settings.anthropic_api_key:
+            from anthropic import AsyncAnthropic
+
+            self._anthropic_client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        return self._anthropic_client
+
+    def warm_providers(self) -> list[str]:
+        """Import the SDKs and build the clients of configured providers (blocking; run in a thread)."""
+        warmed = [name for name, client in (("openai", self._openai), ("anthropic", self._anthropic)) if client]
+        if settings.groq_api_key or settings.mistral_api_key:
+            import openai  # noqa: F401  (the OpenAI-compatible providers build a client per call)
+
+            warmed.append("openai_compatible")
+        return warmed
 
     async def orchestrate(
         self,
@@ -95,6 +145,7 @@ class NexusOrchestrator:
         system_prompt: str | None = None,
         temperature: float = 0.7,
         max_tokens: int = 2048,
+        daily_budget_usd: float | None = None,
     ) -> NexusResult:
         request_id = str(uuid.uuid4())
         start_time = time.monotonic()
@@ -102,6 +153,7 @@ class NexusOrchestrator:
 
         pii_result = await self.pii_detector.analyze(prompt)
         safe_prompt = pii_result.redacted_text
+        safety_passed = not pii_result.has_critical_pii
 
         selected_models = override_models or await self.router.select_models(
             safe_prompt,
@@ -109,6 +161,12 @@ class NexusOrchestrator:
             max_models=max_models or settings.nexus_max_models,
         )
 
+        reservation = None
+        if daily_budget_usd is not None:
+            reservation = await self.reserve_budget(
+                tenant_id, daily_budget_usd, selected_models, safe_prompt, messages, system_prompt, max_tokens
+            )
+
         tasks = [
             self._call_model(
                 model_id=m,
@@ -121,10 +179,39 @@ class NexusOrchestrator:
             for m in selected_models
         ]
 
-        results: list[ModelResult] = await asyncio.gather(*tasks, return_exceptions=False)
+        results: list[ModelResult] = []
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=False)
+        finally:
+            if reservation is not None:
+                self.budget.reconcile(reservation, sum(r.cost_usd for r in results))
         valid = [r for r in results if not r.error]
 
         if not valid:
+            self.stats.record_inference(
+                tenant_id=tenant_id,
+                user_id=user_id,
+                latency_ms=(time.monotonic() - start_time) * 1000,
+                tokens=0,
+                cost_usd=sum(r.cost_usd for r in results),
+                models=len(results),
+                safety_passed=safety_passed,
+                pii_entities=pii_result.entities,
+                error=True,
+            )
+            self._log_inference(
+                request_id,
+                tenant_id,
+                user_id,
+                mode,
+                results,
+                latency_ms=(time.monotonic() - start_time) * 1000,
+                pii_result=pii_result,
+                prompt=prompt,
+                safety_passed=safety_passed,
+                status_code=502,
+                error_message="All model calls failed",
+            )
             raise RuntimeError("All model calls failed — NEXUS circuit breaker triggered")
 
         consensus_score, synthesized, final_response = self._synthesize(valid, mode)
@@ -140,23 +227,50 @@ class NexusOrchestrator:
             total_latency_ms=total_latency,
             total_cost_usd=total_cost,
             synthesized=synthesized,
-            safety_passed=True,
+            safety_passed=safety_passed,
             pii_detected=pii_result.has_pii,
             pii_entities=pii_result.entities,
         )
 
-        asyncio.create_task(
-            self.cost_tracker.record(
-                tenant_id=tenant_id,
-                request_id=request_id,
-                model=selected_models[0] if selected_models else "unknown",
-                provider="nexus",
-                input_tokens=0,
-                output_tokens=0,
-                cost_usd=total_cost,
-            )
+        self.stats.record_inference(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            latency_ms=total_latency,
+            tokens=sum(r.tokens_used for r in valid),
+            cost_usd=total_cost,
+            models=len(valid),
+            synthesized=synthesized,
+            safety_passed=nexus_result.safety_passed,
+            pii_entities=pii_result.entities,
         )
-        asyncio.create_task(
+        self._log_inference(
+            request_id,
+            tenant_id,
+            user_id,
+            mode,
+            results,
+            latency_ms=total_latency,
+            pii_result=pii_result,
+            prompt=prompt,
+            safety_passed=safety_passed,
+            consensus_score=consensus_score,
+            synthesized=synthesized,
+        )
+        for r in results:
+            if r.error and not r.cost_usd:
+                continue
+            asyncio.create_task(
+                self.cost_tracker.record(
+                    tenant_id=tenant_id,
+                    request_id=request_id,
+                    model=r.model_id,
+                    provider=r.provider,
+                    input_tokens=r.input_tokens,
+                    output_tokens=r.output_tokens,
+                    cost_usd=r.cost_usd,
+                )
+            )
+        task = asyncio.create_task(
             self.audit.log_inference(
                 tenant_id=tenant_id,
                 user_id=user_id,
@@ -165,11 +279,13 @@ class NexusOrchestrator:
                 provider="nexusai",
                 latency_ms=total_latency,
                 cost_usd=total_cost,
-                safety_passed=True,
+                safety_passed=safety_passed,
                 pii_detected=pii_result.has_pii,
                 prompt_hash=hashlib.sha256(prompt.encode()).hexdigest(),
             )
         )
+        self._audit_tasks.add(task)
+        task.add_done_callback(lambda t: self._audit_done(t, request_id))
 
         log.info(
             "nexus.orchestrate.complete",
@@ -191,28 +307,185 @@ class NexusOrchestrator:
         system_prompt: str | None = None,
         temperature: float = 0.7,
         max_tokens: int = 2048,
+        reservation: Reservation | None = None,
     ) -> AsyncGenerator[str, None]:
         request_id = str(uuid.uuid4())
+        start_time = time.monotonic()
+        pii_result = None
+        primary_model = None
+        error: str | None = None
+        disconnected = False
+        output_chars = 0
 
-        pii_result = await self.pii_detector.analyze(prompt)
-        safe_prompt = pii_result.redacted_text
+        try:
+            pii_result = await self.pii_detector.analyze(prompt)
+            safe_prompt = pii_result.redacted_text
 
-        selected_models = await self.router.select_models(safe_prompt, mode, max_models=1)
-        primary_model = selected_models[0] if selected_models else "gpt-4o"
+            selected_models = await self.router.select_models(safe_prompt, mode, max_models=1)
+            primary_model = selected_models[0] if selected_models else "gpt-4o"
 
-        yield f"data: {{'type':'start','request_id':'{request_id}','model':'{primary_model}'}}\n\n"
+            yield f"data: {{'type':'start','request_id':'{request_id}','model':'{primary_model}'}}\n\n"
 
-        async for token in self._stream_model(
-            model_id=primary_model,
-            prompt=safe_prompt,
-            messages=messages,
-            system_prompt=system_prompt,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        ):
-            yield f"data: {{'type':'token','content':{repr(token)}}}\n\n"
+            async for token in self._stream_model(
+                model_id=primary_model,
+                prompt=safe_prompt,
+                messages=messages,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            ):
+                output_chars += len(token)
+                yield f"data: {{'type':'token','content':{repr(token)}}}\n\n"
+
+            yield f"data: {{'type':'done','request_id':'{request_id}'}}\n\n"
+        except (GeneratorExit, asyncio.CancelledError):
+            # The client went away mid-stream: what was generated is still billed, but it isn't a 200.
+            disconnected = True
+            raise
+        except Exception as exc:
+            error = str(exc)
+            raise
+        finally:
+            # Providers don't report usage mid-stream: charge an estimate from what was sent and emitted.
+            results = []
+            if primary_model is not None:
+                input_tokens = estimate_tokens(prompt_length(prompt, messages, system_prompt))
+                output_tokens = estimate_tokens(output_chars) if output_chars else 0
+                results.append(
+                    ModelResult(
+                        model_id=primary_model,
+                        provider=self.router.get_provider(primary_model),
+                        response="",
+                        confidence=1.0,
+                        latency_ms=(time.monotonic() - start_time) * 1000,
+                        tokens_used=input_tokens + output_tokens,
+                        cost_usd=compute_cost(primary_model, input_tokens, output_tokens),
+                        error=error,
+                        input_tokens=input_tokens,
+                        output_tokens=output_tokens,
+                    )
+                )
+            cost_usd = sum(r.cost_usd for r in results)
+            safety_passed = pii_result is None or not pii_result.has_critical_pii
+            self.stats.record_inference(
+                tenant_id=tenant_id,
+                user_id=user_id,
+                latency_ms=(time.monotonic() - start_time) * 1000,
+                tokens=sum(r.tokens_used for r in results),
+                cost_usd=cost_usd,
+                models=len(results),
+                safety_passed=safety_passed,
+                pii_entities=pii_result.entities if pii_result else None,
+                error=error is not None,
+            )
+            if reservation is not None:
+                self.budget.reconcile(reservation, cost_usd)
+            if tenant_id and cost_usd:
+                asyncio.create_task(
+                    self.cost_tracker.record(
+                        tenant_id=tenant_id,
+                        request_id=request_id,
+                        model=primary_model,
+                        provider=results[0].provider,
+                        input_tokens=results[0].input_tokens,
+                        output_tokens=results[0].output_tokens,
+                        cost_usd=cost_usd,
+                    )
+                )
+            if primary_model is not None:
+                self._log_inference(
+                    request_id,
+                    tenant_id,
+                    user_id,
+                    mode,
+                    results,
+                    latency_ms=(time.monotonic() - start_time) * 1000,
+                    pii_result=pii_result,
+                    prompt=prompt,
+                    model=primary_model,
+                    safety_passed=safety_passed,
+                    status_code=499 if disconnected else 500 if error else 200,
+                    error_message="client disconnected" if disconnected else error,
+                )
 
-        yield f"data: {{'type':'done','request_id':'{request_id}'}}\n\n"
+    def _audit_done(self, task: asyncio.Task, request_id: str) -> None:
+        """Surface audit entries the writer refused (backpressure or unencodable details)."""
+        self._audit_tasks.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            # The writer counts refusals in /metrics/audit; this ties the missing entry to its request.
+            log.error("nexus.audit.dropped", request_id=request_id, error=str(exc), error_type=type(exc).__name__)
+
+    async def reserve_budget(
+        self,
+        tenant_id: str,
+        daily_budget_usd: float,
+        models: list[str],
+        prompt: str,
+        messages: list[dict] | None = None,
+        system_prompt: str | None = None,
+        max_tokens: int = 2048,
+    ) -> Reservation:
+        prompt_chars = prompt_length(prompt, messages, system_prompt)
+        return await self.budget.reserve(tenant_id, daily_budget_usd, estimate_cost(models, prompt_chars, max_tokens))
+
+    def _log_inference(
+        self,
+        request_id: str,
+        tenant_id: str,
+        user_id: str,
+        mode: NexusMode,
+        results: list[ModelResult],
+        latency_ms: float,
+        pii_result,
+        prompt: str,
+        safety_passed: bool = True,
+        model: str | None = None,
+        consensus_score: float | None = None,
+        synthesized: bool = False,
+        status_code: int = 200,
+        error_message: str | None = None,
+    ) -> None:
+        if not tenant_id:
+            return
+        if model is None:
+            valid = [r for r in results if not r.error]
+            model = valid[0].model_id if len(valid) == 1 else "nexus-ultra"
+        self.inference_log.enqueue(
+            InferenceRecord(
+                request_id=request_id,
+                tenant_id=tenant_id,
+                user_id=user_id or None,
+                model=model,
+                provider=MODEL_REGISTRY.get(model, {}).get("provider", "nexusai"),
+                mode=mode.value,
+                latency_ms=latency_ms,
+                input_tokens=sum(r.input_tokens for r in results),
+                output_tokens=sum(r.output_tokens for r in results),
+                cost_usd=sum(r.cost_usd for r in results),
+                consensus_score=consensus_score,
+                synthesized=synthesized,
+                models_used=[
+                    {
+                        "model_id": r.model_id,
+                        "provider": r.provider,
+                        "latency_ms": r.latency_ms,
+                        "tokens": r.tokens_used,
+                        "cost_usd": r.cost_usd,
+                        "error": r.error,
+                    }
+                    for r in results
+                ],
+                safety_passed=safety_passed,
+                pii_detected=bool(pii_result and pii_result.has_pii),
+                pii_entities=pii_result.entities if pii_result else [],
+                prompt_hash=hashlib.sha256(prompt.encode()).hexdigest(),
+                status_code=status_code,
+                error_message=error_message,
+            )
+        )
 
     async def _call_model(
         self,
@@ -253,6 +526,8 @@ class NexusOrchestrator:
                 latency_ms=latency,
                 tokens_used=input_tokens + output_tokens,
                 cost_usd=cost,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
             )
 
         except Exception as exc:
@@ -341,6 +616,8 @@ class NexusOrchestrator:
             "groq": settings.groq_api_key,
             "mistral": settings.mistral_api_key,
         }
+        from openai import AsyncOpenAI
+
         client = AsyncOpenAI(api_key=api_keys.get(provider, ""), base_url=base_urls.get(provider, ""))
         full_msgs = []
         if system:
@@ -0,0 +1,84 @@
+"""
+NexusAI — Password Hashing
+bcrypt off the event loop.
+
+Hashes run on a small dedicated thread pool (bcrypt releases the GIL), so a
+login costs the event loop nothing while it waits. At most
+``password_hash_workers`` hashes run at once and at most
+``password_hash_max_pending`` wait behind them; beyond that callers get
+``PasswordHasherBusyError`` instead of queueing without bound.
+
+``verify_and_update`` also returns a replacement hash when the stored one
+uses an outdated scheme or cost, so raising ``bcrypt_rounds`` upgrades
+accounts transparently as users log in.
+"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from passlib.context import CryptContext
+
+from app.config import settings
+
+T = TypeVar("T")
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+
+class PasswordHasherBusyError(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        workers: int = settings.password_hash_workers,
+        max_pending: int = settings.password_hash_max_pending,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        # Only hand the pool work it can start now; waiters queue here, where
+        # a cancelled request (client gone) drops out without costing a hash.
+        self._slots = asyncio.Semaphore(workers)
+        self._pending = 0
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self._pending >= self.workers + self.max_pending:
+            raise PasswordHasherBusyError("Too many password operations in progress")
+        self._pending += 1
+        try:
+            async with self._slots:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str | None) -> tuple[bool, str | None]:
+        """``(valid, new_hash)``; ``new_hash`` is set when ``hashed`` should be replaced.
+
+        With no stored hash a dummy verification still runs, so unknown
+        accounts take as long to reject as wrong passwords.
+        """
+        if not hashed:
+            await self._run(pwd_context.dummy_verify)
+            return False, None
+        return await self._run(pwd_context.verify_and_update, password, hashed)
+
+
+_hasher: PasswordHasher | None = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher()
+    return _hasher
+
+
+async def hash_password(password: str) -> str:
+    return await get_password_hasher().hash(password)
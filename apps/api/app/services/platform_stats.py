@@ -0,0 +1,249 @@
+"""
+NexusAI — Platform Stats
+Streaming aggregation of live platform metrics: counters, HyperLogLog
+distinct tenants/users and a mergeable latency quantile sketch. Each worker
+accumulates locally and merges into Redis, so reads are a fixed handful of
+keys no matter how much traffic was recorded.
+
+Buffers are kept per day, so a request recorded after midnight never lands
+in yesterday's keys. A failed flush puts data back under its original day.
+"""
+
+import json
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+
+import structlog
+
+from app.config import settings
+from app.services.flusher import BackgroundFlusher
+
+log = structlog.get_logger(__name__)
+
+REDIS_KEY_COUNTERS = "nexus:stats:counters:{date}"
+REDIS_KEY_COUNTERS_MTD = "nexus:stats:counters:mtd:{year_month}"
+REDIS_KEY_LATENCY = "nexus:stats:latency:{date}"
+REDIS_KEY_TENANTS = "nexus:stats:tenants:{date}"
+REDIS_KEY_USERS = "nexus:stats:users:{date}"
+
+DAILY_TTL = 86400 * 2
+MTD_TTL = 86400 * 35
+
+MTD_COUNTERS = ("inferences", "tokens", "cost_usd")
+FLOAT_COUNTERS = ("cost_usd", "latency_ms_sum")
+
+
+class LatencySketch:
+    """Log-bucketed quantile sketch (DDSketch-style) with ~1% relative error.
+
+    Buckets are plain counters, so sketches from every worker merge by
+    addition — which is exactly what HINCRBY on a Redis hash gives us.
+    """
+
+    RELATIVE_ACCURACY = 0.01
+    GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    MIN_VALUE = 0.01
+
+    def __init__(self, buckets: dict[int, int] | None = None):
+        self.buckets: dict[int, int] = defaultdict(int, buckets or {})
+
+    @classmethod
+    def from_redis(cls, raw: dict) -> "LatencySketch":
+        return cls({int(k): int(v) for k, v in raw.items()})
+
+    @property
+    def count(self) -> int:
+        return sum(self.buckets.values())
+
+    def add(self, value: float) -> None:
+        self.buckets[math.ceil(math.log(max(value, self.MIN_VALUE), self.GAMMA))] += 1
+
+    def merge(self, other: "LatencySketch") -> None:
+        for idx, n in other.buckets.items():
+            self.buckets[idx] += n
+
+    def quantile(self, q: float) -> float:
+        total = self.count
+        if not total:
+            return 0.0
+        rank = q * (total - 1)
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen > rank:
+                return 2 * self.GAMMA**idx / (self.GAMMA + 1)
+        return 2 * self.GAMMA ** max(self.buckets) / (self.GAMMA + 1)
+
+
+@dataclass
+class _DayBuffer:
+    counters: defaultdict[str, float] = field(default_factory=lambda: defaultdict(float))
+    latency: LatencySketch = field(default_factory=LatencySketch)
+    tenants: set[str] = field(default_factory=set)
+    users: set[str] = field(default_factory=set)
+
+    def merge(self, other: "_DayBuffer") -> None:
+        for name, value in other.counters.items():
+            self.counters[name] += value
+        self.latency.merge(other.latency)
+        self.tenants |= other.tenants
+        self.users |= other.users
+
+
+class PlatformStats(BackgroundFlusher):
+    name = "platform_stats"
+
+    def __init__(self, interval_ms: int = settings.stats_flush_interval_ms):
+        super().__init__(interval_ms)
+        self._days: dict[date, _DayBuffer] = {}
+
+    def _buffer(self) -> _DayBuffer:
+        today = date.today()
+        buf = self._days.get(today)
+        if buf is None:
+            buf = self._days[today] = _DayBuffer()
+            if len(self._days) > 1:
+                self.wake()  # push the finished day out promptly
+        return buf
+
+    def record_inference(
+        self,
+        tenant_id: str,
+        user_id: str,
+        latency_ms: float,
+        tokens: int,
+        cost_usd: float,
+        models: int = 1,
+        synthesized: bool = False,
+        safety_passed: bool = True,
+        pii_entities: list[dict] | None = None,
+        error: bool = False,
+    ) -> None:
+        buf = self._buffer()
+        c = buf.counters
+        c["inferences"] += 1
+        c["tokens"] += tokens
+        c["cost_usd"] += cost_usd
+        c["latency_ms_sum"] += latency_ms
+        if models > 1:
+            c["multi_model"] += 1
+        if synthesized:
+            c["synthesized"] += 1
+        if not safety_passed:
+            c["safety_blocks"] += 1
+        if error:
+            c["errors"] += 1
+        if pii_entities:
+            c["pii_requests"] += 1
+            for entity in pii_entities:
+                c["pii_detections"] += 1
+                c[f"pii:{entity.get('type', 'unknown')}"] += 1
+        buf.latency.add(latency_ms)
+        if tenant_id:
+            buf.tenants.add(tenant_id)
+        if user_id:
+            buf.users.add(user_id)
+        self.ensure_running()
+
+    async def flush(self) -> None:
+        if not self._days:
+            return
+        days, self._days = self._days, {}
+
+        try:
+            from app.cache import get_redis
+
+            pipe = get_redis().pipeline()
+            for day, buf in days.items():
+                self._queue(pipe, day, buf)
+            await pipe.execute()
+        except Exception as exc:
+            # Stats are best-effort: merge back under each buffer's own day rather than drop them.
+            for day, buf in days.items():
+                self._days.setdefault(day, _DayBuffer()).merge(buf)
+            log.error("stats.flush.failed", error=str(exc), days=len(days))
+
+    @staticmethod
+    def _queue(pipe, day: date, buf: _DayBuffer) -> None:
+        d = day.isoformat()
+        counters_key = REDIS_KEY_COUNTERS.format(date=d)
+        mtd_key = REDIS_KEY_COUNTERS_MTD.format(year_month=day.strftime("%Y-%m"))
+        latency_key = REDIS_KEY_LATENCY.format(date=d)
+
+        for name, value in buf.counters.items():
+            keys = (counters_key, mtd_key) if name in MTD_COUNTERS else (counters_key,)
+            for key in keys:
+                if name in FLOAT_COUNTERS:
+                    pipe.hincrbyfloat(key, name, value)
+                else:
+                    pipe.hincrby(key, name, int(value))
+        for idx, n in buf.latency.buckets.items():
+            pipe.hincrby(latency_key, str(idx), n)
+        if buf.tenants:
+            pipe.pfadd(REDIS_KEY_TENANTS.format(date=d), *buf.tenants)
+        if buf.users:
+            pipe.pfadd(REDIS_KEY_USERS.format(date=d), *buf.users)
+        for key in (counters_key, latency_key, REDIS_KEY_TENANTS.format(date=d), REDIS_KEY_USERS.format(date=d)):
+            pipe.expire(key, DAILY_TTL)
+        pipe.expire(mtd_key, MTD_TTL)
+
+    async def cached_snapshot(self) -> dict:
+        """Today's snapshot through the near cache (``stats`` namespace) for polled dashboards."""
+        from app.near_cache import get_near_cache
+
+        async def load() -> tuple[dict, int]:
+            snap = await self.snapshot()
+            return snap, len(json.dumps(snap))
+
+        return await get_near_cache().get_or_load("stats", "platform", load)
+
+    async def snapshot(self, day: date | None = None) -> dict:
+        day = day or date.today()
+        d = day.isoformat()
+        try:
+            from app.cache import get_redis
+
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.hgetall(REDIS_KEY_COUNTERS.format(date=d))
+            pipe.hgetall(REDIS_KEY_COUNTERS_MTD.format(year_month=day.strftime("%Y-%m")))
+            pipe.hgetall(REDIS_KEY_LATENCY.format(date=d))
+            pipe.pfcount(REDIS_KEY_TENANTS.format(date=d))
+            pipe.pfcount(REDIS_KEY_USERS.format(date=d))
+            counters, mtd, latency, tenants, users = await pipe.execute()
+        except Exception as exc:
+            log.error("stats.snapshot.failed", error=str(exc))
+            counters, mtd, latency, tenants, users = {}, {}, {}, 0, 0
+
+        counters = {k: float(v) for k, v in counters.items()}
+        mtd = {k: float(v) for k, v in mtd.items()}
+        sketch = LatencySketch.from_redis(latency)
+        inferences = int(counters.get("inferences", 0))
+        return {
+            "day": d,
+            "counters": counters,
+            "mtd": mtd,
+            "inferences": inferences,
+            "active_tenants": int(tenants),
+            "active_users": int(users),
+            "avg_latency_ms": counters.get("latency_ms_sum", 0.0) / inferences if inferences else 0.0,
+            "latency_ms": {
+                "p50": sketch.quantile(0.50),
+                "p95": sketch.quantile(0.95),
+                "p99": sketch.quantile(0.99),
+            },
+            "pii_by_type": {
+                k.removeprefix("pii:"): int(v) for k, v in counters.items() if k.startswith("pii:")
+            },
+        }
+
+
+_stats: PlatformStats | None = None
+
+
+def get_platform_stats() -> PlatformStats:
+    global _stats
+    if _stats is None:
+        _stats = PlatformStats()
+    return _stats
@@ -0,0 +1,62 @@
+"""
+NexusAI — Token Verifier
+Verifies bearer JWTs once and remembers the claims until the token expires.
+
+The LRU is keyed by SHA-256 of the token, so raw tokens are never held in
+memory longer than the request. Only successfully verified tokens are
+cached; garbage tokens can't grow the cache.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+
+from jose import JWTError, jwt
+
+from app.config import settings
+
+# Claims of a token without ``exp`` are re-verified after this long.
+NO_EXPIRY_TTL = 300.0
+
+
+class TokenVerifier:
+    def __init__(self, max_entries: int = settings.jwt_claims_cache_size):
+        self.max_entries = max_entries
+        self._claims: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token: str) -> dict | None:
+        """Claims of a valid, unexpired token, or ``None``."""
+        key = hashlib.sha256(token.encode()).digest()
+        cached = self._claims.get(key)
+        now = time.time()
+        if cached is not None:
+            claims, expires_at = cached
+            if now < expires_at:
+                self._claims.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self._claims[key]
+        self.misses += 1
+        try:
+            claims = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        except JWTError:
+            return None
+        self._claims[key] = (claims, float(claims.get("exp") or now + NO_EXPIRY_TTL))
+        while len(self._claims) > self.max_entries:
+            self._claims.popitem(last=False)
+        return claims
+
+    def stats(self) -> dict:
+        return {"entries": len(self._claims), "hits": self.hits, "misses": self.misses}
+
+
+_token_verifier: TokenVerifier | None = None
+
+
+def get_token_verifier() -> TokenVerifier:
+    global _token_verifier
+    if _token_verifier is None:
+        _token_verifier = TokenVerifier()
+    return _token_verifier
@@ -0,0 +1,89 @@
+"""
+NexusAI — Startup
+What a worker does between import and serving its first request.
+
+Schema creation only runs outside production; there Alembic owns the schema
+(``alembic upgrade head`` in the image entrypoint). Then the DB pools, Redis
+clients and provider SDK clients are warmed concurrently, so the first
+requests on a fresh worker don't pay for connection set-up or SDK imports.
+Warm-up failures are logged, never fatal: the worker still starts and
+connects lazily.
+
+Every phase is timed into ``startup_report`` (logged as
+``nexusai.startup.ready``, served at ``/metrics/startup``). Per-module
+import times come from ``python -m benchmarks.bench_startup``.
+"""
+
+import asyncio
+import time
+
+import structlog
+
+from app.config import settings
+
+log = structlog.get_logger(__name__)
+
+startup_report: dict = {}
+
+
+async def _timed(name: str, coro, phases: dict):
+    start = time.perf_counter()
+    try:
+        return await coro
+    except Exception as exc:
+        log.warning("nexusai.warmup.failed", target=name, error=str(exc))
+        return None
+    finally:
+        phases[name] = round((time.perf_counter() - start) * 1000, 2)
+
+
+async def warm_engine(engine, connections: int) -> int:
+    """Open ``connections`` pooled connections at once; they stay idle in the pool."""
+    conns = [engine.connect() for _ in range(connections)]
+    results = await asyncio.gather(*(c.start() for c in conns), return_exceptions=True)
+    await asyncio.gather(*(c.close() for c, r in zip(conns, results) if not isinstance(r, BaseException)))
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if len(errors) == len(results):
+        raise errors[0]
+    return len(results) - len(errors)
+
+
+async def warm_redis() -> int:
+    from app.cache import get_redis, get_redis_bytes
+
+    await asyncio.gather(get_redis().ping(), get_redis_bytes().ping())
+    return 2
+
+
+async def warm_providers() -> list[str]:
+    from app.dependencies import get_nexus
+
+    # SDK imports are CPU-bound: keep them off the loop so they overlap the network warm-ups.
+    return await asyncio.to_thread(get_nexus().warm_providers)
+
+
+async def start(import_ms: float) -> dict:
+    from app.database import create_tables, engine, replica_engine
+
+    phases: dict[str, float] = {"import": round(import_ms, 2)}
+    if not settings.is_production:
+        await _timed("create_tables", create_tables(), phases)
+
+    targets = {
+        "db": warm_engine(engine, settings.db_pool_warm_connections),
+        "redis": warm_redis(),
+        "providers": warm_providers(),
+    }
+    if replica_engine is not None:
+        targets["db_replica"] = warm_engine(replica_engine, settings.db_pool_warm_connections)
+    started = time.perf_counter()
+    tasks = [asyncio.ensure_future(_timed(name, coro, phases)) for name, coro in targets.items()]
+    done, pending = await asyncio.wait(tasks, timeout=settings.startup_warmup_timeout_seconds)
+    for task in pending:
+        task.cancel()
+    warmed = {name: task.result() if task in done else None for name, task in zip(targets, tasks)}
+    phases["warmup"] = round((time.perf_counter() - started) * 1000, 2)
+
+    startup_report.update(phases_ms=phases, warmed=warmed, timed_out=[n for n, t in zip(targets, tasks) if t in pending])
+    log.info("nexusai.startup.ready", **startup_report)
+    return startup_report
@@ -0,0 +1,81 @@
+"""
+Benchmark: SQL statements per request spent resolving the tenant in
+``get_current_tenant``, before (direct queries) and after the auth-context cache.
+
+Needs the configured Postgres and Redis; seeds one tenant, user and API key.
+
+    cd apps/api && python -m benchmarks.bench_auth_queries [--requests 1000]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import event, select
+from starlette.requests import Request
+
+from app.database import AsyncSessionLocal, create_tables, engine
+from app.dependencies import get_current_tenant
+from app.models.api_key import APIKey
+from app.models.tenant import Tenant
+from app.models.user import User
+
+statements = 0
+
+
+def count(*_args) -> None:
+    global statements
+    statements += 1
+
+
+def request_with_key(raw_key: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"x-api-key", raw_key.encode())]})
+
+
+async def legacy_current_tenant(request: Request) -> dict:
+    """``get_current_tenant`` for an API-key request as it was: key by hash, then tenant by id."""
+    async with AsyncSessionLocal() as db:
+        key_hash = APIKey.hash(request.headers["X-API-Key"])
+        key = (await db.execute(select(APIKey).where(APIKey.key_hash == key_hash, APIKey.is_active.is_(True)))).scalar_one()
+        tenant = (await db.execute(select(Tenant).where(Tenant.id == key.tenant_id, Tenant.status == "active"))).scalar_one()
+        return {"id": tenant.id, "name": tenant.name, "plan": tenant.plan}
+
+
+async def seed() -> str:
+    raw_key, key_hash = APIKey.generate()
+    async with AsyncSessionLocal() as db:
+        tenant = Tenant(id=str(uuid.uuid4()), name="bench", slug=f"bench-{uuid.uuid4().hex[:8]}")
+        user = User(id=str(uuid.uuid4()), tenant_id=tenant.id, email=f"{uuid.uuid4().hex}@bench.local", full_name="bench")
+        db.add_all([tenant, user])
+        await db.flush()
+        db.add(APIKey(tenant_id=tenant.id, created_by=user.id, name="bench", key_hash=key_hash, key_prefix=raw_key[:20]))
+        await db.commit()
+    return raw_key
+
+
+async def bench(name: str, resolve, raw_key: str, n: int) -> None:
+    global statements
+    statements = 0
+    start = time.perf_counter()
+    for _ in range(n):
+        await resolve(request_with_key(raw_key))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<22} {statements / n:6.3f} queries/request  {elapsed * 1e6 / n:8.1f} us/request")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    await create_tables()
+    raw_key = await seed()
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    await bench("direct queries", legacy_current_tenant, raw_key, args.requests)
+    await bench("auth-context cache", get_current_tenant, raw_key, args.requests)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Microbenchmark: Redis cache value encodings, bytes stored and encode+decode cost.
+
+    cd apps/api && python -m benchmarks.bench_cache_codec [--rounds 2000]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import time
+import uuid
+
+from app.cache_codec import CacheCodec, msgpack, zstandard
+
+WORDS = (
+    "the model routes each request to the cheapest provider that meets the latency budget and "
+    "falls back on error while consensus scoring compares answers across providers before synthesis"
+).split()
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def nexus_result(rng: random.Random) -> dict:
+    """Shape of ``asdict(NexusResult)`` for a three-model consensus run."""
+    models = [
+        {
+            "model_id": model,
+            "provider": provider,
+            "response": text(rng, 350),
+            "confidence": rng.random(),
+            "latency_ms": rng.uniform(300, 3000),
+            "tokens_used": 900,
+            "cost_usd": rng.random() / 100,
+            "error": None,
+            "input_tokens": 400,
+            "output_tokens": 500,
+        }
+        for model, provider in (("gpt-4o", "openai"), ("claude-3-5-sonnet-20241022", "anthropic"), ("deepseek-chat", "deepseek"))
+    ]
+    return {
+        "request_id": str(uuid.uuid4()),
+        "final_response": text(rng, 400),
+        "mode": "consensus",
+        "models_used": models,
+        "consensus_score": 0.87,
+        "total_latency_ms": 3120.5,
+        "total_cost_usd": 0.0231,
+        "synthesized": True,
+        "safety_passed": True,
+        "pii_detected": False,
+        "pii_entities": [],
+        "metadata": {},
+    }
+
+
+def retrieval(rng: random.Random) -> dict:
+    return {
+        "query": text(rng, 12),
+        "results": [
+            {
+                "document_id": str(uuid.uuid4()),
+                "chunk_id": str(uuid.uuid4()),
+                "score": rng.random(),
+                "content": text(rng, 120),
+                "metadata": {"source": f"s3://kb/{hashlib.md5(str(i).encode()).hexdigest()}.pdf", "page": i},
+            }
+            for i in range(10)
+        ],
+    }
+
+
+def small(rng: random.Random) -> dict:
+    return {"tenant_id": str(uuid.uuid4()), "plan": "enterprise", "requests": rng.randint(0, 10_000), "active": True}
+
+
+class LegacyJSON:
+    """What cache_set/cache_get did before the codec: json.dumps text."""
+
+    def encode(self, value) -> bytes:
+        return json.dumps(value, default=str).encode()
+
+    def decode(self, raw: bytes):
+        return json.loads(raw)
+
+
+def bench(name: str, codec, values: list, rounds: int, baseline: float | None) -> float:
+    stored = sum(len(codec.encode(v)) for v in values) / len(values)
+    start = time.perf_counter()
+    for i in range(rounds):
+        codec.decode(codec.encode(values[i % len(values)]))
+    us = (time.perf_counter() - start) * 1e6 / rounds
+    ratio = f"  {baseline / stored:5.2f}x smaller" if baseline else ""
+    print(f"  {name:<22} {stored:>9,.0f} B  {us:8.1f} us/op{ratio}")
+    return stored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    codecs = [("legacy json", LegacyJSON()), ("orjson", CacheCodec("orjson", 0))]
+    if msgpack is not None:
+        codecs.append(("msgpack", CacheCodec("msgpack", 0)))
+    codecs.append(("orjson + compress", CacheCodec("orjson", 1024)))
+    if msgpack is not None:
+        codecs.append(("msgpack + compress", CacheCodec("msgpack", 1024)))
+    print(f"compression: {'zstd' if zstandard is not None else 'zlib'} level 3, threshold 1024 B")
+
+    for payload, make in (("nexus result", nexus_result), ("retrieval", retrieval), ("small", small)):
+        values = [make(rng) for _ in range(50)]
+        print(payload)
+        baseline = None
+        for name, codec in codecs:
+            stored = bench(name, codec, values, args.rounds, baseline)
+            baseline = baseline or stored
+
+
+if __name__ == "__main__":
+    main()
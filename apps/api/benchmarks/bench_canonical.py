@@ -0,0 +1,76 @@
+"""
+Microbenchmark: audit entry hashing, legacy json.dumps vs canonical JSON.
+
+    cd apps/api && python -m benchmarks.bench_canonical [--entries 50000]
+"""
+
+import argparse
+import hashlib
+import json
+import time
+import uuid
+from datetime import UTC, datetime
+
+from app.canonical import dumps, dumps_stdlib
+
+
+def make_entry(i: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "tenant_id": "7b0e6d1c-2f7a-4c55-9a51-0f3b8f1d9e21",
+        "seq": i,
+        "actor_id": str(uuid.uuid4()),
+        "event": "inference.completed",
+        "resource": "inference",
+        "resource_id": str(uuid.uuid4()),
+        "details": {
+            "model": "gpt-4o",
+            "provider": "openai",
+            "latency_ms": 812.4 + i % 97,
+            "cost_usd": 0.00421 * (i % 13 + 1),
+            "safety_passed": True,
+            "pii_detected": False,
+            "prompt_hash": hashlib.sha256(str(i).encode()).hexdigest(),
+            "input_tokens": 512,
+            "output_tokens": 384,
+            "status_code": 200,
+            "error_message": None,
+        },
+        "ip_address": "10.0.3.17",
+        "prev_hash": "0" * 64,
+        "created_at": datetime.now(UTC),
+        "hash_version": 2,
+    }
+
+
+def legacy(entry: dict) -> bytes:
+    data = {**entry, "created_at": entry["created_at"].isoformat()}
+    return json.dumps(data, sort_keys=True, default=str).encode()
+
+
+def bench(name: str, encode, entries: list[dict], baseline: float | None = None) -> float:
+    start = time.perf_counter()
+    for entry in entries:
+        hashlib.sha256(encode(entry)).hexdigest()
+    elapsed = time.perf_counter() - start
+    rate = len(entries) / elapsed
+    speedup = f"  {baseline / elapsed:5.2f}x" if baseline else ""
+    print(f"{name:<24} {rate:>12,.0f} entries/s  {elapsed * 1e6 / len(entries):7.2f} us/entry{speedup}")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=50_000)
+    args = parser.parse_args()
+
+    entries = [make_entry(i) for i in range(args.entries)]
+    assert all(dumps(e) == dumps_stdlib(e) for e in entries[:1000])
+
+    baseline = bench("legacy json.dumps", legacy, entries)
+    bench("canonical (stdlib)", dumps_stdlib, entries, baseline)
+    bench("canonical (orjson)", dumps, entries, baseline)
+
+
+if __name__ == "__main__":
+    main()
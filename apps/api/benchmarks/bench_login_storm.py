@@ -0,0 +1,75 @@
+"""
+Benchmark: event-loop lag during a login storm, bcrypt inline vs the
+password-hasher thread pool.
+
+A 1 ms ticker runs alongside ``--logins`` concurrent password checks; its
+overshoot is the latency every other request on the worker would see.
+
+    cd apps/api && python -m benchmarks.bench_login_storm [--logins 40] [--rounds 10]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from passlib.context import CryptContext
+
+from app.services.passwords import PasswordHasher, PasswordHasherBusyError
+
+
+async def ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+
+async def storm(name: str, verify, logins: int) -> None:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(verify() for _ in range(logins)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    busy = sum(isinstance(r, PasswordHasherBusyError) for r in results)
+    lags.sort()
+    print(
+        f"{name:<26} {elapsed:6.2f} s  loop lag p50 {statistics.median(lags):7.2f} ms"
+        f"  p99 {lags[int(len(lags) * 0.99) - 1]:8.2f} ms  max {lags[-1]:8.2f} ms"
+        f"  ticks {len(lags):5d}  rejected {busy}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=args.rounds)
+    hashed = context.hash("correct horse battery staple")
+
+    async def inline():
+        return context.verify("wrong password", hashed)
+
+    hasher = PasswordHasher(workers=2, max_pending=args.logins)
+
+    async def pooled():
+        return await hasher._run(context.verify, "wrong password", hashed)
+
+    capped = PasswordHasher(workers=2, max_pending=args.logins // 4)
+
+    async def pooled_capped():
+        return await capped._run(context.verify, "wrong password", hashed)
+
+    print(f"{args.logins} concurrent logins, bcrypt rounds={args.rounds}")
+    await storm("inline (before)", inline, args.logins)
+    await storm("thread pool, 2 workers", pooled, args.logins)
+    await storm(f"thread pool, {args.logins // 4} pending cap", pooled_capped, args.logins)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,204 @@
+"""
+Benchmark: middleware overhead, the BaseHTTPMiddleware stack vs the pure-ASGI
+pipeline, against the same routes with no middleware at all.
+
+Two routes: a trivial GET, and ``POST /api/v1/nexus/stream`` with a stub
+handler streaming ``--chunks`` SSE events (the real one needs providers).
+Requests are driven straight through the ASGI interface, ``--concurrency``
+at a time, so the numbers are framework plus middleware only. Rate limiting
+is off: it needs Redis and is the same pure-ASGI layer in both stacks.
+
+    cd apps/api && python -m benchmarks.bench_middleware [--requests 5000] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.config import settings
+from app.middleware.auth_middleware import AuthMiddleware
+from app.middleware.cost_circuit_breaker import INFERENCE_PATHS
+from app.middleware.pipeline import EXPOSE_HEADERS, middleware_pipeline
+from app.middleware.rate_limit_middleware import RateLimitMiddleware
+from app.routers.auth import create_access_token
+from app.services.budget_enforcer import get_budget_enforcer
+
+TOKEN = create_access_token("bench-user", "bench-tenant", "admin")
+HEADERS = [
+    (b"authorization", f"Bearer {TOKEN}".encode()),
+    (b"x-tenant-id", b"bench-tenant"),
+    (b"content-type", b"application/json"),
+]
+
+
+# The stack as it was before the pipeline: three BaseHTTPMiddleware layers.
+async def legacy_timing(request: Request, call_next):
+    start = time.monotonic()
+    response = await call_next(request)
+    response.headers["X-Latency-MS"] = f"{(time.monotonic() - start) * 1000:.2f}"
+    return response
+
+
+async def legacy_tenant(request: Request, call_next):
+    tenant_id = request.headers.get("X-Tenant-ID", "")
+    request.state.tenant_id = tenant_id
+    response = await call_next(request)
+    response.headers["X-Tenant-ID"] = tenant_id
+    return response
+
+
+async def legacy_cost_breaker(request: Request, call_next):
+    if request.url.path not in INFERENCE_PATHS:
+        return await call_next(request)
+    tenant_id = request.headers.get("X-Tenant-ID", "")
+    if tenant_id and get_budget_enforcer().is_over_budget(tenant_id):
+        return JSONResponse({"detail": "Daily budget exceeded"}, status_code=402)
+    return await call_next(request)
+
+
+def legacy_pipeline() -> list[Middleware]:
+    return [
+        Middleware(BaseHTTPMiddleware, dispatch=legacy_timing),
+        Middleware(AuthMiddleware),
+        Middleware(RateLimitMiddleware),
+        Middleware(BaseHTTPMiddleware, dispatch=legacy_tenant),
+        Middleware(BaseHTTPMiddleware, dispatch=legacy_cost_breaker),
+        Middleware(
+            CORSMiddleware,
+            allow_origins=settings.cors_origins,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+            expose_headers=EXPOSE_HEADERS,
+        ),
+        Middleware(GZipMiddleware, minimum_size=1000),
+    ]
+
+
+def build(middleware: list[Middleware], chunks: int) -> FastAPI:
+    app = FastAPI(middleware=middleware)
+
+    @app.get("/api/v1/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    @app.post("/api/v1/nexus/stream")
+    async def stream() -> StreamingResponse:
+        async def events():
+            for i in range(chunks):
+                yield f'data: {{"chunk": {i}, "text": "lorem ipsum dolor"}}\n\n'
+                await asyncio.sleep(0)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+async def call(app, method: str, path: str) -> tuple[float, float]:
+    """One request; returns (time to first body chunk, total) in ms."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": HEADERS,
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    sent = False
+    done = asyncio.Event()
+    first = None
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"{}", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal first
+        if message["type"] == "http.response.body":
+            if first is None:
+                first = time.perf_counter()
+            if not message.get("more_body", False):
+                done.set()
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    end = time.perf_counter()
+    return (first - start) * 1000, (end - start) * 1000
+
+
+async def load(app, method: str, path: str, requests: int, concurrency: int) -> tuple[float, list, list]:
+    remaining = requests
+    ttfb: list[float] = []
+    total: list[float] = []
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            first, whole = await call(app, method, path)
+            ttfb.append(first)
+            total.append(whole)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start), sorted(ttfb), sorted(total)
+
+
+def p99(values: list[float]) -> float:
+    return values[int(len(values) * 0.99) - 1]
+
+
+async def bench(route: str, method: str, path: str, apps: dict, args) -> None:
+    print(f"\n{route}")
+    base = None
+    for name, app in apps.items():
+        await load(app, method, path, min(args.requests, 500), args.concurrency)  # warm up
+        rps, ttfb, total = await load(app, method, path, args.requests, args.concurrency)
+        base = base or (rps, p99(total))
+        overhead = f"  p99 overhead {p99(total) - base[1]:+7.3f} ms" if app is not apps["no middleware"] else ""
+        print(
+            f"  {name:<22} {rps:>9,.0f} req/s  p50 {statistics.median(total):7.3f} ms"
+            f"  p99 {p99(total):7.3f} ms  ttfb p99 {p99(ttfb):7.3f} ms{overhead}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--chunks", type=int, default=50)
+    args = parser.parse_args()
+    settings.rate_limit_enabled = False
+
+    apps = {
+        "no middleware": build([], args.chunks),
+        "BaseHTTPMiddleware": build(legacy_pipeline(), args.chunks),
+        "pure ASGI pipeline": build(middleware_pipeline(), args.chunks),
+    }
+    await bench("GET /api/v1/ping", "GET", "/api/v1/ping", apps, args)
+    await bench(f"POST /api/v1/nexus/stream ({args.chunks} events)", "POST", "/api/v1/nexus/stream", apps, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
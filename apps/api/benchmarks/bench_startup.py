@@ -0,0 +1,106 @@
+"""
+Startup: import time of ``app.main`` per package and per module, from
+``python -X importtime`` in a fresh interpreter (best of ``--runs``).
+
+    cd apps/api && python -m benchmarks.bench_startup [--runs 5] [--top 20]
+    python -m benchmarks.bench_startup --save baseline.json
+    python -m benchmarks.bench_startup --baseline baseline.json --max-regression-pct 15
+
+With ``--baseline`` it exits non-zero when the total import time grows by more
+than ``--max-regression-pct``, and lists the modules that got slower.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+
+
+def import_times(module: str) -> dict[str, float]:
+    """Cumulative import time in ms for every module that ``module`` pulls in."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Indentation marks nesting; a module appears once, wherever it was first imported.
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def best_of(module: str, runs: int) -> dict[str, float]:
+    best: dict[str, float] = {}
+    for _ in range(runs):
+        for name, ms in import_times(module).items():
+            best[name] = min(ms, best.get(name, ms))
+    return best
+
+
+def by_package(times: dict[str, float]) -> dict[str, float]:
+    """Top-level package -> time of its slowest (outermost) module import."""
+    packages: dict[str, float] = defaultdict(float)
+    for name, ms in times.items():
+        root = name.split(".")[0]
+        packages[root] = max(packages[root], ms)
+    return packages
+
+
+def report(times: dict[str, float], module: str, top: int) -> None:
+    print(f"{module:<48} {times[module]:9.1f} ms total\n")
+    print("Packages (cumulative)")
+    for name, ms in sorted(by_package(times).items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {name:<46} {ms:9.1f} ms")
+    print("\nApp modules (cumulative)")
+    app_modules = {n: ms for n, ms in times.items() if n.startswith("app.") and n != module}
+    for name, ms in sorted(app_modules.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {name:<46} {ms:9.1f} ms")
+
+
+def compare(times: dict[str, float], baseline: dict[str, float], module: str, max_pct: float) -> bool:
+    total, before = times[module], baseline[module]
+    change = (total - before) / before * 100
+    print(f"\n{module}: {before:.1f} ms -> {total:.1f} ms ({change:+.1f}%, limit +{max_pct:.0f}%)")
+    slower = {
+        name: ms - baseline[name]
+        for name, ms in times.items()
+        if name != module and name in baseline and ms - baseline[name] > 5
+    }
+    for name, delta in sorted(slower.items(), key=lambda kv: -kv[1])[:10]:
+        print(f"  {name:<46} +{delta:8.1f} ms")
+    new = {name: ms for name, ms in times.items() if name not in baseline and ms > 5}
+    for name, ms in sorted(new.items(), key=lambda kv: -kv[1])[:10]:
+        print(f"  {name:<46} +{ms:8.1f} ms (new)")
+    return change <= max_pct
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--save", help="write per-module times as JSON")
+    parser.add_argument("--baseline", help="JSON from an earlier --save to compare against")
+    parser.add_argument("--max-regression-pct", type=float, default=15.0)
+    args = parser.parse_args()
+
+    times = best_of(args.module, args.runs)
+    report(times, args.module, args.top)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(times, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(times, baseline, args.module, args.max_regression_pct):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
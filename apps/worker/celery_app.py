@@ -8,7 +8,12 @@ app = Celery(
     "nexusai",
     broker=os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/1"),
     backend=os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/2"),
-    include=["worker.tasks.indexing", "worker.tasks.eval", "worker.tasks.cost_report"],
+    include=[
+        "worker.tasks.indexing",
+        "worker.tasks.eval",
+        "worker.tasks.cost_report",
+        "worker.tasks.partitions",
+    ],
 )
 
 app.conf.update(
@@ -29,5 +34,9 @@ app.conf.update(
             "task": "worker.tasks.cost_report.check_budget_alerts",
             "schedule": 300,
         },
+        "maintain-partitions": {
+            "task": "worker.tasks.partitions.maintain_partitions",
+            "schedule": 21600,
+        },
     },
 )
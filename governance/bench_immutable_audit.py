@@ -0,0 +1,78 @@
+"""
+Append throughput and resident memory of ImmutableAuditTrail backends.
+
+    python governance/bench_immutable_audit.py --backend file --entries 10000000
+    python governance/bench_immutable_audit.py --backend memory --entries 1000000
+
+Each run is a fresh process so peak RSS belongs to that backend alone.
+"""
+
+import argparse
+import importlib.util
+import resource
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+
+def load_trail_module():
+    spec = importlib.util.spec_from_file_location("immutable_audit", Path(__file__).with_name("immutable_audit.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def rss_mib() -> float:
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=("memory", "file"), default="file")
+    parser.add_argument("--entries", type=int, default=10_000_000)
+    parser.add_argument("--dir", default=None, help="segment directory (default: a temp dir, removed afterwards)")
+    parser.add_argument("--report-every", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    mod = load_trail_module()
+    directory = Path(args.dir or tempfile.mkdtemp(prefix="audit-bench-"))
+    trail = mod.ImmutableAuditTrail(path=directory if args.backend == "file" else None)
+    payload = {"tenant": "t-0042", "model": "gpt-4o", "tokens": 896, "cost_usd": 0.0125, "allowed": True}
+
+    base = rss_mib()
+    start = window = time.perf_counter()
+    for i in range(1, args.entries + 1):
+        trail.append("inference", {**payload, "n": i})
+        if i % args.report_every == 0:
+            now = time.perf_counter()
+            print(
+                f"{i:>12,} entries  {args.report_every / (now - window):>10,.0f} appends/s  "
+                f"rss {rss_mib():8.1f} MiB (+{rss_mib() - base:.1f})",
+                flush=True,
+            )
+            window = now
+    elapsed = time.perf_counter() - start
+    trail.close()
+
+    print(f"\n{args.backend}: {args.entries:,} appends in {elapsed:.1f}s = {args.entries / elapsed:,.0f}/s")
+    print(f"peak rss {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+    if args.backend == "file":
+        size = sum(p.stat().st_size for p in directory.iterdir())
+        print(f"on disk {size / 2**20:.1f} MiB ({size / args.entries:.1f} B/entry)")
+
+        reopen = time.perf_counter()
+        trail = mod.ImmutableAuditTrail(path=directory)
+        probe = [trail._entries[i].hash for i in range(0, args.entries, max(1, args.entries // 1000))]
+        print(f"reopen + {len(probe)} random reads: {time.perf_counter() - reopen:.2f}s")
+        trail.close()
+    if args.dir is None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
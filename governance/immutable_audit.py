@@ -1,7 +1,96 @@
 import hashlib
+import importlib.util
 import json
-from dataclasses import dataclass
+import mmap
+import os
+import struct
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HASH_VERSION = 2
+
+FRAME_HEADER = struct.Struct("<II")  # record length, crc32(record)
+SEALED_FOOTER = struct.Struct("<8sQIIQ")  # magic, entries, block_entries, blocks, offsets position
+SEALED_MAGIC = b"NXAUDSG1"
+
+
+def _load_canonical():
+    """apps/api/app/canonical.py by path, for callers without apps/api on sys.path."""
+    path = Path(__file__).resolve().parents[1] / "apps" / "api" / "app" / "canonical.py"
+    spec = importlib.util.spec_from_file_location("nexus_canonical", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+# One encoder for every audit hash (docs/audit-canonical-json.md), so trail
+# hashes don't depend on whether orjson is installed.
+try:
+    from app.canonical import dumps as canonical_json
+except ImportError:
+    canonical_json = _load_canonical().dumps
+
+
+def _loads(raw: bytes) -> dict:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _leaf(digest: str) -> bytes:
+    return hashlib.sha256(b"\x00" + bytes.fromhex(digest)).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def merkle_levels(digests: list[str]) -> list[list[bytes]]:
+    level = [_leaf(d) for d in digests]
+    levels = [level]
+    while len(level) > 1:
+        level = [_node(level[i], level[i + 1]) if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)]
+        levels.append(level)
+    return levels
+
+
+def merkle_proof(levels: list[list[bytes]], index: int) -> list[tuple[bool, bytes]]:
+    """Sibling path for leaf ``index``; each step is (sibling_is_left, sibling)."""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append((sibling < index, level[sibling]))
+        index //= 2
+    return proof
+
+
+def verify_proof(digest: str, proof: list[tuple[bool, bytes]], root: str) -> bool:
+    node = _leaf(digest)
+    for sibling_is_left, sibling in proof:
+        node = _node(sibling, node) if sibling_is_left else _node(node, sibling)
+    return node.hex() == root
+
+
+@dataclass
+class Checkpoint:
+    segment: int
+    first_index: int
+    last_index: int
+    prev_hash: str
+    last_hash: str
+    root: str
 
 
 @dataclass
@@ -11,28 +100,444 @@ class AuditEntry:
     timestamp: str
     prev_hash: str
     hash: str
+    version: int = HASH_VERSION
+
+
+def _frame(entry: AuditEntry) -> bytes:
+    record = canonical_json(
+        {
+            "event": entry.event,
+            "payload": entry.payload,
+            "timestamp": entry.timestamp,
+            "prev_hash": entry.prev_hash,
+            "hash": entry.hash,
+            "version": entry.version,
+        }
+    )
+    return FRAME_HEADER.pack(len(record), zlib.crc32(record)) + record
+
+
+def _iter_frames(buf) -> Iterator[tuple[int, bytes]]:
+    """Yield ``(offset, record)`` for each intact frame; stops at the first torn one."""
+    end, pos = len(buf), 0
+    while pos + FRAME_HEADER.size <= end:
+        length, crc = FRAME_HEADER.unpack_from(buf, pos)
+        body = pos + FRAME_HEADER.size
+        if body + length > end:
+            return
+        record = bytes(buf[body : body + length])
+        if zlib.crc32(record) != crc:
+            return
+        yield pos, record
+        pos = body + length
+
+
+def seal_segment(log_path: Path, seg_path: Path, block_entries: int, level: int) -> int:
+    """Compress a closed ``.log`` segment into ``.seg``: zlib blocks + u64 offset table + footer."""
+    data = log_path.read_bytes()
+    frames = [FRAME_HEADER.pack(len(r), zlib.crc32(r)) + r for _, r in _iter_frames(data)]
+    offsets = array("Q")
+    tmp = seg_path.with_suffix(".seg.tmp")
+    with open(tmp, "wb") as fh:
+        for i in range(0, len(frames), block_entries):
+            offsets.append(fh.tell())
+            fh.write(zlib.compress(b"".join(frames[i : i + block_entries]), level))
+        offsets.append(fh.tell())
+        table = fh.tell()
+        fh.write(offsets.tobytes())
+        fh.write(SEALED_FOOTER.pack(SEALED_MAGIC, len(frames), block_entries, len(offsets) - 1, table))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, seg_path)
+    return len(frames)
+
+
+class _Segment:
+    __slots__ = ("number", "start", "count", "offsets", "sealing")
+
+    def __init__(self, number: int, start: int, count: int = 0, offsets: array | None = None):
+        self.number = number
+        self.start = start
+        self.count = count
+        self.offsets = offsets  # frame offsets while the segment is still a raw .log
+        self.sealing: Future | None = None
+
+
+class SegmentFileStore:
+    """Append-only, crash-safe ``AuditEntry`` storage on disk.
+
+    Entries go to the active ``<n>.log`` segment as ``[u32 len][u32 crc32][json]``
+    frames through a buffered writer; ``fsync`` is batched every ``fsync_every``
+    appends or ``fsync_interval`` seconds (checked on append) and on ``sync()``.
+    After ``segment_entries`` appends the segment is rotated and sealed by a
+    background thread into ``<n>.seg``: zlib blocks of ``block_entries`` frames
+    read back through ``mmap``. Resident state is one ``array`` of segment start
+    indices plus the frame offsets of unsealed segments. A torn tail left by a
+    crash is truncated on open.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        segment_entries: int = 65_536,
+        block_entries: int = 256,
+        fsync_every: int = 1024,
+        fsync_interval: float = 0.05,
+        compress_level: int = 6,
+        open_segments: int = 16,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_entries = segment_entries
+        self.block_entries = block_entries
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compress_level = compress_level
+        self.open_segments = open_segments
+
+        self._segments: list[_Segment] = []
+        self._starts = array("Q")
+        self._count = 0
+        self._maps: OrderedDict[int, tuple[mmap.mmap, array, int]] = OrderedDict()
+        self._block: tuple[int, int, list[bytes]] | None = None
+        self._sealer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-seal")
+        self._pending: list[_Segment] = []
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._dirty = False
+        self._recover()
+
+    # ── paths / recovery ─────────────────────────────────────────────────────
+
+    def _log(self, number: int) -> Path:
+        return self.directory / f"{number:08d}.log"
+
+    def _seg(self, number: int) -> Path:
+        return self.directory / f"{number:08d}.seg"
+
+    def _recover(self) -> None:
+        for tmp in self.directory.glob("*.seg.tmp"):
+            tmp.unlink()
+        numbers = sorted({int(p.stem) for p in self.directory.iterdir() if p.suffix in (".log", ".seg")})
+        active = None
+        for number in numbers:
+            log_path, seg_path = self._log(number), self._seg(number)
+            if not seg_path.exists() and number != numbers[-1]:
+                # Crashed mid-rotation: finish sealing before serving reads.
+                seal_segment(log_path, seg_path, self.block_entries, self.compress_level)
+            if seg_path.exists():
+                log_path.unlink(missing_ok=True)
+                with open(seg_path, "rb") as fh:
+                    fh.seek(-SEALED_FOOTER.size, os.SEEK_END)
+                    count = SEALED_FOOTER.unpack(fh.read())[1]
+                self._add_segment(_Segment(number, self._count, count))
+            else:
+                data = log_path.read_bytes()
+                offsets, end = array("Q"), 0
+                for pos, record in _iter_frames(data):
+                    offsets.append(pos)
+                    end = pos + FRAME_HEADER.size + len(record)
+                if end < len(data):
+                    os.truncate(log_path, end)
+                active = _Segment(number, self._count, len(offsets), offsets)
+                self._add_segment(active)
+        self._open_active(active or _Segment(numbers[-1] + 1 if numbers else 0, self._count, 0, array("Q")))
+
+    def _add_segment(self, segment: _Segment) -> None:
+        self._segments.append(segment)
+        self._starts.append(segment.start)
+        self._count += segment.count
+
+    def _open_active(self, segment: _Segment) -> None:
+        if not self._segments or self._segments[-1] is not segment:
+            self._add_segment(segment)
+        self._active = segment
+        self._fh = open(self._log(segment.number), "ab", buffering=1 << 20)
+        self._pos = self._fh.tell()
+        self._read_fd = os.open(self._log(segment.number), os.O_RDONLY)
+
+    # ── writes ───────────────────────────────────────────────────────────────
+
+    def append(self, entry: AuditEntry) -> None:
+        frame = _frame(entry)
+        self._fh.write(frame)
+        self._active.offsets.append(self._pos)
+        self._pos += len(frame)
+        self._active.count += 1
+        self._count += 1
+        self._dirty = True
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+        if self._active.count >= self.segment_entries:
+            self._rotate()
+
+    def sync(self) -> None:
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._dirty = False
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _rotate(self) -> None:
+        self.sync()
+        self._fh.close()
+        os.close(self._read_fd)
+        done = self._active
+        done.sealing = self._sealer.submit(
+            seal_segment, self._log(done.number), self._seg(done.number), self.block_entries, self.compress_level
+        )
+        # Drop frame offsets of segments sealed since the last rotation.
+        self._pending = [seg for seg in self._pending if self._settle(seg)] + [done]
+        self._open_active(_Segment(done.number + 1, self._count, 0, array("Q")))
+
+    def close(self) -> None:
+        self.sync()
+        self._fh.close()
+        os.close(self._read_fd)
+        self._sealer.shutdown(wait=True)
+        for segment in self._segments:
+            self._settle(segment)
+        for mm, _, _ in self._maps.values():
+            mm.close()
+        self._maps.clear()
+
+    def __enter__(self) -> "SegmentFileStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── reads ────────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _settle(self, segment: _Segment) -> bool:
+        """Switch ``segment`` to its sealed file once sealing finished; True while still pending."""
+        if segment.sealing is None:
+            return False
+        if not segment.sealing.done():
+            return True
+        segment.sealing.result()
+        segment.sealing = None
+        segment.offsets = None
+        self._log(segment.number).unlink(missing_ok=True)
+        return False
+
+    def _map(self, segment: _Segment) -> tuple[mmap.mmap, array, int]:
+        """``(mmap, block offsets, entries per block)`` for a sealed segment."""
+        cached = self._maps.get(segment.number)
+        if cached is not None:
+            self._maps.move_to_end(segment.number)
+            return cached
+        with open(self._seg(segment.number), "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, block_entries, blocks, table = SEALED_FOOTER.unpack_from(mm, len(mm) - SEALED_FOOTER.size)
+        offsets = array("Q")
+        offsets.frombytes(mm[table : table + (blocks + 1) * 8])
+        self._maps[segment.number] = (mm, offsets, block_entries)
+        if len(self._maps) > self.open_segments:
+            _, (old, _, _) = self._maps.popitem(last=False)
+            old.close()
+        return mm, offsets, block_entries
+
+    def _records(self, segment: _Segment, block: int) -> list[bytes]:
+        if self._block is not None and self._block[:2] == (segment.number, block):
+            return self._block[2]
+        mm, offsets, _ = self._map(segment)
+        raw = zlib.decompress(mm[offsets[block] : offsets[block + 1]])
+        records = [r for _, r in _iter_frames(raw)]
+        self._block = (segment.number, block, records)
+        return records
+
+    def _read_raw(self, segment: _Segment, local: int) -> bytes:
+        if segment is self._active:
+            if self._dirty:
+                self._fh.flush()
+                self._dirty = False
+            fd, close = self._read_fd, False
+        else:
+            fd, close = os.open(self._log(segment.number), os.O_RDONLY), True
+        try:
+            pos = segment.offsets[local]
+            length, _ = FRAME_HEADER.unpack(os.pread(fd, FRAME_HEADER.size, pos))
+            return os.pread(fd, length, pos + FRAME_HEADER.size)
+        finally:
+            if close:
+                os.close(fd)
+
+    def _get(self, index: int) -> AuditEntry:
+        segment = self._segments[bisect_right(self._starts, index) - 1]
+        self._settle(segment)
+        local = index - segment.start
+        if segment.offsets is not None:
+            raw = self._read_raw(segment, local)
+        else:
+            block_entries = self._map(segment)[2]
+            raw = self._records(segment, local // block_entries)[local % block_entries]
+        return AuditEntry(**_loads(raw))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("audit entry index out of range")
+        return self._get(index)
+
+    def __iter__(self) -> Iterator[AuditEntry]:
+        for segment in list(self._segments):
+            self._settle(segment)
+            if segment.offsets is None:
+                offsets = self._map(segment)[1]
+                for block in range(len(offsets) - 1):
+                    for raw in self._records(segment, block):
+                        yield AuditEntry(**_loads(raw))
+            else:
+                if segment is self._active and self._dirty:
+                    self._fh.flush()
+                    self._dirty = False
+                with open(self._log(segment.number), "rb") as fh:
+                    data = fh.read()
+                for _, raw in _iter_frames(data):
+                    yield AuditEntry(**_loads(raw))
 
 
 class ImmutableAuditTrail:
-    def __init__(self):
-        self._entries: list[AuditEntry] = []
+    """Hash-chained audit trail with a Merkle checkpoint every ``segment_size`` entries.
+
+    Entries live in memory by default; pass ``path`` to persist them in a
+    ``SegmentFileStore`` (extra keyword arguments configure the store).
+    Checkpoints are derived data: they are journaled next to the segments and
+    rebuilt from the entries for anything the journal is missing.
+    """
+
+    def __init__(self, segment_size: int = 1024, path: str | Path | None = None, **store_options):
+        self.segment_size = segment_size
+        self._entries: list[AuditEntry] | SegmentFileStore = (
+            SegmentFileStore(path, **store_options) if path is not None else []
+        )
         self._last_hash = "genesis"
+        self._checkpoints: list[Checkpoint] = []
+        self._trees: OrderedDict[int, list[list[bytes]]] = OrderedDict()
+        self._open_hashes: list[str] = []  # hashes of the segment being filled
+        self._journal = None
+        if path is not None:
+            self._load_checkpoints(Path(path) / "checkpoints.jsonl")
+
+    def _load_checkpoints(self, journal: Path) -> None:
+        count = len(self._entries)
+        if journal.exists():
+            for line in journal.read_bytes().splitlines():
+                try:
+                    checkpoint = Checkpoint(**_loads(line))
+                except (ValueError, TypeError):
+                    break
+                if checkpoint.segment != len(self._checkpoints) or checkpoint.last_index >= count:
+                    break
+                self._checkpoints.append(checkpoint)
+        with open(journal, "wb") as fh:
+            fh.writelines(canonical_json(asdict(c)) + b"\n" for c in self._checkpoints)
+        self._journal = open(journal, "ab")
+        for segment in range(len(self._checkpoints), count // self.segment_size):
+            start = segment * self.segment_size
+            self._seal(segment, [e.hash for e in self._entries[start : start + self.segment_size]])
+        tail = count - count % self.segment_size
+        self._open_hashes = [e.hash for e in self._entries[tail:count]]
+        if count:
+            self._last_hash = self._entries[-1].hash
+
+    def close(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._entries.close()
 
     def append(self, event: str, payload: dict) -> AuditEntry:
-        timestamp = datetime.now(timezone.utc).isoformat()
-        data = {"event": event, "payload": payload, "timestamp": timestamp, "prev_hash": self._last_hash}
-        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
-        entry = AuditEntry(event=event, payload=payload, timestamp=timestamp, prev_hash=self._last_hash, hash=digest)
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        entry = AuditEntry(event=event, payload=payload, timestamp=timestamp, prev_hash=self._last_hash, hash="")
+        entry.hash = digest = self._digest(entry)
         self._entries.append(entry)
         self._last_hash = digest
+        self._open_hashes.append(digest)
+        if len(self._open_hashes) == self.segment_size:
+            self._seal(len(self._entries) // self.segment_size - 1, self._open_hashes)
+            self._open_hashes = []
         return entry
 
+    def _tree(self, segment: int, hashes: list[str] | None = None) -> list[list[bytes]]:
+        levels = self._trees.get(segment)
+        if levels is None:
+            if hashes is None:
+                start = segment * self.segment_size
+                hashes = [e.hash for e in self._entries[start : start + self.segment_size]]
+            levels = self._trees[segment] = merkle_levels(hashes)
+            if len(self._trees) > 8:
+                self._trees.popitem(last=False)
+        return levels
+
+    def _seal(self, segment: int, hashes: list[str]) -> None:
+        start = segment * self.segment_size
+        checkpoint = Checkpoint(
+            segment=segment,
+            first_index=start,
+            last_index=start + len(hashes) - 1,
+            prev_hash=self._checkpoints[-1].last_hash if self._checkpoints else "genesis",
+            last_hash=hashes[-1],
+            root=self._tree(segment, hashes)[-1][0].hex(),
+        )
+        self._checkpoints.append(checkpoint)
+        if self._journal is not None:
+            self._journal.write(canonical_json(asdict(checkpoint)) + b"\n")
+            self._journal.flush()
+
+    @property
+    def checkpoints(self) -> list[Checkpoint]:
+        return list(self._checkpoints)
+
+    def proof(self, index: int) -> tuple[Checkpoint, list[tuple[bool, bytes]]] | None:
+        segment = index // self.segment_size
+        if segment >= len(self._checkpoints):
+            return None
+        return self._checkpoints[segment], merkle_proof(self._tree(segment), index % self.segment_size)
+
+    def verify_entry(self, index: int) -> bool:
+        """O(log n) check against the sealed checkpoint; falls back to a bounded tail walk."""
+        e = self._entries[index]
+        if e.hash != self._digest(e):
+            return False
+        sealed = self.proof(index)
+        if sealed is not None:
+            checkpoint, path = sealed
+            return verify_proof(e.hash, path, checkpoint.root)
+        start = len(self._checkpoints) * self.segment_size
+        prev = self._checkpoints[-1].last_hash if self._checkpoints else "genesis"
+        for tail in self._entries[start : index + 1]:
+            if tail.prev_hash != prev or tail.hash != self._digest(tail):
+                return False
+            prev = tail.hash
+        return True
+
+    @staticmethod
+    def _digest(e: AuditEntry) -> str:
+        data = {"event": e.event, "payload": e.payload, "timestamp": e.timestamp, "prev_hash": e.prev_hash}
+        if e.version == 1:
+            return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        return hashlib.sha256(canonical_json({**data, "version": e.version})).hexdigest()
+
     def verify_chain(self) -> bool:
         prev = "genesis"
-        for e in self._entries:
-            data = {"event": e.event, "payload": e.payload, "timestamp": e.timestamp, "prev_hash": e.prev_hash}
-            expected = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
-            if e.prev_hash != prev or e.hash != expected:
+        hashes: list[str] = []
+        for i, e in enumerate(self._entries):
+            if e.prev_hash != prev or e.hash != self._digest(e):
                 return False
             prev = e.hash
+            hashes.append(e.hash)
+            if len(hashes) == self.segment_size:
+                segment = i // self.segment_size
+                root = merkle_levels(hashes)[-1][0].hex()
+                if segment < len(self._checkpoints) and root != self._checkpoints[segment].root:
+                    return False
+                hashes = []
         return True
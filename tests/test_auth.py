@@ -0,0 +1,230 @@
+import importlib.util
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, "apps/api")
+
+
+def load_module(path: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, Path(path))
+    mod = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class KeyHashSession:
+    """``AsyncSessionLocal`` over a list of active key hashes, streamed in partitions."""
+
+    def __init__(self, hashes: list[str], during_stream=None):
+        self.hashes = hashes
+        self.during_stream = during_stream
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query):
+        from unittest.mock import Mock
+
+        return Mock(scalar_one=Mock(return_value=len(self.hashes)))
+
+    async def stream_scalars(self, query):
+        return self
+
+    async def partitions(self, size: int):
+        for i in range(0, len(self.hashes), size):
+            if self.during_stream is not None:
+                self.during_stream()
+            yield self.hashes[i : i + size]
+
+
+async def test_api_key_filter_fails_open_until_built_and_keeps_keys_added_mid_build(monkeypatch):
+    import app.database
+
+    mod = load_module("apps/api/app/services/api_key_filter.py", "api_key_filter")
+    keys = mod.APIKeyFilter(capacity=100, error_rate=0.001)
+    assert keys.might_exist("unknown") and not keys.ready
+
+    hashes = [f"hash-{i}" for i in range(500)]
+    monkeypatch.setattr(app.database, "AsyncSessionLocal", KeyHashSession(hashes, lambda: keys._add_local("created")))
+    await keys.rebuild()
+
+    assert keys.ready and keys.capacity == 1000  # resized to twice the active keys
+    assert all(keys.might_exist(h) for h in hashes) and keys.might_exist("created")
+    assert sum(not keys.might_exist(f"guess-{i}") for i in range(1000)) > 990
+    assert keys.stats()["rejected"] == keys.rejected > 990
+
+
+def make_token(claims: dict) -> str:
+    from jose import jwt
+
+    from app.config import settings
+
+    return jwt.encode(claims, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+
+
+def test_token_verifier_caches_valid_claims_until_expiry(monkeypatch):
+    import time
+
+    mod = load_module("apps/api/app/services/token_verifier.py", "token_verifier")
+    verifier = mod.TokenVerifier(max_entries=2)
+    now = time.time()
+    token = make_token({"sub": "u1", "exp": int(now) + 60})
+
+    assert verifier.verify(token)["sub"] == "u1"
+    assert verifier.verify(token)["sub"] == "u1"
+    assert (verifier.hits, verifier.misses) == (1, 1)
+    assert verifier.verify("not.a.jwt") is None
+    assert verifier.stats()["entries"] == 1  # failures aren't cached
+
+    others = [make_token({"sub": f"u{i}", "exp": int(now) + 60}) for i in range(3)]
+    for other in others:
+        verifier.verify(other)
+    assert verifier.stats()["entries"] == 2
+
+    misses = verifier.misses
+    monkeypatch.setattr(mod.time, "time", lambda: now + 120)
+    verifier.verify(others[-1])  # past its cached expiry: verified again
+    assert verifier.misses == misses + 1
+
+
+async def test_auth_middleware_verifies_once_and_tenant_comes_from_credentials(monkeypatch):
+    from starlette.requests import Request
+
+    from app.middleware import auth_middleware as mod
+
+    calls: list = []
+
+    class CountingVerifier:
+        def verify(self, token):
+            calls.append(token)
+            return {"sub": "u1", "tenant_id": "t-real"}
+
+    monkeypatch.setattr(mod, "get_token_verifier", CountingVerifier)
+    seen: dict = {}
+
+    async def inner(scope, receive, send):
+        request = Request(scope)
+        seen["claims"] = [mod.request_claims(request), mod.request_claims(request)]
+        seen["tenant"] = await mod.authenticated_tenant_id(scope)
+
+    headers = [(b"authorization", b"Bearer abc"), (b"x-tenant-id", b"t-spoofed")]
+    await mod.AuthMiddleware(inner)({"type": "http", "path": "/api/v1/nexus/chat", "headers": headers}, None, None)
+    assert calls == ["abc"]
+    assert seen == {"claims": [{"sub": "u1", "tenant_id": "t-real"}] * 2, "tenant": "t-real"}
+
+    sent: list = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": "/api/v1/nexus/chat", "headers": [(b"x-tenant-id", b"t1")]}
+    await mod.AuthMiddleware(inner)(scope, None, send)
+    assert sent[0]["status"] == 401
+
+
+async def test_key_usage_coalesces_per_key_and_merges_back_failed_flushes():
+    mod = load_module("apps/api/app/services/key_usage.py", "key_usage")
+    tracker = mod.KeyUsageTracker(interval_ms=60_000)
+    writes: list = []
+    state = {"down": True}
+
+    async def write(batch):
+        if state["down"]:
+            raise ConnectionError("db down")
+        writes.append({key_id: count for key_id, (_, count) in batch.items()})
+
+    tracker._write = write
+    for key_id in ["k1", "k1", "k2", "k1"]:
+        tracker.record(key_id)
+    await tracker.flush()
+    tracker.record("k2")
+
+    state["down"] = False
+    await tracker.flush()
+    await tracker.flush()
+    assert writes == [{"k1": 3, "k2": 2}]
+    await tracker.stop()
+
+
+async def test_key_usage_writes_one_update_from_values(monkeypatch):
+    from sqlalchemy.dialects import postgresql
+
+    import app.database
+
+    mod = load_module("apps/api/app/services/key_usage.py", "key_usage")
+    statements: list = []
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def begin(self):
+            return self
+
+        async def execute(self, stmt):
+            statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+
+    monkeypatch.setattr(app.database, "AsyncSessionLocal", Session)
+    now = datetime.now(UTC)
+    await mod.KeyUsageTracker()._write({"k1": (now, 3), "k2": (now, 1)})
+    assert len(statements) == 1
+    sql = " ".join(statements[0].split())
+    assert sql.startswith("UPDATE api_keys SET last_used_at=greatest(")
+    assert "FROM (VALUES" in sql and "request_count=(api_keys.request_count + usage.uses)" in sql
+
+
+async def test_password_hasher_bounds_concurrency_and_queue():
+    import asyncio
+    import threading
+
+    mod = load_module("apps/api/app/services/passwords.py", "passwords")
+    hasher = mod.PasswordHasher(workers=2, max_pending=1)
+    release = threading.Event()
+    running: list = []
+
+    def slow(i):
+        running.append(i)
+        release.wait(5)
+        return i
+
+    tasks = [asyncio.create_task(hasher._run(slow, i)) for i in range(3)]
+    await asyncio.sleep(0.05)
+    assert sorted(running) == [0, 1]  # the third waits for a slot, not in the pool
+    with pytest.raises(mod.PasswordHasherBusyError):
+        await hasher._run(slow, 3)
+
+    tasks[2].cancel()  # client gone while queued: never hashed
+    release.set()
+    assert await asyncio.gather(*tasks[:2]) == [0, 1]
+    with pytest.raises(asyncio.CancelledError):
+        await tasks[2]
+    assert sorted(running) == [0, 1] and hasher._pending == 0
+    hasher._executor.shutdown()
+
+
+async def test_password_hasher_upgrades_outdated_hashes(monkeypatch):
+    from passlib.context import CryptContext
+
+    mod = load_module("apps/api/app/services/passwords.py", "passwords")
+    old = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("s3cret")
+    monkeypatch.setattr(mod, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5))
+    hasher = mod.PasswordHasher(workers=1, max_pending=0)
+
+    valid, new_hash = await hasher.verify_and_update("s3cret", old)
+    assert valid and new_hash.startswith("$2b$05$")
+    assert await hasher.verify_and_update("wrong", new_hash) == (False, None)
+    assert await hasher.verify_and_update("s3cret", None) == (False, None)
+    hasher._executor.shutdown()
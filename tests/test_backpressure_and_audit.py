@@ -1,6 +1,11 @@
 import importlib.util
+import sys
 from pathlib import Path
 
+import pytest
+
+sys.path.insert(0, "apps/api")
+
 
 def load_module(path: str, name: str):
     spec = importlib.util.spec_from_file_location(name, Path(path))
@@ -24,3 +29,365 @@ def test_immutable_audit_chain():
     trail.append("inference", {"tenant": "t1"})
     trail.append("policy_decision", {"allowed": True})
     assert trail.verify_chain() is True
+
+
+def test_immutable_audit_checkpoints_and_proofs():
+    mod = load_module("governance/immutable_audit.py", "immutable_audit")
+    trail = mod.ImmutableAuditTrail(segment_size=4)
+    for i in range(11):
+        trail.append("inference", {"n": i})
+    assert [c.segment for c in trail.checkpoints] == [0, 1]
+    assert all(trail.verify_entry(i) for i in range(11))
+    assert trail.verify_chain() is True
+
+    trail._entries[5].payload["n"] = 99
+    assert trail.verify_entry(5) is False
+    assert trail.verify_entry(0) is True
+    assert trail.verify_chain() is False
+
+
+def test_canonical_json_vectors_and_fallback_parity():
+    import hashlib
+    from datetime import datetime, timedelta, timezone
+    from uuid import UUID
+
+    mod = load_module("apps/api/app/canonical.py", "canonical")
+    vectors = [
+        ({"b": 1, "a": [True, False, None]}, b'{"a":[true,false,null],"b":1}'),
+        (
+            [0.1, 1.0, -0.0, 1e-05, 1.25e-06, 1e16, 123456789.125, float("nan")],
+            b"[0.1,1.0,-0.0,0.00001,1.25e-6,1e16,123456789.125,null]",
+        ),
+        (
+            {
+                "at": datetime(2024, 3, 1, 9, 30, tzinfo=timezone(timedelta(hours=-3))),
+                "id": UUID("7b0e6d1c-2f7a-4c55-9a51-0f3b8f1d9e21"),
+            },
+            b'{"at":"2024-03-01T12:30:00.000000Z","id":"7b0e6d1c-2f7a-4c55-9a51-0f3b8f1d9e21"}',
+        ),
+    ]
+    for value, expected in vectors:
+        assert mod.dumps(value) == expected
+        assert mod.dumps_stdlib(value) == expected
+
+    tricky = {"é": "ü", "Z": "\u2028", "z": "\x1f\n\"\\"}
+    assert hashlib.sha256(mod.dumps_stdlib(tricky)).hexdigest() == (
+        "6b6cdf9d21f661f65947cc1adb1b548289d10792665839b70a18522f04952476"
+    )
+    assert mod.dumps(tricky) == mod.dumps_stdlib(tricky)
+
+
+def test_immutable_audit_hashes_are_the_same_with_and_without_orjson(monkeypatch):
+    from datetime import UTC, datetime
+    from decimal import Decimal
+
+    import app.canonical
+
+    payload = {"at": datetime(2026, 3, 1, 9, 30, tzinfo=UTC), "cost": Decimal("0.10"), "tiny": 1e-07, "big": 1e20}
+    entry = {"event": "inference", "payload": payload, "timestamp": "2026-03-01T09:30:00.000000Z", "prev_hash": "genesis"}
+
+    def digest():
+        mod = load_module("governance/immutable_audit.py", "immutable_audit")
+        return mod.canonical_json(payload), mod.ImmutableAuditTrail._digest(mod.AuditEntry(**entry, hash=""))
+
+    with_orjson = digest()
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.delitem(sys.modules, "app.canonical")
+    monkeypatch.setattr(app, "canonical", app.canonical)  # restored after the stdlib re-import below
+    stdlib = digest()
+    assert sys.modules["app.canonical"].orjson is None
+    assert with_orjson == stdlib
+    assert stdlib[0] == b'{"at":"2026-03-01T09:30:00.000000Z","big":1e20,"cost":"0.10","tiny":1e-7}'
+
+
+def test_immutable_audit_mixed_hash_versions():
+    mod = load_module("governance/immutable_audit.py", "immutable_audit")
+    trail = mod.ImmutableAuditTrail()
+    legacy = trail.append("inference", {"tenant": "t1"})
+    legacy.version = 1
+    legacy.hash = trail._digest(legacy)
+    trail._last_hash = legacy.hash
+    trail.append("policy_decision", {"allowed": True})
+    assert trail.verify_chain() is True
+    assert trail.verify_entry(0) and trail.verify_entry(1)
+
+
+def test_immutable_audit_segment_files_survive_reopen(tmp_path):
+    mod = load_module("governance/immutable_audit.py", "immutable_audit")
+    options = {"segment_size": 8, "segment_entries": 50, "block_entries": 7}
+    trail = mod.ImmutableAuditTrail(path=tmp_path, **options)
+    for i in range(120):
+        trail.append("inference", {"n": i})
+    trail._entries.sync()
+    trail._entries._sealer.shutdown(wait=True)
+    assert sorted(p.name for p in tmp_path.glob("*.seg")) == ["00000000.seg", "00000001.seg"]
+
+    # Simulate a crash mid-rotation (raw log not yet sealed) with a torn frame at the tail.
+    (tmp_path / "00000001.seg").unlink()
+    with open(tmp_path / "00000002.log", "ab") as fh:
+        fh.write(b"\x40\x00\x00\x00torn")
+
+    trail = mod.ImmutableAuditTrail(path=tmp_path, **options)
+    assert len(trail._entries) == 120
+    assert [e.payload["n"] for e in trail._entries] == list(range(120))
+    assert trail._entries[75].payload == {"n": 75}
+    trail.append("inference", {"n": 120})
+    assert trail.verify_chain() is True
+    assert all(trail.verify_entry(i) for i in (0, 49, 50, 119, 120))
+    assert len(trail.checkpoints) == 15
+    trail.close()
+
+
+def test_bloom_filter_sizing_and_membership():
+    mod = load_module("apps/api/app/bloom.py", "bloom")
+    bits, hashes = mod.optimal_size(10_000_000, 0.001)
+    assert hashes == 10
+    assert 17 * 2**20 < bits / 8 < 18 * 2**20
+
+    bf = mod.BloomFilter(5_000, error_rate=0.01)
+    keys = [f"key-{i}".encode() for i in range(5_000)]
+    for key in keys:
+        bf.add(key)
+    assert all(key in bf for key in keys)
+    false_positives = sum(f"other-{i}".encode() in bf for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+    assert abs(bf.estimated_error_rate() - 0.01) < 0.002
+
+
+def audit_entry(i: int, event: str = "inference.completed", details=None) -> dict:
+    from datetime import UTC, datetime
+
+    return {
+        "id": f"e{i}",
+        "tenant_id": f"t{i % 2}",
+        "actor_id": None,
+        "event": event,
+        "resource": "inference",
+        "resource_id": None,
+        "details": details if details is not None else {"n": i},
+        "ip_address": None,
+        "created_at": datetime.now(UTC),
+    }
+
+
+def fake_commit(writer, committed: list, state: dict):
+    from sqlalchemy.exc import IntegrityError
+
+    async def commit(batch):
+        state["calls"] = state.get("calls", 0) + 1
+        if state.get("outage"):
+            raise ConnectionError("db down")
+        if any(e["event"] == "poison" for e in batch):
+            raise IntegrityError("INSERT", {}, Exception("value too long for type character varying(100)"))
+        for e in batch:
+            e["seq"] = e["entry_hash"] = "assigned"
+        committed.extend(e["id"] for e in batch)
+        return []
+
+    writer._commit = commit
+
+
+async def test_audit_writer_isolates_rejected_entries():
+    mod = load_module("apps/api/app/services/audit_writer.py", "audit_writer")
+    writer = mod.AuditWriter(batch_size=10)
+    committed: list = []
+    fake_commit(writer, committed, {})
+    writer._buffer.extend([audit_entry(0), audit_entry(1, event="poison"), audit_entry(2)])
+    await writer.flush()
+    assert committed == ["e0", "e2"]
+    assert writer.stats() == {"buffered": 0, "committed": 0, "rejected": 1, "refused": 0}
+
+
+async def test_audit_writer_refuses_when_full_and_backs_off_inline_flushes():
+    mod = load_module("apps/api/app/services/audit_writer.py", "audit_writer")
+    writer = mod.AuditWriter(batch_size=100, max_buffer=3)
+    committed: list = []
+    state = {"outage": True}
+    fake_commit(writer, committed, state)
+
+    for i in range(3):
+        await writer.append(audit_entry(i))
+    with pytest.raises(mod.AuditBackpressureError):
+        await writer.append(audit_entry(3))
+    assert state["calls"] == 1
+    assert "seq" not in writer._buffer[0]
+    with pytest.raises(mod.AuditBackpressureError):
+        await writer.append(audit_entry(4))
+    assert state["calls"] == 1  # no inline flush inside the backoff window
+    assert writer.stats()["refused"] == 2 and writer.stats()["buffered"] == 3
+
+    with pytest.raises(ValueError):
+        await writer.append(audit_entry(5, details={"at": object()}))
+
+    state["outage"] = False
+    writer._inline_flush_at = 0.0
+    await writer.append(audit_entry(6))
+    assert committed == ["e0", "e1", "e2"] and [e["id"] for e in writer._buffer] == ["e6"]
+    await writer.stop()
+
+
+async def test_orchestrator_reports_audit_entries_the_writer_refuses():
+    import asyncio
+    from types import SimpleNamespace
+
+    from structlog.testing import capture_logs
+
+    mod = load_module("apps/api/app/services/nexus_orchestrator.py", "nexus_orchestrator")
+    writer_mod = load_module("apps/api/app/services/audit_writer.py", "audit_writer")
+
+    async def analyze(prompt):
+        return SimpleNamespace(redacted_text=prompt, has_pii=False, has_critical_pii=False, entities=[])
+
+    async def call_model(model_id, **kwargs):
+        return mod.ModelResult(model_id, "openai", "ok", 1.0, 1.0, 2, 0.0, input_tokens=1, output_tokens=1)
+
+    async def record(**kwargs):
+        pass
+
+    async def refuse(**kwargs):
+        raise writer_mod.AuditBackpressureError("audit buffer full (3 entries)")
+
+    nexus = object.__new__(mod.NexusOrchestrator)
+    nexus.pii_detector = SimpleNamespace(analyze=analyze)
+    nexus._call_model = call_model
+    nexus.stats = SimpleNamespace(record_inference=lambda **kwargs: None)
+    nexus._log_inference = lambda *args, **kwargs: None
+    nexus.cost_tracker = SimpleNamespace(record=record)
+    nexus.audit = SimpleNamespace(log_inference=refuse)
+    nexus._audit_tasks = set()
+
+    with capture_logs() as logs:
+        result = await nexus.orchestrate("hello", tenant_id="t1", override_models=["gpt-4o"])
+        for _ in range(3):
+            await asyncio.sleep(0)
+    dropped = [e for e in logs if e["event"] == "nexus.audit.dropped"]
+    assert dropped == [
+        {
+            "event": "nexus.audit.dropped",
+            "log_level": "error",
+            "request_id": result.request_id,
+            "error": "audit buffer full (3 entries)",
+            "error_type": "AuditBackpressureError",
+        }
+    ]
+    assert nexus._audit_tasks == set()
+
+
+def chain_rows(n: int, tenant_id: str = "t0") -> list:
+    from datetime import UTC, datetime
+    from types import SimpleNamespace
+
+    from app.services.audit_writer import GENESIS_HASH, compute_entry_hash
+
+    rows, prev_hash = [], GENESIS_HASH
+    for seq in range(1, n + 1):
+        entry = {**audit_entry(seq), "tenant_id": tenant_id, "seq": seq, "prev_hash": prev_hash, "hash_version": 2}
+        entry["created_at"] = datetime(2026, 1, 1, tzinfo=UTC)
+        entry["entry_hash"] = prev_hash = compute_entry_hash(entry)
+        rows.append(SimpleNamespace(**entry))
+    return rows
+
+
+class FakeAuditSession:
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.head = (rows[-1].seq, rows[-1].entry_hash) if rows else None
+        self.queries: list = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query):
+        from unittest.mock import Mock
+
+        if "audit_chain_heads" in str(query):
+            return Mock(first=Mock(return_value=self.head))
+        return []  # no checkpoints sealed
+
+    async def stream(self, query):
+        params = query.compile().params
+        lo = next(v for k, v in params.items() if k.startswith("seq_1"))
+        hi = next((v for k, v in params.items() if k.startswith("seq_2")), None)
+        self.queries.append((lo, hi))
+        return FakeStream([r for r in self.rows if r.seq >= lo and (hi is None or r.seq <= hi)])
+
+
+class FakeStream:
+    def __init__(self, rows: list):
+        self.rows = rows
+
+    async def scalars(self):
+        for row in self.rows:
+            yield row
+
+
+@pytest.fixture
+def audit_db(monkeypatch):
+    import app.database
+
+    session = FakeAuditSession(chain_rows(10))
+    monkeypatch.setattr(app.database, "AsyncSessionLocal", lambda: session)
+    return session
+
+
+async def test_audit_verify_range_hashes_off_the_event_loop(audit_db, monkeypatch):
+    import threading
+
+    mod = load_module("apps/api/app/services/audit_verifier.py", "audit_verifier")
+    threads: list = []
+    verify_segment = mod.verify_segment
+
+    def spy(entries):
+        threads.append(threading.current_thread())
+        return verify_segment(entries)
+
+    monkeypatch.setattr(mod, "verify_segment", spy)
+    verifier = mod.AuditVerifier(segment_size=4)
+    report = await verifier.verify_range("t0", 1, None, workers=0)
+    assert report == mod.VerifyReport(True, 10, 3)
+    assert len(threads) == 3 and threading.main_thread() not in threads
+
+    audit_db.rows[6].details = {"n": "tampered"}
+    report = await verifier.verify_range("t0", 1, None, workers=0)
+    assert (report.ok, report.bad_seq, report.reason) == (False, 7, "hash_or_link_mismatch")
+
+
+async def test_audit_verify_endpoint_is_bounded_to_checkpoint_segments(audit_db, monkeypatch):
+    from app.config import settings
+    from app.routers import governance
+    from app.services.audit_verifier import AuditVerifier
+
+    monkeypatch.setattr(governance, "get_audit_verifier", lambda: AuditVerifier(segment_size=4))
+    monkeypatch.setattr(settings, "audit_verify_max_segments", 2)
+    tenant = {"id": "t0"}
+
+    page = await governance.verify_audit_trail(tenant, from_seq=1, to_seq=None)
+    assert (page["ok"], page["entries"], page["to_seq"], page["next_from_seq"]) == (True, 8, 8, 9)
+    page = await governance.verify_audit_trail(tenant, from_seq=page["next_from_seq"], to_seq=None)
+    assert (page["ok"], page["entries"], page["to_seq"], page["next_from_seq"]) == (True, 2, 16, None)
+    page = await governance.verify_audit_trail(tenant, from_seq=2, to_seq=5)
+    assert (page["entries"], page["to_seq"], page["next_from_seq"]) == (4, 5, None)
+    assert audit_db.queries == [(1, 8), (9, 10), (2, 5)]
+
+
+async def test_audit_verify_reports_a_truncated_tail_against_the_chain_head(audit_db):
+    mod = load_module("apps/api/app/services/audit_verifier.py", "audit_verifier")
+    verifier = mod.AuditVerifier(segment_size=4)
+    del audit_db.rows[8:]  # the newest two entries are deleted, the head still says seq 10
+
+    report = await verifier.verify_tenant("t0", workers=0)
+    assert report == mod.VerifyReport(False, 8, 2, 9, "truncated")
+    report = await verifier.verify_range("t0", 5, 12, workers=0)
+    assert (report.ok, report.bad_seq, report.reason) == (False, 9, "truncated")
+    assert (await verifier.verify_range("t0", 1, 8, workers=0)).ok
+
+    audit_db.head = (8, "f" * 64)  # head moved back, but to a hash the chain never had
+    report = await verifier.verify_tenant("t0", workers=0)
+    assert (report.ok, report.bad_seq, report.reason) == (False, 8, "head_mismatch")
+
+    audit_db.head = None
+    report = await verifier.verify_tenant("t0", workers=0)
+    assert (report.ok, report.reason) == (False, "missing_chain_head")
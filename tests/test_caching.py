@@ -0,0 +1,366 @@
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, "apps/api")
+
+
+def load_module(path: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, Path(path))
+    mod = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def counting_loader(calls: list, value="v", gate: asyncio.Event | None = None):
+    async def loader():
+        calls.append(value)
+        if gate is not None:
+            await gate.wait()
+        return value, len(str(value))
+
+    return loader
+
+
+async def test_near_cache_single_flight_and_lru():
+    mod = load_module("apps/api/app/near_cache.py", "near_cache")
+    cache = mod.NearCache({"t": mod.NamespacePolicy(max_entries=2, ttl_seconds=60)})
+    calls: list = []
+    gate = asyncio.Event()
+    waiters = [asyncio.create_task(cache.get_or_load("t", "a", counting_loader(calls, "A", gate))) for _ in range(20)]
+    await asyncio.sleep(0)
+    gate.set()
+    assert await asyncio.gather(*waiters) == ["A"] * 20
+    assert calls == ["A"]
+
+    cache.put("t", "b", "B", size=1)
+    assert cache.get("t", "a") == (True, "A")  # touch: b is now least recent
+    cache.put("t", "c", "C", size=1)
+    assert cache.get("t", "b") == (False, None)
+    stats = cache.stats()["t"]
+    assert (stats["entries"], stats["bytes"], stats["evictions"], stats["loads"]) == (2, 2, 1, 1)
+
+
+async def test_near_cache_invalidation_during_load_is_not_resurrected():
+    mod = load_module("apps/api/app/near_cache.py", "near_cache")
+    cache = mod.NearCache()
+    gate = asyncio.Event()
+    load = asyncio.create_task(cache.get_or_load("t", "k", counting_loader([], "old", gate)))
+    await asyncio.sleep(0)
+    cache.discard("t", "k")
+    gate.set()
+    assert await load == "old"
+    assert cache.get("t", "k") == (False, None)
+
+
+async def test_near_cache_serves_stale_while_one_refresh_runs():
+    mod = load_module("apps/api/app/near_cache.py", "near_cache")
+    cache = mod.NearCache({"t": mod.NamespacePolicy(ttl_seconds=60, stale_seconds=60)})
+    cache.put("t", "k", "old")
+    cache._ns("t").entries["k"].fresh_until = 0.0
+    calls: list = []
+    gate = asyncio.Event()
+    results = [await cache.get_or_load("t", "k", counting_loader(calls, "new", gate)) for _ in range(3)]
+    assert results == ["old"] * 3
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(*cache._tasks)
+    assert calls == ["new"]
+    assert cache.get("t", "k") == (True, "new")
+    assert cache.stats()["t"]["stale_hits"] == 3
+
+
+async def test_near_cache_waiter_takes_over_a_cancelled_load():
+    mod = load_module("apps/api/app/near_cache.py", "near_cache")
+    cache = mod.NearCache()
+    owner = asyncio.create_task(cache.get_or_load("t", "k", counting_loader([], "x", asyncio.Event())))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load("t", "k", counting_loader([], "y")))
+    await asyncio.sleep(0)
+    owner.cancel()
+    assert await waiter == "y"
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+
+async def test_near_cache_load_errors_reach_every_waiter_and_are_not_cached():
+    mod = load_module("apps/api/app/near_cache.py", "near_cache")
+    cache = mod.NearCache()
+    gate = asyncio.Event()
+
+    async def failing():
+        await gate.wait()
+        raise ConnectionError("redis down")
+
+    waiters = [asyncio.create_task(cache.get_or_load("t", "k", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert cache.stats()["t"]["load_errors"] == 1
+    assert await cache.get_or_load("t", "k", counting_loader([], "ok")) == "ok"
+
+
+@pytest.mark.parametrize("serializer", ["orjson", "msgpack"])
+def test_cache_codec_round_trips_with_and_without_compression(serializer):
+    from dataclasses import dataclass
+    from datetime import UTC, datetime
+
+    mod = load_module("apps/api/app/cache_codec.py", "cache_codec")
+    mod.zstandard = None  # exercise the zlib fallback regardless of what is installed
+    codec = mod.CacheCodec(serializer, compress_threshold=64)
+    small = {"id": "k1", "n": 3, "tags": ["a", "b"]}
+    large = {"rows": [{"i": i, "text": "lorem ipsum"} for i in range(100)]}
+
+    raw = codec.encode(small)
+    assert raw[0] == codec.serializer
+    assert codec.decode(raw) == small
+    raw = codec.encode(large)
+    assert raw[0] == codec.serializer + mod.ZLIB
+    assert len(raw) < len(mod.CacheCodec(serializer, compress_threshold=0).encode(large))
+    assert codec.decode(raw) == large
+
+    @dataclass
+    class Point:
+        x: int
+        at: str
+
+    at = datetime(2026, 1, 1, tzinfo=UTC)
+    assert codec.decode(codec.encode(Point(1, at)), Point) == Point(1, at.isoformat())
+
+
+def test_cache_codec_reads_values_written_as_plain_json():
+    from pydantic import BaseModel
+
+    mod = load_module("apps/api/app/cache_codec.py", "cache_codec")
+
+    class Tenant(BaseModel):
+        id: str
+        plan: str
+
+    codec = mod.CacheCodec("msgpack")
+    assert codec.decode(b'{"id":"t1","plan":"pro"}', Tenant) == Tenant(id="t1", plan="pro")
+    assert codec.decode(b"[1,2]") == [1, 2]
+
+
+class FakeBytesRedis:
+    def __init__(self, data: dict):
+        self.data = data
+        self.mgets: list = []
+
+    async def mget(self, keys):
+        self.mgets.append(list(keys))
+        return [self.data.get(k) for k in keys]
+
+
+async def test_cache_get_many_reads_near_cache_misses_in_one_mget(monkeypatch):
+    import app.cache as cache
+    from app.cache_codec import CacheCodec
+    from app.config import settings
+    from app.near_cache import NearCache
+
+    codec = CacheCodec("msgpack")
+    redis = FakeBytesRedis({"nexus:tenant:b": codec.encode({"id": "b"}), "nexus:tenant:c": codec.encode({"id": "c"})})
+    near = NearCache()
+    near.put("tenant", "nexus:tenant:a", {"id": "a"})
+    monkeypatch.setattr(settings, "near_cache_enabled", True)
+    monkeypatch.setattr(cache, "get_near_cache", lambda: near)
+    monkeypatch.setattr(cache, "get_redis_bytes", lambda: redis)
+    monkeypatch.setattr(cache, "get_codec", lambda: codec)
+
+    keys = ["nexus:tenant:a", "nexus:tenant:b", "nexus:tenant:c", "nexus:tenant:d", "nexus:tenant:b"]
+    assert await cache.cache_get_many(keys) == {
+        "nexus:tenant:a": {"id": "a"},
+        "nexus:tenant:b": {"id": "b"},
+        "nexus:tenant:c": {"id": "c"},
+    }
+    assert redis.mgets == [["nexus:tenant:b", "nexus:tenant:c", "nexus:tenant:d"]]
+    assert near.get("tenant", "nexus:tenant:c") == (True, {"id": "c"})
+
+
+class ScriptRedis:
+    """Redis stand-in for the auth-context cache: GET/MGET/INCR/DEL plus Lua scripts via lupa."""
+
+    def __init__(self):
+        lupa = pytest.importorskip("lupa")
+        self.lua = lupa.LuaRuntime(encoding=None)
+        self.data: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+        self.failing: set[str] = set()  # "mget" / "script": commands that raise ConnectionError
+        self.lua.globals()[b"redis"] = self.lua.table_from({b"call": self._call})
+
+    def _call(self, command, *args):
+        key = args[0].decode()
+        if command.upper() == b"GET":
+            return self.data.get(key, False)
+        assert command.upper() == b"SET" and args[2].upper() == b"EX"
+        self.data[key], self.ttls[key] = args[1], int(args[3])
+        return b"OK"
+
+    def register_script(self, source: str):
+        function = self.lua.eval(f"function(KEYS, ARGV) {source} end".encode())
+
+        async def script(keys, args):
+            self._maybe_fail("script")
+            argv = [a if isinstance(a, bytes) else str(a).encode() for a in args]
+            return function(self.lua.table_from([k.encode() for k in keys]), self.lua.table_from(argv))
+
+        return script
+
+    async def mget(self, *keys):
+        self._maybe_fail("mget")
+        return [self.data.get(k) for k in keys]
+
+    def _maybe_fail(self, command: str) -> None:
+        from redis.exceptions import ConnectionError
+
+        if command in self.failing:
+            raise ConnectionError("Error 111 connecting to redis:6379. Connection refused.")
+
+    def pipeline(self, transaction: bool = True):
+        return ScriptPipeline(self)
+
+    async def publish(self, channel, message):
+        return 0
+
+
+class ScriptPipeline:
+    def __init__(self, redis: ScriptRedis):
+        self.redis = redis
+        self.ops: list = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incr(self, key):
+        self.ops.append(lambda: self.redis.data.__setitem__(key, str(int(self.redis.data.get(key, 0)) + 1).encode()))
+
+    def expire(self, key, seconds):
+        self.ops.append(lambda: self.redis.ttls.__setitem__(key, seconds))
+
+    def delete(self, key):
+        self.ops.append(lambda: self.redis.data.pop(key, None))
+
+    async def execute(self):
+        for op in self.ops:
+            op()
+
+
+class GatedSession:
+    """``AsyncSessionLocal`` whose queries return ``rows`` in turn, the first one after ``gate`` opens."""
+
+    def __init__(self, rows: list, gate: asyncio.Event):
+        self.rows = rows
+        self.gate = gate
+        self.queries = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query):
+        from unittest.mock import Mock
+
+        self.queries += 1
+        if self.queries == 1:
+            await self.gate.wait()
+        return Mock(scalar_one_or_none=Mock(return_value=self.rows.pop(0)))
+
+
+def tenant_row(**overrides):
+    from types import SimpleNamespace
+
+    row = {"id": "t1", "name": "Acme", "plan": "pro", "nexus_enabled": True, "daily_budget_usd": 50.0, "rate_limit_rpm": 60}
+    return SimpleNamespace(**{**row, **overrides})
+
+
+@pytest.fixture
+def auth_context(monkeypatch):
+    import app.database
+    from app.config import settings
+    from app.near_cache import NearCache
+
+    mod = load_module("apps/api/app/services/auth_context.py", "auth_context")
+    redis = ScriptRedis()
+    near = NearCache()
+    monkeypatch.setattr(settings, "near_cache_enabled", True)
+    monkeypatch.setattr(mod, "get_redis", lambda: redis)
+    monkeypatch.setattr(mod, "get_redis_bytes", lambda: redis)
+    monkeypatch.setattr(mod, "get_near_cache", lambda: near)
+    monkeypatch.setattr("app.cache.get_redis", lambda: redis)
+    contexts = mod.AuthContextCache(ttl=60, negative_ttl=10)
+    contexts.mod, contexts.redis, contexts.near = mod, redis, near
+
+    def use_db(rows: list) -> GatedSession:
+        session = GatedSession(rows, asyncio.Event())
+        monkeypatch.setattr(app.database, "AsyncSessionLocal", session)
+        return session
+
+    contexts.use_db = use_db
+    return contexts
+
+
+async def test_auth_context_revocation_during_a_load_is_not_recached(auth_context):
+    db = auth_context.use_db([tenant_row(), None])  # the second read sees the tenant suspended
+    load = asyncio.create_task(auth_context.tenant("t1"))
+    await asyncio.sleep(0)
+    await auth_context.invalidate_tenant("t1")  # suspended and committed while the load runs
+    db.gate.set()
+
+    assert await load is None
+    assert (db.queries, auth_context.stale_loads) == (2, 1)
+    key = auth_context.mod.TENANT_KEY.format(tenant_id="t1")
+    assert auth_context.mod.get_codec().decode(auth_context.redis.data[key]) == {}
+    assert auth_context.redis.ttls[key] == 10
+    assert await auth_context.tenant("t1") is None and db.queries == 2
+
+
+async def test_auth_context_falls_back_to_postgres_when_redis_fails(auth_context, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "near_cache_enabled", False)
+    db = auth_context.use_db([tenant_row(), tenant_row(plan="enterprise")])
+    db.gate.set()
+
+    auth_context.redis.failing = {"mget"}
+    assert (await auth_context.tenant("t1"))["plan"] == "pro"
+    auth_context.redis.failing = {"script"}  # the read works, the write-back doesn't
+    assert (await auth_context.tenant("t1"))["plan"] == "enterprise"
+    assert (db.queries, auth_context.redis_errors) == (2, 2)
+    assert auth_context.redis.data == {}
+
+
+async def test_auth_context_caches_snapshots_and_misses_with_their_own_ttls(auth_context):
+    import time
+
+    from app.near_cache import NamespacePolicy
+
+    db = auth_context.use_db([tenant_row(), None])
+    db.gate.set()
+    assert (await auth_context.tenant("t1"))["plan"] == "pro"
+    assert await auth_context.tenant("t2") is None
+    assert await auth_context.tenant("t1") is not None and db.queries == 2
+
+    ttls = auth_context.redis.ttls
+    assert (ttls["nexus:auth:tenant:t1"], ttls["nexus:auth:tenant:t2"]) == (60, 10)
+
+    # With a near-cache policy longer than both, each entry keeps its own TTL.
+    auth_context.near.configure("auth", NamespacePolicy(ttl_seconds=120))
+    auth_context.near.clear()
+    await auth_context.tenant("t1")
+    await auth_context.tenant("t2")
+    entries, now = auth_context.near._ns("auth").entries, time.monotonic()
+    assert 59 < entries["nexus:auth:tenant:t1"].fresh_until - now <= 60
+    assert 9 < entries["nexus:auth:tenant:t2"].fresh_until - now <= 10
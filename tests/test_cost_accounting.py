@@ -0,0 +1,471 @@
+import asyncio
+import importlib.util
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, "apps/api")
+
+
+def load_module(path: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, Path(path))
+    mod = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.ops.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        self.redis.execs += 1
+        if self.redis.down:
+            raise ConnectionError("redis down")
+        results = [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.ops]
+        if self.redis.lose_reply:
+            self.redis.lose_reply = False
+            raise TimeoutError("EXEC reply lost")
+        return results
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: dict = {}
+        self.down = False
+        self.lose_reply = False
+        self.execs = 0
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("redis down")
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        self._check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def exists(self, *keys):
+        self._check()
+        return sum(k in self.data for k in keys)
+
+    async def expire(self, key, ttl):
+        return key in self.data
+
+    async def incrbyfloat(self, key, amount):
+        self.data[key] = float(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+    async def hincrbyfloat(self, key, field, amount):
+        h = self.data.setdefault(key, {})
+        h[field] = float(h.get(field, 0)) + amount
+        return h[field]
+
+    async def hincrby(self, key, field, amount):
+        h = self.data.setdefault(key, {})
+        h[field] = int(h.get(field, 0)) + amount
+        return h[field]
+
+    async def pfadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+        return 1
+
+    async def hgetall(self, key):
+        self._check()
+        return {k: str(v) for k, v in self.data.get(key, {}).items()}
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    import app.cache
+
+    fake = FakeRedis()
+    monkeypatch.setattr(app.cache, "get_redis", lambda: fake)
+    return fake
+
+
+async def test_cost_aggregator_retry_after_lost_exec_reply_counts_once(redis):
+    mod = load_module("apps/api/app/services/cost_aggregator.py", "cost_aggregator")
+    agg = mod.CostAggregator(max_unflushed_usd=100.0)
+    day = date(2026, 3, 1)
+    await agg.add("t1", "gpt-4o", 1.5, provider="openai", tokens=10, day=day)
+
+    redis.lose_reply = True
+    await agg.flush_now()
+    assert agg.stats()["unconfirmed_keys"] == 1
+    assert agg.pending_daily("t1", day) == 1.5
+
+    await agg.add("t1", "gpt-4o", 0.5, provider="openai", tokens=5, day=day)
+    await agg.flush_now()
+    assert redis.data["nexus:cost:daily:t1:2026-03-01"] == 2.0
+    assert redis.data["nexus:cost:models:daily:t1:2026-03-01"]["gpt-4o:openai:calls"] == 2
+    assert agg.pending_daily("t1", day) == 0
+    assert agg.stats()["unflushed_usd"] == 0
+    await agg.stop()
+
+
+async def test_cost_aggregator_stops_inline_flushes_and_drops_while_redis_is_down(redis):
+    mod = load_module("apps/api/app/services/cost_aggregator.py", "cost_aggregator")
+    agg = mod.CostAggregator(max_unflushed_usd=1.0)
+    day = date(2026, 3, 1)
+    redis.down = True
+
+    await agg.add("t1", "gpt-4o", 1.0, day=day)  # reaches the bound: one inline flush, which fails
+    assert redis.execs == 1
+    for _ in range(20):
+        await agg.add("t1", "gpt-4o", 0.25, day=day)
+    assert redis.execs == 1
+    stats = agg.stats()
+    assert stats["failing"] is True
+    assert stats["dropped"] == 20 and stats["dropped_usd"] == 5.0
+    assert stats["unflushed_usd"] == 1.0
+
+    redis.down = False
+    await agg.flush_now()
+    assert redis.data["nexus:cost:daily:t1:2026-03-01"] == 1.0
+    assert agg.stats()["failing"] is False
+    await agg.add("t1", "gpt-4o", 0.25, day=day)
+    assert agg.pending_daily("t1", day) == 0.25
+    await agg.stop()
+
+
+def cost_entry(tenant_id: str, request_id: str):
+    from datetime import UTC, datetime
+
+    mod = load_module("apps/api/app/services/cost_persistence.py", "cost_persistence")
+    return mod.CostEntry(tenant_id, request_id, "gpt-4o", "openai", 10, 5, 0.01, date(2026, 3, 1), datetime.now(UTC))
+
+
+async def test_cost_record_writer_skips_poison_rows_and_requeues_on_outage():
+    from sqlalchemy.exc import IntegrityError
+
+    mod = load_module("apps/api/app/services/cost_persistence.py", "cost_persistence")
+    writer = mod.CostRecordWriter(batch_size=10)
+    written = []
+    outage = False
+
+    async def write(batch):
+        if outage:
+            raise ConnectionError("db down")
+        if any(e.tenant_id == "deleted" for e in batch):
+            raise IntegrityError("INSERT", {}, Exception("violates foreign key constraint"))
+        written.extend(e.request_id for e in batch)
+
+    writer._write = write
+    for i in range(5):
+        writer._buffer.append(cost_entry("deleted" if i == 2 else "t1", f"r{i}"))
+    await writer.flush()
+    assert written == ["r0", "r1", "r3", "r4"]
+    assert writer.stats()["rejected"] == 1 and writer.stats()["buffered"] == 0
+
+    outage = True
+    writer._buffer.extend([cost_entry("t1", "r5"), cost_entry("t1", "r6")])
+    await writer.flush()
+    assert [e.request_id for e in writer._buffer] == ["r5", "r6"]
+    outage = False
+    await writer.flush()
+    assert written[-2:] == ["r5", "r6"] and writer.stats()["buffered"] == 0
+
+
+class RollupSession:
+    """``AsyncSessionLocal`` that answers the writer's statements by their compiled SQL."""
+
+    def __init__(self, inserted: list[str] | None = None, counted=(), aggregates=()):
+        self.inserted = inserted or []
+        self.counted = list(counted)
+        self.aggregates = list(aggregates)
+        self.sql: list[str] = []
+        self.updates: list[dict] = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    async def execute(self, stmt, params=None):
+        from unittest.mock import Mock
+
+        from sqlalchemy.dialects import postgresql
+
+        sql = " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+        self.sql.append(sql)
+        if sql.startswith("INSERT INTO cost_records"):
+            return Mock(scalars=Mock(return_value=iter(self.inserted)))
+        if sql.startswith("SELECT DISTINCT cost_records"):
+            return Mock(all=Mock(return_value=self.counted))
+        if sql.startswith("SELECT daily_cost_aggregates"):
+            return Mock(scalars=Mock(return_value=iter(self.aggregates)))
+        if sql.startswith("UPDATE daily_cost_aggregates"):
+            self.updates.extend(params)
+        return Mock()
+
+
+async def test_cost_record_retry_after_lost_commit_only_rolls_up_new_rows(monkeypatch):
+    import app.database
+
+    mod = load_module("apps/api/app/services/cost_persistence.py", "cost_persistence")
+    first, second = cost_entry("t1", "r1"), cost_entry("t1", "r2")
+    session = RollupSession(inserted=[second.id])  # ``first`` landed before the reply was lost
+    monkeypatch.setattr(app.database, "AsyncSessionLocal", session)
+    writer = mod.CostRecordWriter()
+    rolled_up = []
+
+    async def rollup(session, batch):
+        rolled_up.extend(batch)
+
+    writer._rollup = rollup
+    await writer._write([first, second])
+    assert "ON CONFLICT (id, created_at) DO NOTHING RETURNING cost_records.id" in session.sql[0]
+    assert rolled_up == [second] and writer.stats()["written"] == 1
+
+
+async def test_cost_rollup_keys_models_by_provider_and_counts_requests_once():
+    from types import SimpleNamespace
+
+    mod = load_module("apps/api/app/services/cost_persistence.py", "cost_persistence")
+    day = date(2026, 3, 1)
+    entries = [cost_entry("t1", "r1"), cost_entry("t1", "r2"), cost_entry("t1", "r2")]
+    entries[2].provider = "azure"
+    existing = SimpleNamespace(
+        id="agg-1",
+        tenant_id="t1",
+        period_date=day,
+        total_requests=1,
+        total_tokens=15,
+        total_cost_usd=0.01,
+        by_model={"openai:gpt-4o": {"provider": "openai", "model": "gpt-4o", "cost_usd": 0.01, "tokens": 15, "requests": 1}},
+    )
+    # r1 already has a row from an earlier batch, so only r2 is a new request.
+    session = RollupSession(counted=[("t1", day, "r1")], aggregates=[existing])
+    await mod.CostRecordWriter()._rollup(session, entries)
+
+    [row] = session.updates
+    assert row["total_requests"] == 2 and row["total_tokens"] == 60
+    assert row["by_model"]["openai:gpt-4o"]["requests"] == 3
+    assert row["by_model"]["azure:gpt-4o"] == {
+        "provider": "azure",
+        "model": "gpt-4o",
+        "cost_usd": 0.01,
+        "tokens": 15,
+        "requests": 1,
+    }
+
+
+class SlowSpendTracker:
+    def __init__(self, spend: float = 0.0):
+        self.spend = spend
+        self.loads = 0
+
+    async def get_daily_spend(self, tenant_id, day=None):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        return self.spend
+
+
+async def test_budget_first_requests_of_the_day_share_one_snapshot():
+    mod = load_module("apps/api/app/services/budget_enforcer.py", "budget_enforcer")
+    tracker = SlowSpendTracker()
+    enforcer = mod.BudgetEnforcer(tracker=tracker)
+
+    results = await asyncio.gather(
+        *(enforcer.reserve("t1", 10.0, 3.0) for _ in range(5)), return_exceptions=True
+    )
+    accepted = [r for r in results if isinstance(r, mod.Reservation)]
+    assert len(accepted) == 3
+    assert sum(isinstance(r, mod.BudgetExceededError) for r in results) == 2
+    assert tracker.loads == 1
+    assert enforcer._snapshots["t1"].committed_usd == 9.0
+
+
+async def test_stream_charges_estimated_cost_against_the_budget(monkeypatch):
+    from types import SimpleNamespace
+
+    mod = load_module("apps/api/app/services/nexus_orchestrator.py", "nexus_orchestrator")
+    budget = load_module("apps/api/app/services/budget_enforcer.py", "budget_enforcer")
+    enforcer = budget.BudgetEnforcer(tracker=SlowSpendTracker())
+    recorded, logged = [], []
+
+    async def record(**kwargs):
+        recorded.append(kwargs)
+
+    async def analyze(prompt):
+        return SimpleNamespace(redacted_text=prompt, has_pii=False, has_critical_pii=False, entities=[])
+
+    async def select_models(prompt, mode, max_models=1):
+        return ["gpt-4o"]
+
+    async def stream_model(**kwargs):
+        for word in ["x" * 400] * 10:
+            yield word
+
+    nexus = object.__new__(mod.NexusOrchestrator)
+    nexus.budget = enforcer
+    nexus.pii_detector = SimpleNamespace(analyze=analyze)
+    nexus.router = SimpleNamespace(select_models=select_models, get_provider=lambda m: "openai")
+    nexus.cost_tracker = SimpleNamespace(record=record)
+    nexus._stream_model = stream_model
+    nexus._log_inference = lambda *args, **kwargs: logged.append((args, kwargs))
+    stats = []
+    nexus.stats = SimpleNamespace(record_inference=lambda **kwargs: stats.append(kwargs))
+
+    reservation = await enforcer.reserve("t1", 100.0, 5.0)
+    chunks = [c async for c in nexus.stream("hello " * 100, tenant_id="t1", reservation=reservation)]
+    await asyncio.sleep(0)
+
+    expected = mod.compute_cost("gpt-4o", mod.estimate_tokens(600), mod.estimate_tokens(4000))
+    assert len(chunks) == 12 and expected > 0
+    snap = enforcer._snapshots["t1"]
+    assert snap.reserved_usd == 0 and abs(snap.spend_usd - expected) < 1e-12
+    assert recorded[0]["cost_usd"] == expected and recorded[0]["output_tokens"] == 1001
+    assert logged[0][0][4][0].cost_usd == expected
+    [recorded_stats] = stats
+    assert recorded_stats["cost_usd"] == expected and recorded_stats["tokens"] == 151 + 1001
+    assert recorded_stats["models"] == 1 and recorded_stats["error"] is False
+
+
+async def test_stream_cut_off_by_the_client_is_logged_as_aborted_with_its_safety_outcome():
+    from types import SimpleNamespace
+
+    mod = load_module("apps/api/app/services/nexus_orchestrator.py", "nexus_orchestrator")
+    logged, stats = [], []
+
+    async def analyze(prompt):
+        entities = [{"type": "CREDIT_CARD", "critical": True}]
+        return SimpleNamespace(redacted_text=prompt, has_pii=True, has_critical_pii=True, entities=entities)
+
+    async def select_models(prompt, mode, max_models=1):
+        return ["gpt-4o"]
+
+    async def stream_model(**kwargs):
+        for word in ["x" * 400] * 10:
+            yield word
+
+    async def record(**kwargs):
+        pass
+
+    nexus = object.__new__(mod.NexusOrchestrator)
+    nexus.pii_detector = SimpleNamespace(analyze=analyze)
+    nexus.router = SimpleNamespace(select_models=select_models, get_provider=lambda m: "openai")
+    nexus.cost_tracker = SimpleNamespace(record=record)
+    nexus._stream_model = stream_model
+    nexus._log_inference = lambda *args, **kwargs: logged.append(kwargs)
+    nexus.stats = SimpleNamespace(record_inference=lambda **kwargs: stats.append(kwargs))
+
+    chunks = nexus.stream("card 4111111111111111", tenant_id="t1")
+    await anext(chunks)
+    await anext(chunks)
+    await chunks.aclose()  # what Starlette does when the client disconnects
+    await asyncio.sleep(0)
+
+    [log_kwargs] = logged
+    assert log_kwargs["status_code"] == 499 and log_kwargs["error_message"] == "client disconnected"
+    assert log_kwargs["safety_passed"] is False
+    [recorded_stats] = stats
+    assert recorded_stats["error"] is False and recorded_stats["safety_passed"] is False
+    assert recorded_stats["tokens"] == mod.estimate_tokens(21) + mod.estimate_tokens(400)
+
+
+async def test_cost_breaker_uses_the_authenticated_tenant_not_the_header():
+    from datetime import date as day_type
+
+    breaker = load_module("apps/api/app/middleware/cost_circuit_breaker.py", "cost_circuit_breaker")
+    enforcer = breaker.get_budget_enforcer()
+    over = load_module("apps/api/app/services/budget_enforcer.py", "budget_enforcer")._Snapshot(
+        day=day_type.today(), spend_usd=20.0, budget_usd=10.0, fetched_at=0.0
+    )
+    enforcer._snapshots["over"] = over
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def call(headers, claims):
+        sent = []
+        scope = {"type": "http", "path": "/api/v1/nexus/chat", "headers": headers, "state": {"claims": claims}}
+
+        async def send(message):
+            sent.append(message)
+
+        await breaker.CostCircuitBreakerMiddleware(app)(scope, None, send)
+        return sent[0]["status"]
+
+    try:
+        assert await call([], {"tenant_id": "over"}) == 402
+        assert await call([(b"x-tenant-id", b"someone-else")], {"tenant_id": "over"}) == 402
+        assert await call([(b"x-tenant-id", b"over")], {"tenant_id": "fine"}) == 200
+    finally:
+        enforcer._snapshots.pop("over", None)
+
+
+async def test_cost_breakdown_keeps_providers_of_the_same_model_apart(redis):
+    agg_mod = load_module("apps/api/app/services/cost_aggregator.py", "cost_aggregator")
+    tracker_mod = load_module("apps/api/app/services/cost_tracker.py", "cost_tracker")
+    agg = agg_mod.CostAggregator(max_unflushed_usd=100.0)
+    tracker = tracker_mod.CostTracker(aggregator=agg, writer=object())
+    await agg.add("t1", "llama-3-70b", 0.50, provider="groq", tokens=100)
+    await agg.add("t1", "llama-3-70b", 0.25, provider="together", tokens=40)
+    await agg.flush_now()
+    await agg.add("t1", "llama-3-70b", 0.25, provider="groq", tokens=10)
+
+    breakdown = await tracker.get_cost_breakdown("t1")
+    rows = [(r["provider"], r["model"], r["cost_usd"], r["tokens"], r["calls"]) for r in breakdown["today_by_model"]]
+    assert rows == [("groq", "llama-3-70b", 0.75, 110, 2), ("together", "llama-3-70b", 0.25, 40, 1)]
+    assert breakdown["today_usd"] == 1.0
+    await agg.stop()
+
+
+async def test_platform_stats_keep_each_day_under_its_own_keys(redis, monkeypatch):
+    mod = load_module("apps/api/app/services/platform_stats.py", "platform_stats")
+    today = [date(2026, 3, 1)]
+
+    class Clock(date):
+        @classmethod
+        def today(cls):
+            return today[0]
+
+    monkeypatch.setattr(mod, "date", Clock)
+    stats = mod.PlatformStats()
+    stats.record_inference("t1", "u1", latency_ms=100, tokens=10, cost_usd=0.5)
+    today[0] = date(2026, 3, 2)
+    stats.record_inference("t2", "u2", latency_ms=200, tokens=20, cost_usd=1.0)
+
+    redis.down = True
+    await stats.flush_now()
+    stats.record_inference("t3", "u3", latency_ms=300, tokens=30, cost_usd=2.0)
+    redis.down = False
+    await stats.flush_now()
+
+    assert redis.data["nexus:stats:counters:2026-03-01"] == {"inferences": 1, "tokens": 10, "cost_usd": 0.5, "latency_ms_sum": 100.0}
+    assert redis.data["nexus:stats:counters:2026-03-02"]["inferences"] == 2
+    assert redis.data["nexus:stats:tenants:2026-03-01"] == {"t1"}
+    assert redis.data["nexus:stats:tenants:2026-03-02"] == {"t2", "t3"}
+    assert sum(redis.data["nexus:stats:latency:2026-03-01"].values()) == 1
+    assert redis.data["nexus:stats:counters:mtd:2026-03"]["cost_usd"] == 3.5
+    await stats.stop()
@@ -0,0 +1,452 @@
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, "apps/api")
+
+
+def load_module(path: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, Path(path))
+    mod = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def compiled(clause) -> str:
+    from sqlalchemy.dialects import postgresql
+
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_keyset_cursor_round_trip_and_rejects_garbage():
+    from datetime import UTC, datetime
+
+    from fastapi import HTTPException
+
+    mod = load_module("apps/api/app/pagination.py", "pagination")
+    at = datetime(2026, 3, 1, 12, 30, tzinfo=UTC)
+    cursor = mod.encode_cursor(at, "row-9")
+    assert "=" not in cursor
+    assert mod.decode_cursor(cursor, datetime, str) == (at, "row-9")
+
+    for bad in ("not-a-cursor", mod.encode_cursor(at), mod.encode_cursor("yesterday", "x")):
+        with pytest.raises(HTTPException) as exc:
+            mod.decode_cursor(bad, datetime, str)
+        assert exc.value.status_code == 400
+
+
+def test_keyset_after_is_a_row_value_comparison():
+    from app.models.audit_log import AuditLog
+
+    mod = load_module("apps/api/app/pagination.py", "pagination")
+    columns = (AuditLog.created_at, AuditLog.id)
+    assert compiled(mod.after(columns, ("2026-03-01", "a"))) == (
+        "(audit_logs.created_at, audit_logs.id) > ('2026-03-01', 'a')"
+    )
+    assert " < " in compiled(mod.after(columns, ("2026-03-01", "a"), descending=True))
+
+
+def test_audit_export_chain_status_only_checks_adjacent_links():
+    from types import SimpleNamespace
+
+    from app.services.audit_writer import GENESIS_HASH, compute_entry_hash
+
+    mod = load_module("apps/api/app/services/audit_export.py", "audit_export")
+
+    def row(seq: int, prev_hash: str):
+        entry = {f: None for f in ("id", "tenant_id", "actor_id", "event", "resource", "resource_id", "ip_address")}
+        entry.update(seq=seq, prev_hash=prev_hash, details={}, created_at="2026-03-01", hash_version=2)
+        return SimpleNamespace(**entry, entry_hash=compute_entry_hash(entry))
+
+    first = row(1, GENESIS_HASH)
+    second = row(2, first.entry_hash)
+    fourth = row(4, "f" * 64)
+    status = mod.ChainStatus()
+    assert status.check(first) == {"hash": True, "link": True}
+    assert status.check(second) == {"hash": True, "link": True}
+    assert status.check(fourth) == {"hash": True, "link": None}  # seq 3 filtered out
+
+    second.details = {"edited": True}
+    status = mod.ChainStatus()
+    status.check(first)
+    assert status.check(second) == {"hash": False, "link": True}
+
+
+async def test_inference_log_page_query_is_tenant_scoped_and_seeks_past_the_cursor():
+    from datetime import UTC, datetime
+
+    mod = load_module("apps/api/app/services/inference_logs.py", "inference_logs")
+    captured: list = []
+
+    class Session:
+        async def execute(self, query):
+            captured.append(compiled(query))
+            return type("Result", (), {"scalars": lambda self: iter([])})()
+
+    filters = mod.InferenceLogFilter(model="gpt-4o", status="error")
+    await mod.fetch_page(Session(), "t1", filters, (datetime(2026, 3, 1, tzinfo=UTC), "row-9"), limit=25)
+    sql = " ".join(captured[0].split())
+    assert "inference_logs.tenant_id = 't1'" in sql
+    assert "inference_logs.model = 'gpt-4o'" in sql and "inference_logs.status_code >= 400" in sql
+    assert "(inference_logs.created_at, inference_logs.id) < ('2026-03-01 00:00:00+00:00', 'row-9')" in sql
+    assert sql.endswith("ORDER BY inference_logs.created_at DESC, inference_logs.id DESC LIMIT 25")
+    assert "OFFSET" not in sql
+
+
+class LogRow(SimpleNamespace):
+    def __getattr__(self, name):
+        return None
+
+
+async def test_inference_log_export_walks_every_page(monkeypatch):
+    import gzip
+    import json
+    from contextlib import asynccontextmanager
+    from datetime import UTC, datetime, timedelta
+
+    import app.read_replica
+
+    mod = load_module("apps/api/app/services/inference_logs.py", "inference_logs")
+    start = datetime(2026, 3, 1, tzinfo=UTC)
+    # Two rows share a timestamp, so the id breaks the tie across a page boundary.
+    stamps = [start, start + timedelta(seconds=1), start + timedelta(seconds=1), *(start + timedelta(i) for i in (2, 3, 4, 5))]
+    newest_first = sorted(
+        (LogRow(id=f"r{i}", created_at=at, model="m") for i, at in enumerate(stamps)),
+        key=lambda r: (r.created_at, r.id),
+        reverse=True,
+    )
+    pages: list = []
+
+    async def fetch_page(session, tenant_id, filters, cursor, limit):
+        pages.append(cursor)
+        rest = [r for r in newest_first if cursor is None or (r.created_at, r.id) < cursor]
+        return rest[:limit]
+
+    class Router:
+        @asynccontextmanager
+        async def session(self, tenant_id):
+            yield None
+
+    monkeypatch.setattr(mod, "fetch_page", fetch_page)
+    monkeypatch.setattr(app.read_replica, "get_replica_router", Router)
+    monkeypatch.setattr(mod.iter_rows, "__defaults__", (3,))
+
+    body = b"".join([chunk async for chunk in mod.export_ndjson("t1", mod.InferenceLogFilter(), compress=True)])
+    exported = [json.loads(line)["id"] for line in gzip.decompress(body).splitlines()]
+    assert exported == [r.id for r in newest_first]
+    assert len(pages) == 3 and pages[0] is None
+
+
+def inference_record(i: int, tenant_id: str = "t1"):
+    from app.services.inference_log_writer import InferenceRecord
+
+    return InferenceRecord(request_id=f"req-{i}", tenant_id=tenant_id, model="gpt-4o", provider="openai", latency_ms=12.5)
+
+
+def fake_copy(writer, written: list, state: dict):
+    async def copy(rows):
+        if state.get("down"):
+            raise ConnectionError("db down")
+        written.extend(r[1] for r in rows)
+
+    writer._copy = copy
+
+
+async def test_inference_log_writer_spills_after_repeated_failures_and_replays(tmp_path, monkeypatch):
+    mod = load_module("apps/api/app/services/inference_log_writer.py", "inference_log_writer")
+    writer = mod.InferenceLogWriter(batch_size=2, spill_after_failures=2, spill=mod.SpillDirectory(tmp_path))
+    monkeypatch.setattr(writer, "ensure_running", lambda: None)  # the test counts every flush itself
+    written: list = []
+    state = {"down": True}
+    fake_copy(writer, written, state)
+
+    for i in range(3):
+        writer.enqueue(inference_record(i))
+    await writer.flush_now()
+    assert writer.stats()["buffered"] == 3 and not list(tmp_path.iterdir())
+    await writer.flush_now()
+    assert writer.stats()["buffered"] == 0 and writer.spilled == 3
+    [segment] = tmp_path.iterdir()
+    assert segment.suffix == ".ndjson"
+
+    state["down"] = False
+    writer.enqueue(inference_record(3))
+    await writer.flush_now()
+    assert written == ["req-3", "req-0", "req-1", "req-2"]  # live rows first, then the oldest segment
+    assert writer.replayed == 3 and not list(tmp_path.iterdir())
+    await writer.stop()
+
+
+async def test_inference_log_spill_claims_are_exclusive_and_orphans_return(tmp_path, monkeypatch):
+    mod = load_module("apps/api/app/services/inference_log_writer.py", "inference_log_writer")
+    spill = mod.SpillDirectory(tmp_path)
+    rows = [inference_record(i).row() for i in range(2)]
+    spill.write(rows)
+
+    claimed = spill.claim()
+    assert spill.read(claimed) == rows
+    other_worker = mod.SpillDirectory(tmp_path)
+    other_worker._recovered = True  # in this process, a fresh instance would reclaim its own pid's claims
+    assert other_worker.claim() is None
+
+    # The claiming worker died: its claim goes back on the next claim().
+    dead = claimed.rename(claimed.with_name(claimed.name.rsplit(".", 1)[0] + ".999999"))
+    monkeypatch.setattr(mod, "_pid_alive", lambda pid: pid != 999999)
+    assert spill.claim() is not None and not dead.exists()
+
+    with pytest.raises(OSError):
+        mod.SpillDirectory(tmp_path, max_bytes=10).write(rows)
+
+
+async def test_inference_log_copy_falls_back_to_rows_and_counts_rejects(monkeypatch):
+    from contextlib import asynccontextmanager
+
+    from asyncpg.exceptions import IntegrityConstraintViolationError, StringDataRightTruncationError
+
+    import app.database
+
+    mod = load_module("apps/api/app/services/inference_log_writer.py", "inference_log_writer")
+    inserted: list = []
+
+    class Driver:
+        @asynccontextmanager
+        async def transaction(self):
+            yield
+
+        async def copy_records_to_table(self, table, records, columns):
+            raise IntegrityConstraintViolationError("duplicate key value violates unique constraint")
+
+        async def execute(self, stmt, *row):
+            assert stmt.endswith("ON CONFLICT DO NOTHING")
+            if row[2] == "poison":
+                raise StringDataRightTruncationError("value too long")
+            inserted.append(row[1])
+
+    class Connection:
+        async def get_raw_connection(self):
+            return SimpleNamespace(driver_connection=Driver())
+
+    class Engine:
+        @asynccontextmanager
+        async def connect(self):
+            yield Connection()
+
+    monkeypatch.setattr(app.database, "engine", Engine())
+    writer = mod.InferenceLogWriter(batch_size=10)
+    for i, tenant_id in enumerate(["t1", "poison", "t1"]):
+        writer.enqueue(inference_record(i, tenant_id))
+    await writer.flush_now()
+    assert inserted == ["req-0", "req-2"]
+    assert writer.stats()["rejected"] == 1 and writer.stats()["buffered"] == 0
+    await writer.stop()
+
+
+def test_append_only_tables_are_range_partitioned_with_created_at_in_every_unique_key():
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.schema import CreateTable
+
+    import app.models  # noqa: F401
+    from app.database import Base
+
+    partitions = load_module("apps/api/app/partitions.py", "partitions")
+    for name in partitions.PARTITIONED_TABLES:
+        table = Base.metadata.tables[name]
+        ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+        assert ddl.rstrip().endswith("PARTITION BY RANGE (created_at)"), name
+        assert {c.name for c in table.primary_key.columns} == {"id", "created_at"}, name
+        for index in table.indexes:
+            assert not index.unique or "created_at" in {c.name for c in index.columns}, index.name
+
+
+async def test_ensure_partitions_installs_functions_then_extends_each_table():
+    partitions = load_module("apps/api/app/partitions.py", "partitions")
+    executed: list = []
+
+    class Connection:
+        async def execute(self, stmt):
+            executed.append(str(stmt).strip())
+
+    await partitions.ensure_partitions(Connection(), months_ahead=2)
+    functions = len(partitions.FUNCTIONS_SQL)
+    assert executed[0] == "CREATE SCHEMA IF NOT EXISTS archive"
+    assert all("CREATE OR REPLACE FUNCTION nexus_" in stmt for stmt in executed[1:functions])
+    assert executed[functions:] == [
+        "SELECT nexus_ensure_partitions('inference_logs', 2)",
+        "SELECT nexus_ensure_partitions('cost_records', 2)",
+        "SELECT nexus_ensure_partitions('audit_logs', 2)",
+    ]
+    assert partitions.ensure_sql("audit_logs", "3") == "SELECT nexus_ensure_partitions('audit_logs', 3)"
+
+
+@pytest.mark.parametrize(
+    ("today", "boundary"),
+    [((2026, 10, 19), "2026-12-01 00:00:00+00"), ((2026, 11, 30), "2027-01-01 00:00:00+00"), ((2026, 12, 1), "2027-02-01 00:00:00+00")],
+)
+def test_partition_migration_boundary_is_the_month_after_next(monkeypatch, today, boundary):
+    from datetime import UTC, datetime
+
+    migration = load_module("apps/api/alembic/versions/0003_monthly_partitions.py", "migration_0003")
+
+    class Frozen(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(*today, 23, 59, tzinfo=tz or UTC)
+
+    monkeypatch.setattr(migration, "datetime", Frozen)
+    assert migration._boundary() == boundary
+
+
+def test_partition_migration_downgrade_copies_back_into_plain_tables(monkeypatch):
+    migration = load_module("apps/api/alembic/versions/0003_monthly_partitions.py", "migration_0003")
+    executed: list = []
+    monkeypatch.setattr(migration, "_is_partitioned", lambda name: name != "cost_records")
+    monkeypatch.setattr(migration, "op", SimpleNamespace(execute=executed.append))
+
+    migration.downgrade()
+    assert executed[:5] == [
+        "LOCK TABLE inference_logs IN EXCLUSIVE MODE",
+        "CREATE TABLE inference_logs_unpartitioned (LIKE inference_logs INCLUDING DEFAULTS)",
+        "INSERT INTO inference_logs_unpartitioned SELECT * FROM inference_logs",
+        "DROP TABLE inference_logs",
+        "ALTER TABLE inference_logs_unpartitioned RENAME TO inference_logs",
+    ]
+    assert executed[5:10] == list(migration.UNPARTITIONED_DDL["inference_logs"])
+    assert not any("cost_records" in stmt for stmt in executed)
+    assert executed[-1] == "CREATE INDEX ix_audit_logs_tenant_created_id ON audit_logs (tenant_id, created_at, id)"
+
+
+def test_baseline_migration_is_explicit_ddl_for_every_model_table():
+    import re
+
+    import app.models  # noqa: F401
+    from app.database import Base
+
+    baseline = load_module("apps/api/alembic/versions/0001_baseline.py", "migration_0001")
+    created = {re.search(r"CREATE TABLE IF NOT EXISTS (\w+)", stmt).group(1) for stmt in baseline.TABLES}
+    assert created == set(Base.metadata.tables)
+    assert not hasattr(baseline, "Base")  # frozen: later model changes need their own revision
+
+
+class StickyRedis:
+    def __init__(self):
+        self.keys: dict = {}
+
+    async def set(self, key, value, px=None):
+        self.keys[key] = px
+
+    async def exists(self, key):
+        return int(key in self.keys)
+
+
+class ReplicaEngine:
+    def __init__(self, lag: float | None):
+        self.lag = lag
+
+    def connect(self):
+        engine = self
+
+        class Connection:
+            async def __aenter__(self):
+                if engine.lag is None:
+                    raise ConnectionError("replica down")
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def scalar(self, stmt):
+                return engine.lag
+
+        return Connection()
+
+
+class NamedSession:
+    def __init__(self, name: str, fail: bool = False):
+        self.name, self.fail = name, fail
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def connection(self):
+        if self.fail:
+            raise ConnectionError("replica gone")
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    import app.cache
+    import app.database
+
+    redis = StickyRedis()
+    engine = ReplicaEngine(lag=0.2)
+    monkeypatch.setattr(app.cache, "get_redis", lambda: redis)
+    monkeypatch.setattr(app.database, "replica_engine", engine)
+    monkeypatch.setattr(app.database, "AsyncSessionLocal", NamedSession("primary"))
+    monkeypatch.setattr(app.database, "ReplicaSessionLocal", NamedSession("replica"))
+    mod = load_module("apps/api/app/read_replica.py", "read_replica")
+    router = mod.ReplicaRouter(max_lag=1.0, check_interval=0.0, sticky_seconds=5.0)
+    router.redis, router.engine = redis, engine
+    return router
+
+
+async def probed(router, tenant_id: str = "") -> str:
+    """Route once (starting a probe, routed on the old lag), then again on the fresh lag."""
+    await router.choose(tenant_id)
+    await router._probe
+    return await router.choose(tenant_id)
+
+
+async def test_replica_router_routes_by_health_lag_and_recent_writes(replicas, monkeypatch):
+    import app.database
+
+    assert await replicas.choose("t1") == "primary_unavailable"  # never probed yet
+    assert await probed(replicas, "t1") == "replica"
+
+    replicas.engine.lag = 30.0
+    assert await probed(replicas, "t1") == "primary_lag"
+    replicas.engine.lag = None
+    assert await probed(replicas, "t1") == "primary_unavailable"
+    replicas.engine.lag = 0.0
+    assert await probed(replicas, "t1") == "replica"
+
+    replicas.mark_write("t1")
+    await asyncio.sleep(0)
+    assert replicas.redis.keys == {"nexus:rw:t1": 5000}
+    assert await replicas.choose("t1") == "primary_sticky"
+    replicas._sticky.clear()  # another worker: only the Redis mark is left
+    assert await replicas.choose("t1") == "primary_sticky"
+    assert await replicas.choose("t2") == "replica"
+
+    monkeypatch.setattr(app.database, "replica_engine", None)
+    assert await replicas.choose("t1") == "primary_no_replica"
+    assert replicas.routed == {
+        "replica": 4,
+        "primary_no_replica": 1,
+        "primary_unavailable": 4,
+        "primary_lag": 2,
+        "primary_sticky": 2,
+    }
+
+
+async def test_replica_router_falls_back_when_the_replica_dies_between_probes(replicas, monkeypatch):
+    import app.database
+
+    await probed(replicas)
+    async with replicas.session("t1") as session:
+        assert session.name == "replica"
+
+    monkeypatch.setattr(app.database, "ReplicaSessionLocal", NamedSession("replica", fail=True))
+    async with replicas.session("t1") as session:
+        assert session.name == "primary"
+    assert replicas.lag is None and replicas.routed["primary_unavailable"] == 2
@@ -0,0 +1,224 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, "apps/api")
+
+
+def load_module(path: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, Path(path))
+    mod = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class LuaRedis:
+    """Just enough Redis to run the GCRA script: TIME, GET, SET PX, DEL, scripts via lupa."""
+
+    def __init__(self):
+        lupa = pytest.importorskip("lupa")
+        self.lua = lupa.LuaRuntime()
+        self.now_ms = 1_700_000_000_000
+        self.data: dict[str, tuple[str, int]] = {}
+        self.evals = 0
+        self.lua.globals().redis = self.lua.table_from({"call": self._call})
+
+    def _call(self, command, *args):
+        command = command.upper()
+        if command == "TIME":
+            return self.lua.table_from([str(self.now_ms // 1000), str(self.now_ms % 1000 * 1000)])
+        if command == "GET":
+            value, expires = self.data.get(args[0], (None, 0))
+            return value if value is not None and expires > self.now_ms else False
+        if command == "SET":
+            key, value, _, px = args
+            self.data[key] = (str(value), self.now_ms + int(px))
+            return "OK"
+        raise AssertionError(f"unexpected redis.call({command})")
+
+    def register_script(self, source: str):
+        function = self.lua.eval(f"function(KEYS, ARGV) {source} end")
+
+        async def script(keys, args):
+            self.evals += 1
+            out = function(self.lua.table_from(keys), self.lua.table_from([str(a) for a in args]))
+            return [int(v) for v in out.values()]
+
+        return script
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    import app.cache
+
+    fake = LuaRedis()
+    monkeypatch.setattr(app.cache, "get_redis", lambda: fake)
+    return fake
+
+
+async def test_gcra_allows_a_burst_then_one_per_interval(redis):
+    mod = load_module("apps/api/app/rate_limit.py", "rate_limit")
+    limiter = mod.RateLimiter()
+    rl = mod.RateLimit("tenant:t1", limit=6, period=60)
+
+    remaining = [(await limiter.check(rl)).remaining for _ in range(6)]
+    assert remaining == [5, 4, 3, 2, 1, 0]
+    denied = await limiter.check(rl)
+    assert (denied.allowed, denied.key, denied.retry_after) == (False, "tenant:t1", 10.0)
+    assert denied.headers()["Retry-After"] == "10"
+
+    limiter._blocked.clear()
+    redis.now_ms += 10_000
+    assert (await limiter.check(rl)).allowed
+    assert not (await limiter.check(rl)).allowed
+
+
+async def test_gcra_charges_every_key_or_none(redis):
+    mod = load_module("apps/api/app/rate_limit.py", "rate_limit")
+    limiter = mod.RateLimiter()
+    key = mod.RateLimit("key:k1", limit=100)
+    tenant = mod.RateLimit("tenant:t1", limit=2)
+
+    assert (await limiter.check(key, tenant)).key == "tenant:t1"  # fewest units left
+    await limiter.check(key, tenant)
+    denied = await limiter.check(key, tenant)
+    assert (denied.allowed, denied.key) == (False, "tenant:t1")
+    # The denied call did not charge the API key.
+    assert (await limiter.check(key)).remaining == 97
+
+
+async def test_gcra_denials_are_remembered_locally_and_costs_are_clamped(redis):
+    mod = load_module("apps/api/app/rate_limit.py", "rate_limit")
+    limiter = mod.RateLimiter()
+    rl = mod.RateLimit("tenant:t1", limit=4, period=60, cost=10)
+
+    drained = await limiter.check(rl)
+    assert (drained.allowed, drained.remaining) == (True, 0)  # a cost above the bucket drains it
+    assert not (await limiter.check(rl)).allowed
+    evals = redis.evals
+    local = await limiter.check(rl)
+    assert not local.allowed and redis.evals == evals  # rejected without a round trip
+
+    await limiter.reset("tenant:t1")
+    assert (await limiter.check(mod.RateLimit("tenant:t1", limit=4))).remaining == 3
+    assert (await limiter.check()).allowed
+
+
+class FakeContexts:
+    def __init__(self, tenants: dict):
+        self.tenants = tenants
+
+    async def tenant(self, tenant_id: str) -> dict | None:
+        return self.tenants.get(tenant_id)
+
+    async def api_key(self, key_hash: str) -> dict | None:
+        return None
+
+
+async def call(
+    app,
+    path: str,
+    chunks: list[bytes],
+    headers: dict | None = None,
+    method: str = "POST",
+    claims: dict | None = None,
+) -> dict:
+    headers = {"authorization": "Bearer token", **(headers or {})}
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+        "state": {"claims": {"tenant_id": "t1"} if claims is None else claims},
+    }
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1} for i, chunk in enumerate(chunks)
+    ]
+    response: dict = {}
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode(): v.decode() for k, v in message.get("headers", [])}
+
+    await app(scope, receive, send)
+    return response
+
+
+@pytest.fixture
+def limited_app(redis, monkeypatch):
+    from app.config import settings
+    from app.middleware import rate_limit_middleware as mod
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_tokens_per_unit", 1024)
+    monkeypatch.setattr(settings, "rate_limit_max_body_bytes", 256)
+    monkeypatch.setattr(mod, "get_auth_context", lambda: FakeContexts({"t1": {"id": "t1", "rate_limit_rpm": 4}}))
+    limiter = load_module("apps/api/app/rate_limit.py", "rate_limit").RateLimiter()
+    monkeypatch.setattr(mod, "get_rate_limiter", lambda: limiter)
+    seen: list[bytes] = []
+
+    async def inner(scope, receive, send):
+        message = await receive()
+        seen.append(message.get("body", b""))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    app = mod.RateLimitMiddleware(inner)
+    app.seen = seen
+    return app
+
+
+async def test_rate_limit_middleware_weights_inference_by_max_tokens(limited_app):
+    body = b'{"prompt": "hi", "max_tokens": 2048}'
+
+    first = await call(limited_app, "/api/v1/nexus/chat", [body[:10], body[10:]])
+    assert (first["status"], first["headers"]["ratelimit-remaining"]) == (200, "2")
+    assert limited_app.seen == [body]  # the handler still sees the whole body
+    assert (await call(limited_app, "/api/v1/nexus/chat", [body]))["status"] == 200
+    denied = await call(limited_app, "/api/v1/nexus/chat", [body])
+    assert denied["status"] == 429 and "retry-after" in denied["headers"]
+    assert len(limited_app.seen) == 2
+
+
+async def test_rate_limit_middleware_ignores_a_spoofed_tenant_header(limited_app):
+    body = b'{"prompt": "hi", "max_tokens": 4096}'  # the whole bucket in one request
+    spoofed = {"authorization": "Bearer garbage", "x-tenant-id": "t1"}
+    for _ in range(3):
+        response = await call(limited_app, "/api/v1/nexus/chat", [body], headers=spoofed, claims={})
+        assert response["status"] == 200 and "ratelimit-remaining" not in response["headers"]
+
+    victim = await call(limited_app, "/api/v1/nexus/chat", [body])
+    assert (victim["status"], victim["headers"]["ratelimit-remaining"]) == (200, "0")
+
+
+async def test_rate_limit_middleware_refuses_oversized_bodies(limited_app):
+    declared = await call(limited_app, "/api/v1/nexus/chat", [b"{}"], headers={"content-length": "100000"})
+    assert declared["status"] == 413
+    streamed = await call(limited_app, "/api/v1/nexus/stream", [b"x" * 200, b"x" * 200, b"x" * 200])
+    assert streamed["status"] == 413
+    assert limited_app.seen == []
+    # Only token-weighted routes are buffered at all.
+    assert (await call(limited_app, "/api/v1/prompts", [b"x" * 1000]))["status"] == 200
+
+
+async def test_rate_limit_middleware_fails_open_without_redis(limited_app, monkeypatch):
+    from app.middleware import rate_limit_middleware as mod
+
+    class Down:
+        async def check(self, *limits):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(mod, "get_rate_limiter", Down)
+    response = await call(limited_app, "/api/v1/nexus/chat", [b"{}"])
+    assert response["status"] == 200 and "ratelimit-limit" not in response["headers"]
@@ -0,0 +1,190 @@
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, "apps/api")
+
+
+def load_module(path: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, Path(path))
+    mod = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class PoolEngine:
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.opened = 0
+
+    def connect(self):
+        engine = self
+
+        class Connection:
+            async def start(self):
+                if engine.failures:
+                    engine.failures -= 1
+                    raise ConnectionError("refused")
+                engine.opened += 1
+
+            async def close(self):
+                pass
+
+        return Connection()
+
+
+async def test_warm_engine_opens_connections_concurrently_and_tolerates_some_failures():
+    mod = load_module("apps/api/app/startup.py", "startup")
+    engine = PoolEngine(failures=1)
+    assert await mod.warm_engine(engine, 4) == 3 and engine.opened == 3
+    with pytest.raises(ConnectionError):
+        await mod.warm_engine(PoolEngine(failures=2), 2)
+
+
+@pytest.mark.parametrize("environment", ["development", "production"])
+async def test_startup_skips_schema_work_in_production_and_bounds_warmups(monkeypatch, environment):
+    import app.database
+    from app.config import settings
+
+    mod = load_module("apps/api/app/startup.py", "startup")
+    created: list = []
+
+    async def create_tables():
+        created.append(True)
+
+    async def hang(*args):
+        await asyncio.sleep(60)
+
+    async def fail(*args):
+        raise ConnectionError("redis down")
+
+    async def providers():
+        return ["openai"]
+
+    monkeypatch.setattr(settings, "environment", environment)
+    monkeypatch.setattr(settings, "startup_warmup_timeout_seconds", 0.05)
+    monkeypatch.setattr(app.database, "create_tables", create_tables)
+    monkeypatch.setattr(app.database, "replica_engine", None)
+    monkeypatch.setattr(mod, "warm_engine", hang)
+    monkeypatch.setattr(mod, "warm_redis", fail)
+    monkeypatch.setattr(mod, "warm_providers", providers)
+
+    report = await mod.start(import_ms=123.456)
+    assert created == ([] if environment == "production" else [True])
+    assert report["warmed"] == {"db": None, "redis": None, "providers": ["openai"]}
+    assert report["timed_out"] == ["db"]
+    assert report["phases_ms"]["import"] == 123.46 and report["phases_ms"]["warmup"] < 1000
+    assert ("create_tables" in report["phases_ms"]) is (environment != "production")
+
+
+def test_middleware_pipeline_order():
+    from app.middleware.pipeline import middleware_pipeline
+
+    assert [m.cls.__name__ for m in middleware_pipeline()] == [
+        "TimingMiddleware",
+        "AuthMiddleware",
+        "RateLimitMiddleware",
+        "TenantMiddleware",
+        "CostCircuitBreakerMiddleware",
+        "CORSMiddleware",
+        "GZipMiddleware",
+    ]
+
+
+async def asgi_call(app, method: str, path: str, headers: dict) -> dict:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    response: dict = {"chunks": []}
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"{}", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message.get("body"):
+            response["chunks"].append(message["body"])
+
+    await app(scope, receive, send)
+    return response
+
+
+@pytest.fixture
+def pipeline_app(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+
+    from app.config import settings
+    from app.middleware import cost_circuit_breaker
+    from app.middleware.pipeline import middleware_pipeline
+
+    class Budgets:
+        def is_over_budget(self, tenant_id: str) -> bool:
+            return tenant_id == "t-broke"
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    monkeypatch.setattr(cost_circuit_breaker, "get_budget_enforcer", Budgets)
+    app = FastAPI(middleware=middleware_pipeline())
+
+    @app.get("/api/v1/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    @app.post("/api/v1/nexus/stream")
+    async def stream() -> StreamingResponse:
+        async def events():
+            for i in range(3):
+                yield f"data: {i}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def bearer(tenant_id: str) -> dict:
+    from app.routers.auth import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token('u1', tenant_id, 'admin')}"}
+
+
+async def test_pipeline_headers_and_auth_runs_before_tenant_context(pipeline_app):
+    ok = await asgi_call(pipeline_app, "GET", "/api/v1/ping", {**bearer("t1"), "X-Tenant-ID": "t1"})
+    assert ok["status"] == 200
+    assert ok["headers"]["x-tenant-id"] == "t1" and float(ok["headers"]["x-latency-ms"]) >= 0
+
+    denied = await asgi_call(pipeline_app, "GET", "/api/v1/ping", {"X-Tenant-ID": "t1"})
+    assert denied["status"] == 401
+    assert "x-latency-ms" in denied["headers"] and "x-tenant-id" not in denied["headers"]
+
+
+async def test_pipeline_streams_chunks_and_breaker_keys_on_the_authenticated_tenant(pipeline_app):
+    streamed = await asgi_call(pipeline_app, "POST", "/api/v1/nexus/stream", bearer("t1"))
+    assert streamed["status"] == 200
+    assert streamed["chunks"] == [b"data: 0\n\n", b"data: 1\n\n", b"data: 2\n\n"]  # not buffered or gzipped
+
+    broke = await asgi_call(pipeline_app, "POST", "/api/v1/nexus/stream", {**bearer("t-broke"), "X-Tenant-ID": "t1"})
+    assert broke["status"] == 402
+    spoofed = await asgi_call(pipeline_app, "POST", "/api/v1/nexus/stream", {**bearer("t1"), "X-Tenant-ID": "t-broke"})
+    assert spoofed["status"] == 200